@@ -0,0 +1,305 @@
+"""Vectorized analytics over answer history (requires NumPy).
+
+Answer history is loaded into columnar arrays once; every aggregate below is
+computed with array operations rather than per-record Python loops, so cohort
+reports over hundreds of learners stay fast:
+
+    python analytics.py learners/*.sqlite learners/*.json --json report.json
+"""
+import argparse
+import json
+import os
+import sqlite3
+
+import numpy as np
+
+from stats_store import StatsJournal, default_stats
+
+# ---------------------------- CONSTANTS ----------------------------
+MASTERY_STREAK = 3  # Consecutive correct answers that count as "mastered"
+CURVE_LENGTH = 10  # Attempts per card tracked by the accuracy curves
+PRIOR_STRENGTH = 4.0  # Pseudo-attempts pulling sparse cards toward the cohort accuracy
+
+
+# ---------------------------- HISTORY ----------------------------
+class History:
+    """Answer history as parallel NumPy columns.
+
+    ``learner``, ``card`` and ``answer`` are integer codes into the ``learners``,
+    ``cards`` and ``answers`` label arrays (``answer`` is -1 when no wrong answer
+    was recorded); ``ts`` is epoch seconds and ``correct`` is 0/1. ``partial`` is
+    set when some learner's JSON stats count answers older than its history.
+    """
+
+    def __init__(self, learner, card, ts, correct, answer, learners, cards, answers, partial=False):
+        self.learner = learner
+        self.card = card
+        self.ts = ts
+        self.correct = correct
+        self.answer = answer
+        self.learners = learners
+        self.cards = cards
+        self.answers = answers
+        self.partial = partial
+
+    def __len__(self):
+        return len(self.card)
+
+    @classmethod
+    def from_columns(cls, learner_names, cards, timestamps, correct, answers):
+        """Encode raw columns (labels and ``YYYY-MM-DD HH:MM:SS`` strings) into codes"""
+        learners, learner = np.unique(np.asarray(learner_names, dtype=str), return_inverse=True)
+        card_labels, card = np.unique(np.asarray(cards, dtype=str), return_inverse=True)
+        answers = np.asarray(answers, dtype=object)
+        given = answers != None  # noqa: E711 (element-wise comparison)
+        answer = np.full(len(answers), -1, dtype=np.int32)
+        answer_labels = np.array([], dtype=str)
+        if given.any():
+            answer_labels, codes = np.unique(answers[given].astype(str), return_inverse=True)
+            answer[given] = codes
+        ts = np.asarray(timestamps, dtype="datetime64[s]").astype(np.int64)
+        return cls(learner.astype(np.int32), card.astype(np.int32), ts,
+                   np.asarray(correct, dtype=np.int8), answer, learners, card_labels, answer_labels)
+
+    @classmethod
+    def from_sqlite(cls, path, learner=None):
+        """Every attempt stored by ``SqliteStatsStore`` at ``path``"""
+        with sqlite3.connect(f"file:{path}?mode=ro", uri=True) as db:
+            rows = db.execute("SELECT card, ts, correct, answer FROM attempts ORDER BY id").fetchall()
+        return cls._from_rows(rows, learner or _learner_name(path))
+
+    @classmethod
+    def from_journal(cls, path, learner=None, snapshot_path=None):
+        """Every answer kept for JSON stats: the ``.history`` archive plus the live journal.
+
+        ``snapshot_path`` defaults to ``<name>.json`` beside the journal. Stats that
+        count more attempts than the history holds (answers compacted before the
+        archive existed, or imported counters) mark the result ``partial``.
+        """
+        store = StatsJournal(snapshot_path or os.path.splitext(path)[0] + ".json", path)
+        attempts = store.read(default_stats(())).get("total_attempts", 0)
+        rows = [(record["k"], record["t"], record["ok"], record.get("a")) for record in store.history()]
+        history = cls._from_rows(rows, learner or _learner_name(path))
+        history.partial = len(rows) < attempts
+        return history
+
+    @classmethod
+    def _from_rows(cls, rows, learner):
+        if not rows:
+            return cls.from_columns([], [], [], [], [])
+        cards, timestamps, correct, answers = zip(*rows)
+        return cls.from_columns([learner] * len(rows), cards, timestamps, correct, answers)
+
+    @classmethod
+    def concat(cls, histories):
+        """Merge histories (e.g. one per learner), re-encoding labels to a shared vocabulary"""
+        partial = any(h.partial for h in histories)
+        histories = [h for h in histories if len(h)]
+        if not histories:
+            merged = cls.from_columns([], [], [], [], [])
+            merged.partial = partial
+            return merged
+        label = lambda attr, codes_attr: np.concatenate(  # noqa: E731
+            [getattr(h, attr)[getattr(h, codes_attr)] for h in histories])
+        answers = np.concatenate([np.where(h.answer >= 0, h.answers[np.maximum(h.answer, 0)]
+                                           if len(h.answers) else None, None) for h in histories])
+        timestamps = np.concatenate([h.ts for h in histories]).astype("datetime64[s]")
+        merged = cls.from_columns(label("learners", "learner"), label("cards", "card"), timestamps,
+                                  np.concatenate([h.correct for h in histories]), answers)
+        merged.partial = partial
+        return merged
+
+    def sorted_groups(self):
+        """Row order sorted by (learner, card, time) plus group-start flags for that order"""
+        order = np.lexsort((self.ts, self.card, self.learner))
+        learner, card = self.learner[order], self.card[order]
+        starts = np.ones(len(order), dtype=bool)
+        starts[1:] = (learner[1:] != learner[:-1]) | (card[1:] != card[:-1])
+        return order, starts
+
+
+def _learner_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+# ---------------------------- AGGREGATES ----------------------------
+def card_totals(history):
+    """``(correct, attempts)`` arrays indexed by card code"""
+    size = len(history.cards)
+    attempts = np.bincount(history.card, minlength=size)
+    correct = np.bincount(history.card, weights=history.correct, minlength=size)
+    return correct, attempts
+
+
+def difficulty(history, prior_strength=PRIOR_STRENGTH):
+    """Smoothed error rate per card: sparse cards lean toward the cohort average"""
+    correct, attempts = card_totals(history)
+    if len(history) == 0:
+        return np.zeros(0)
+    prior = history.correct.mean()
+    return 1.0 - (correct + prior * prior_strength) / (attempts + prior_strength)
+
+
+def accuracy_curves(history, length=CURVE_LENGTH):
+    """Accuracy by attempt number: a ``cards x length`` array (NaN where unseen)"""
+    card, attempt, correct = _first_attempts(history, length)
+    slot = card * length + attempt
+    size = len(history.cards) * length
+    seen = np.bincount(slot, minlength=size)
+    right = np.bincount(slot, weights=correct, minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (right / seen).reshape(len(history.cards), length)
+
+
+def overall_accuracy_curve(history, length=CURVE_LENGTH):
+    """Accuracy by attempt number across all cards and learners (NaN where unseen)"""
+    _, attempt, correct = _first_attempts(history, length)
+    seen = np.bincount(attempt, minlength=length)
+    right = np.bincount(attempt, weights=correct, minlength=length)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return right / seen
+
+
+def _first_attempts(history, length):
+    """Card code, attempt number and result of each learner's first ``length`` tries per card"""
+    order, starts = history.sorted_groups()
+    positions = np.arange(len(order))
+    attempt = positions - np.maximum.accumulate(np.where(starts, positions, 0))
+    keep = attempt < length
+    return history.card[order][keep], attempt[keep], history.correct[order][keep]
+
+
+def confusions(history, top=20):
+    """Most common ``(card, wrong answer, count)`` triples, as a sparse confusion matrix"""
+    wrong = history.answer >= 0
+    if not wrong.any():
+        return []
+    keys = history.card[wrong].astype(np.int64) * len(history.answers) + history.answer[wrong]
+    pairs, counts = np.unique(keys, return_counts=True)
+    best = np.argsort(counts, kind="stable")[::-1][:top]
+    cards, answers = np.divmod(pairs[best], len(history.answers))
+    return [(str(history.cards[c]), str(history.answers[a]), int(n))
+            for c, a, n in zip(cards, answers, counts[best])]
+
+
+def time_to_mastery(history, streak=MASTERY_STREAK):
+    """Per card: share of learners who mastered it, and median attempts/seconds to do so.
+
+    Mastery is the first run of ``streak`` consecutive correct answers, timed from
+    that learner's first attempt at the card.
+    """
+    order, starts = history.sorted_groups()
+    positions = np.arange(len(order))
+    correct = history.correct[order].astype(bool)
+
+    # Length of the correct run ending at each row, reset by misses and new groups
+    marker = np.where(~correct, positions, np.where(starts, positions - 1, -1))
+    run = positions - np.maximum.accumulate(marker) if len(order) else positions
+    first_row = np.maximum.accumulate(np.where(starts, positions, 0))
+    group = np.cumsum(starts) - 1
+
+    mastered = np.flatnonzero(run == streak)
+    mastered = mastered[np.unique(group[mastered], return_index=True)[1]]  # First time per group
+    ts = history.ts[order]
+    card = history.card[order][mastered]
+    attempts = (mastered - first_row[mastered] + 1).astype(float)
+    seconds = (ts[mastered] - ts[first_row[mastered]]).astype(float)
+
+    size = len(history.cards)
+    learners = np.bincount(history.card[order][starts], minlength=size)
+    share = np.bincount(card, minlength=size) / np.maximum(learners, 1)
+    return share, _group_median(card, attempts, size), _group_median(card, seconds, size)
+
+
+def _group_median(groups, values, size):
+    """Median of ``values`` per group code (NaN for empty groups), without a Python loop"""
+    medians = np.full(size, np.nan)
+    if len(values) == 0:
+        return medians
+    order = np.lexsort((values, groups))
+    groups, values = groups[order], values[order]
+    counts = np.bincount(groups, minlength=size)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = counts > 0
+    low = offsets + (counts - 1) // 2
+    high = offsets + counts // 2
+    medians[present] = (values[low[present]] + values[high[present]]) / 2
+    return medians
+
+
+# ---------------------------- REPORTS ----------------------------
+def report(history, top=10):
+    """Summary dict used by the app and the batch command"""
+    correct, attempts = card_totals(history)
+    hardness = difficulty(history)
+    share, median_attempts, median_seconds = time_to_mastery(history)
+    overall_curve = overall_accuracy_curve(history)
+
+    hardest = np.argsort(hardness, kind="stable")[::-1][:top]
+    _nan = lambda value: None if np.isnan(value) else round(float(value), 3)  # noqa: E731
+    return {
+        "learners": len(history.learners),
+        "attempts": int(len(history)),
+        "recent_only": history.partial,
+        "accuracy": _nan(history.correct.mean()) if len(history) else None,
+        "accuracy_by_attempt": [_nan(v) for v in overall_curve],
+        "hardest_cards": [{
+            "card": str(history.cards[i]),
+            "accuracy": _nan(correct[i] / attempts[i]) if attempts[i] else None,
+            "attempts": int(attempts[i]),
+            "difficulty": _nan(hardness[i]),
+            "mastered_share": _nan(share[i]),
+            "median_attempts_to_mastery": _nan(median_attempts[i]),
+            "median_seconds_to_mastery": _nan(median_seconds[i]),
+        } for i in hardest],
+        "top_confusions": [{"card": c, "answer": a, "count": n} for c, a, n in confusions(history, top)],
+    }
+
+
+def load_history(paths):
+    """Load and merge stats databases and JSON journals, one learner per file"""
+    histories = []
+    for path in paths:
+        if path.endswith((".sqlite", ".db")):
+            histories.append(History.from_sqlite(path))
+        else:
+            journal = path if path.endswith(".journal") else os.path.splitext(path)[0] + ".journal"
+            histories.append(History.from_journal(journal, _learner_name(path)))
+    return History.concat(histories)
+
+
+def format_report(summary):
+    """Plain-text rendering of ``report`` for the app and the terminal"""
+    lines = [f"Learners: {summary['learners']}   Attempts: {summary['attempts']}   "
+             f"Accuracy: {_percent(summary['accuracy'])}", "",
+             "Accuracy by attempt: " + "  ".join(_percent(v) for v in summary["accuracy_by_attempt"]),
+             "", "Hardest cards:"]
+    if summary.get("recent_only"):
+        lines[1:1] = ["(Some JSON stats count answers from before their answer history was kept, "
+                      "so those learners' figures cover only the answers since)"]
+    for card in summary["hardest_cards"]:
+        lines.append(f"  {card['card']:6} accuracy {_percent(card['accuracy']):>6}  "
+                     f"attempts {card['attempts']:5}  mastered {_percent(card['mastered_share']):>6}  "
+                     f"median attempts {card['median_attempts_to_mastery'] or '-'}")
+    lines += ["", "Top confusions:"]
+    lines += [f"  {c['card']} → {c['answer']} ({c['count']}x)" for c in summary["top_confusions"]]
+    return "\n".join(lines)
+
+
+def _percent(value):
+    return "-" if value is None else f"{value * 100:.0f}%"
+
+
+# ---------------------------- COMMAND LINE ----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cohort analytics over Reuniclus stats files")
+    parser.add_argument("paths", nargs="+", help="Stats databases (.sqlite) or JSON stats files/journals")
+    parser.add_argument("--top", type=int, default=10, help="Cards and confusions to list (default: 10)")
+    parser.add_argument("--json", help="Also write the report as JSON to this file")
+    args = parser.parse_args()
+
+    summary = report(load_history(args.paths), args.top)
+    print(format_report(summary))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,273 @@
+"""Pronunciation clips played from one memory-mapped clip pack.
+
+Build a pack from a folder of WAV files with ``python audio.py clips/ hiragana.rap``
+and play it with ``python reuniclus.py --audio hiragana.rap``. Decoding and the
+sound device stay off the Tk thread: upcoming cards are decoded by a preload
+thread into a small LRU, and playback runs on its own worker.
+"""
+import argparse
+import collections
+import io
+import json
+import mmap
+import os
+import queue
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import wave
+
+try:
+    import simpleaudio  # Optional: in-process playback of decoded frames
+except ImportError:
+    simpleaudio = None
+
+# ---------------------------- CONSTANTS ----------------------------
+PACK_MAGIC = b"RAUD"
+PACK_VERSION = 1
+PACK_HEADER = struct.Struct("<4sHI")  # magic, version, index length
+AUDIO_CACHE_SIZE = 64  # Decoded clips kept in memory
+
+
+# ---------------------------- CLIP PACK ----------------------------
+class ClipPack:
+    """Read-only pack of WAV clips keyed by card (its kana), in one memory-mapped file.
+
+    Layout: header, JSON index ``{key: [offset, length]}``, then the WAV files
+    back to back. Clips are sliced out of the mapping without copying.
+    """
+
+    __slots__ = ("index", "_data", "_mmap")
+
+    def __init__(self, index, data, mapping=None):
+        self.index = index
+        self._data = data
+        self._mmap = mapping
+
+    @classmethod
+    def load(cls, path):
+        """Map a clip pack into memory; only the index is parsed"""
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, index_length = PACK_HEADER.unpack_from(mapping, 0)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            mapping.close()
+            raise ValueError(f"{path} is not a version {PACK_VERSION} Reuniclus clip pack")
+        index_end = PACK_HEADER.size + index_length
+        index = json.loads(mapping[PACK_HEADER.size:index_end].decode("utf-8"))
+        return cls(index, memoryview(mapping)[index_end:], mapping)
+
+    @staticmethod
+    def build(clips, path):
+        """Write ``{key: wav bytes}`` as a clip pack"""
+        index, offset = {}, 0
+        for key, data in clips.items():
+            index[key] = [offset, len(data)]
+            offset += len(data)
+        meta = json.dumps(index, ensure_ascii=False).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(meta)))
+            f.write(meta)
+            for data in clips.values():
+                f.write(data)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def clip(self, key):
+        """Zero-copy view of one clip's WAV bytes, or ``None``"""
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        offset, length = entry
+        return self._data[offset:offset + length]
+
+    def close(self):
+        if self._mmap is not None:
+            self._data.release()
+            self._mmap.close()
+            self._mmap = None
+
+
+# ---------------------------- DECODED CLIPS ----------------------------
+class Clip:
+    """A decoded clip: raw PCM frames plus the WAV file itself for players that want one"""
+
+    __slots__ = ("wav", "frames", "channels", "sample_width", "rate")
+
+    def __init__(self, wav):
+        self.wav = bytes(wav)
+        with wave.open(io.BytesIO(self.wav), "rb") as reader:
+            self.channels = reader.getnchannels()
+            self.sample_width = reader.getsampwidth()
+            self.rate = reader.getframerate()
+            self.frames = reader.readframes(reader.getnframes())
+
+
+def system_player():
+    """Best available playback function taking a ``Clip``; blocks until the clip ends"""
+    if simpleaudio is not None:
+        return lambda clip: simpleaudio.play_buffer(clip.frames, clip.channels, clip.sample_width,
+                                                    clip.rate).wait_done()
+    if sys.platform == "win32":
+        import winsound
+        return lambda clip: winsound.PlaySound(clip.wav, winsound.SND_MEMORY)
+    for command in (["aplay", "-q", "-"], ["paplay"], ["pw-play", "-"]):
+        if shutil.which(command[0]):
+            return lambda clip: subprocess.run(command, input=clip.wav, stderr=subprocess.DEVNULL)
+    if shutil.which("afplay"):  # macOS needs a file
+        def play(clip):
+            with tempfile.NamedTemporaryFile(suffix=".wav") as f:
+                f.write(clip.wav)
+                f.flush()
+                subprocess.run(["afplay", f.name])
+        return play
+    return None
+
+
+# ---------------------------- PLAYER ----------------------------
+class AudioPlayer:
+    """Plays clips on a worker thread and decodes upcoming ones on another.
+
+    ``play`` and ``preload`` only queue work, so the Tk loop never waits on
+    decoding or the sound device. Only the newest play request is kept: a clip
+    asked for while another is playing replaces anything still waiting.
+    """
+
+    def __init__(self, pack, capacity=AUDIO_CACHE_SIZE, player=None):
+        self.pack = pack
+        self.capacity = capacity
+        self.player = player or system_player()
+        self.clips = collections.OrderedDict()  # LRU of decoded clips
+        self._lock = threading.Lock()
+        self._play_queue = queue.Queue(maxsize=1)
+        self._preload_queue = queue.Queue()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.played = 0
+
+        self._threads = [threading.Thread(target=self._play_loop, name="reuniclus-audio", daemon=True),
+                         threading.Thread(target=self._preload_loop, name="reuniclus-audio-preload",
+                                          daemon=True)]
+        for thread in self._threads:
+            thread.start()
+
+    def play(self, key):
+        """Queue a clip for playback, replacing one that hasn't started yet"""
+        if self.player is not None and key in self.pack:
+            self._replace_pending(key)
+
+    def _replace_pending(self, key):
+        while True:
+            try:
+                self._play_queue.put_nowait(key)
+                return
+            except queue.Full:
+                try:
+                    self._play_queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def preload(self, keys):
+        """Decode clips in the background so playing them later is instant"""
+        for key in keys:
+            if key in self.pack:
+                self._preload_queue.put(key)
+
+    def decoded(self, key):
+        """The decoded clip for ``key`` (from the LRU, or decoded now); ``None`` if missing or bad"""
+        with self._lock:
+            clip = self.clips.get(key)
+            if clip is not None:
+                self.clips.move_to_end(key)
+                self.hits += 1
+                return clip
+            self.misses += 1
+
+        data = self.pack.clip(key)
+        if data is None:
+            return None
+        try:
+            clip = Clip(data)
+        except (wave.Error, EOFError) as e:
+            print("Could not decode audio clip:", key, e)
+            return None
+        finally:
+            data.release()
+
+        with self._lock:
+            self.clips[key] = clip
+            if len(self.clips) > self.capacity:
+                self.clips.popitem(last=False)
+        return clip
+
+    def close(self):
+        """Stop both worker threads (a clip already playing is left to finish)"""
+        self._preload_queue.put(None)
+        self._replace_pending(None)
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self.pack.close()
+
+    def _play_loop(self):
+        while True:
+            key = self._play_queue.get()
+            if key is None:
+                return
+            clip = self.decoded(key)
+            if clip is None:
+                continue
+            try:
+                self.player(clip)
+                self.played += 1
+            except Exception as e:
+                print("Could not play audio:", e)
+
+    def _preload_loop(self):
+        while True:
+            key = self._preload_queue.get()
+            if key is None:
+                return
+            with self._lock:
+                cached = key in self.clips
+            if not cached:
+                self.decoded(key)
+
+
+# ---------------------------- COMMAND LINE ----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack a folder of WAV clips into one Reuniclus clip pack")
+    parser.add_argument("source", help="Folder of .wav files named by kana (あ.wav) or romaji (a.wav)")
+    parser.add_argument("output", help="Clip pack to write (e.g. hiragana.rap)")
+    parser.add_argument("--deck", help="Deck whose romaji names map to kana keys (default: hiragana)")
+    args = parser.parse_args()
+
+    from deck import Deck, hiragana_deck
+    deck = Deck.load(args.deck) if args.deck else hiragana_deck()
+    keys_by_romaji = {deck.romaji(card_id): deck.kana(card_id) for card_id in range(len(deck))}
+
+    clips = {}
+    for name in sorted(os.listdir(args.source)):
+        stem, extension = os.path.splitext(name)
+        if extension.lower() != ".wav":
+            continue
+        with open(os.path.join(args.source, name), "rb") as f:
+            data = f.read()
+        try:
+            Clip(data)
+        except (wave.Error, EOFError) as e:
+            print(f"Skipping {name}: {e}")
+            continue
+        clips[keys_by_romaji.get(stem, stem)] = data
+
+    ClipPack.build(clips, args.output)
+    print(f"Wrote {len(clips)} clips to {args.output}")
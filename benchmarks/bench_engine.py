@@ -0,0 +1,207 @@
+"""Headless latency and memory benchmark for the quiz engine and stats backends.
+
+Drives simulated learners through thousands of answers without a display:
+
+    python benchmarks/bench_engine.py --learners 20 --answers 500 --deck-size 20000
+
+Exits non-zero when ``--max-p99-us`` is given and the engine's p99 per-answer
+latency exceeds it, so it can gate a rollout.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deck import HIRAGANA_ROWS, Deck, hiragana_deck  # noqa: E402
+from engine import QuizEngine, MODES, prepare_indexes  # noqa: E402
+from stats_store import StatsJournal, StatsWriter, default_stats  # noqa: E402
+from stats_sqlite import SqliteStatsStore  # noqa: E402
+
+
+# ---------------------------- HELPERS ----------------------------
+class SimulatedClock:
+    """Deterministic clock that moves forward a few seconds per answer"""
+
+    def __init__(self, start=1_700_000_000.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def percentiles(samples):
+    """p50/p95/p99/max of latencies in microseconds"""
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]  # noqa: E731
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": ordered[-1]}
+
+
+def build_deck(size):
+    """The hiragana deck, or a synthetic vocabulary deck of ``size`` cards"""
+    if size <= 0:
+        return hiragana_deck()
+    return Deck.from_rows(f"Synthetic {size}", ((f"語{i}", f"go{i}") for i in range(size)))
+
+
+# ---------------------------- BENCHMARKS ----------------------------
+def bench_engine(deck, learners, answers, multiple_choice, seed, indexes):
+    """Per-answer engine latency (draw, options, check, record) with persistence stubbed out.
+
+    Engines share ``indexes`` as the app's do, so with prepared tables this is
+    the steady state; the one-off table builds are timed by ``prepare_indexes``.
+    """
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(learners):
+        clock = SimulatedClock()
+        engine = QuizEngine(deck, default_stats(()), clock=clock, indexes=indexes)
+        skill = rng.uniform(0.4, 0.95)
+        engine.start(rng.choice(MODES))
+        for _ in range(answers):
+            start = time.perf_counter()
+            if engine.next_card() is None:
+                engine.start(engine.mode)
+                engine.next_card()
+            engine.question()
+            if multiple_choice:
+                options = engine.options()
+                guess = engine.correct_answer() if rng.random() < skill else rng.choice(options)
+            else:
+                guess = engine.correct_answer() if rng.random() < skill else "?"
+            engine.answer(engine.check(guess), guess)
+            samples.append((time.perf_counter() - start) * 1e6)
+            clock.advance(rng.uniform(2, 8))
+    return samples
+
+
+def check_tiny_decks(largest=4):
+    """Multiple choice on decks with fewer answers than option slots: every card gets all the others"""
+    for size in range(1, largest + 1):
+        deck = Deck.from_rows(f"Tiny {size}", HIRAGANA_ROWS[:size])
+        for mode in MODES:
+            engine = QuizEngine(deck, default_stats(()))
+            engine.start(mode)
+            while engine.next_card() is not None:
+                options = engine.options()
+                if sorted(options) != sorted(set(options)) or len(options) != min(size, 4):
+                    raise AssertionError(f"{size}-card deck, {mode}: options {options}")
+                engine.answer(True)
+
+
+def bench_persistence(make_store, records):
+    """Synchronous per-answer backend latency, and the UI-thread cost through StatsWriter"""
+    store = make_store()
+    store.load(default_stats(()))
+    direct = []
+    for record in records:
+        start = time.perf_counter()
+        store.append([record])
+        direct.append((time.perf_counter() - start) * 1e6)
+    store.close()
+
+    store = make_store()
+    writer = StatsWriter(store, store.load(default_stats(())))
+    submit = []
+    for record in records:
+        start = time.perf_counter()
+        writer.submit(record)
+        submit.append((time.perf_counter() - start) * 1e6)
+    writer.flush()
+    counters = writer.counters()
+    writer.close()
+    return direct, submit, counters
+
+
+def bench_memory(size):
+    """Traced Python heap per card for an mmap-loaded deck plus a fresh engine"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.rdk")
+        build_deck(size).save(path)
+        tracemalloc.start()
+        deck = Deck.load(path)
+        engine = QuizEngine(deck, default_stats(deck.keys()))
+        engine.start(MODES[0])
+        engine.next_card()
+        engine.options()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del engine
+        deck.close()
+    return current / max(size, 1)
+
+
+def collect_records(deck, count, seed):
+    """Answer records as the engine would produce them"""
+    rng = random.Random(seed)
+    engine = QuizEngine(deck, default_stats(()), clock=SimulatedClock())
+    engine.start(MODES[0])
+    records = []
+    for _ in range(count):
+        if engine.next_card() is None:
+            engine.start(MODES[0])
+            engine.next_card()
+        records.append(engine.answer(rng.random() < 0.8, "x"))
+    return records
+
+
+# ---------------------------- COMMAND LINE ----------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--learners", type=int, default=20, help="Simulated learners (default: 20)")
+    parser.add_argument("--answers", type=int, default=500, help="Answers per learner (default: 500)")
+    parser.add_argument("--deck-size", type=int, default=0, help="Synthetic deck size (default: hiragana)")
+    parser.add_argument("--persist", type=int, default=1000, help="Records written per backend (default: 1000)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-p99-us", type=float, help="Fail if engine p99 per-answer latency exceeds this")
+    args = parser.parse_args()
+
+    deck = build_deck(args.deck_size)
+    print(f"Deck: {deck.name} ({len(deck)} cards), {args.learners} learners x {args.answers} answers")
+
+    indexes = {}
+    builds = prepare_indexes(deck, indexes)
+    print("  first use (table builds) " + "  ".join(
+        f"{table} {sum(seconds for (name, _), seconds in builds.items() if name == table) * 1000:.1f}ms"
+        for table in ("answers", "distractors")) + " for both modes, off the UI thread")
+
+    engine_p99 = 0.0
+    for multiple_choice in (False, True):
+        stats = percentiles(bench_engine(deck, args.learners, args.answers, multiple_choice, args.seed, indexes))
+        label = "multiple choice" if multiple_choice else "free answer"
+        print(f"  engine ({label:15}) " + "  ".join(f"{k} {v:8.1f}us" for k, v in stats.items()))
+        engine_p99 = max(engine_p99, stats["p99"])
+
+    check_tiny_decks()
+    print("  tiny decks (1-4 cards): multiple choice OK")
+
+    records = collect_records(deck, args.persist, args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {
+            "json journal": lambda: StatsJournal(os.path.join(tmp, "stats.json"), os.path.join(tmp, "stats.journal")),
+            "sqlite": lambda: SqliteStatsStore(os.path.join(tmp, "stats.sqlite")),
+        }
+        for name, make_store in backends.items():
+            direct, submit, counters = bench_persistence(make_store, records)
+            direct, submit = percentiles(direct), percentiles(submit)
+            print(f"  persist ({name:12}) sync p50 {direct['p50']:8.1f}us  p99 {direct['p99']:8.1f}us  |  "
+                  f"UI submit p99 {submit['p99']:6.1f}us  writer avg {counters['avg_write_ms']:.2f}ms "
+                  f"over {counters['writes']} writes")
+
+    size = args.deck_size or len(deck)
+    print(f"  memory: {bench_memory(args.deck_size):.1f} bytes/card traced heap ({size} cards, mmap deck + engine)")
+
+    if args.max_p99_us is not None and engine_p99 > args.max_p99_us:
+        print(f"FAIL: engine p99 {engine_p99:.1f}us exceeds budget {args.max_p99_us:.1f}us")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
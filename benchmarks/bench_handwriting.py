@@ -0,0 +1,91 @@
+"""Recognition latency of the handwriting panel across the full kana set.
+
+Builds templates for every card in a deck (random pen paths of one to four
+strokes, or a real templates file), then recognizes noisy, rescaled redrawings
+of them and reports per-drawing latency. The top-1 figure it also prints is only
+a self-consistency check (templates matched against copies of themselves), not
+how well real handwriting is recognized:
+
+    python benchmarks/bench_handwriting.py --deck all-kana --samples 2 --max-p99-ms 10
+    python benchmarks/bench_handwriting.py --templates reuniclus_strokes.json
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deck_registry import DeckRegistry  # noqa: E402
+from handwriting import Recognizer, StrokeTemplates  # noqa: E402
+
+
+def percentiles(samples):
+    """p50/p95/p99/max of latencies in milliseconds"""
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]  # noqa: E731
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": ordered[-1]}
+
+
+def random_glyph(rng):
+    """One to four random-walk strokes of three to eight points"""
+    return [np.cumsum(rng.normal(0, 1, (rng.integers(3, 9), 2)), axis=0).tolist()
+            for _ in range(rng.integers(1, 5))]
+
+
+def redraw(strokes, rng, jitter):
+    """The strokes as a learner might draw them on the canvas: bigger, shifted and shaky"""
+    scale, offset = rng.uniform(60, 200), rng.uniform(0, 100, 2)
+    return [(np.asarray(stroke) * scale + offset + rng.normal(0, jitter * scale, (len(stroke), 2))).tolist()
+            for stroke in strokes]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--deck", default="all-kana", help="Built-in deck to build templates for (default: all-kana)")
+    parser.add_argument("--samples", type=int, default=2, help="Templates per kana (default: 2)")
+    parser.add_argument("--templates", help="Use this templates file instead of random strokes")
+    parser.add_argument("--jitter", type=float, default=0.03, help="Pen noise relative to glyph size (default: 0.03)")
+    parser.add_argument("--rounds", type=int, default=3, help="Redrawings of each template (default: 3)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-p99-ms", type=float, help="Fail if p99 recognition latency exceeds this")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    if args.templates:
+        templates = StrokeTemplates.load(args.templates)
+    else:
+        templates = StrokeTemplates()
+        for kana in DeckRegistry().get(args.deck).deck.column("kana"):
+            for _ in range(args.samples):
+                templates.add(kana, random_glyph(rng))
+    if not len(templates):
+        parser.error("no templates to recognize against")
+
+    start = time.perf_counter()
+    recognizer = Recognizer(templates)
+    print(f"{len(recognizer)} templates for {len(templates.samples)} kana, "
+          f"prepared in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    samples, hits = [], 0
+    for _ in range(args.rounds):
+        for kana, strokes_list in templates.samples.items():
+            for strokes in strokes_list:
+                drawing = redraw(strokes, rng, args.jitter)
+                start = time.perf_counter()
+                matches = recognizer.recognize(drawing)
+                samples.append((time.perf_counter() - start) * 1000)
+                hits += matches[0][0] == kana
+    stats = percentiles(samples)
+    print(f"  {len(samples)} drawings: " + "  ".join(f"{k} {v:6.2f}ms" for k, v in stats.items()))
+    print(f"  self-consistency: {hits / len(samples) * 100:.1f}% of noisy template copies matched their own kana")
+
+    if args.max_p99_ms is not None and stats["p99"] > args.max_p99_ms:
+        print(f"FAIL: p99 {stats['p99']:.2f}ms exceeds budget {args.max_p99_ms:.2f}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Per-keystroke cost of live romaji → kana conversion in the answer entry.
+
+Types every spelling in the full kana + yōon table, plus random multi-syllable
+answers, one character at a time through ``live_kana`` exactly as the entry's
+trace callback does, and reports per-keystroke latency against a 60 Hz frame:
+
+    python benchmarks/bench_romaji.py --words 2000 --max-p99-us 200
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from romaji import ROMAJI_TABLE, Transliterator, live_kana, romaji_table, to_kana  # noqa: E402
+
+FRAME_BUDGET_US = 1e6 / 60  # One frame at 60 Hz
+
+
+def percentiles(samples):
+    """p50/p95/p99/max of latencies in microseconds"""
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]  # noqa: E731
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": ordered[-1]}
+
+
+def typed_words(count, length, seed):
+    """Every table spelling, then ``count`` random answers of up to ``length`` syllables"""
+    rng = random.Random(seed)
+    spellings = sorted(ROMAJI_TABLE)
+    words = list(spellings)
+    for _ in range(count):
+        words.append("".join(rng.choice(spellings) for _ in range(rng.randint(1, length))))
+    return words
+
+
+def bench_keystrokes(words):
+    """Latency of each keystroke: append a character, then convert the whole entry text"""
+    samples = []
+    for word in words:
+        text = ""
+        for ch in word:
+            start = time.perf_counter()
+            text = live_kana(text + ch)
+            samples.append((time.perf_counter() - start) * 1e6)
+        to_kana(text)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, default=2000, help="Random answers to type (default: 2000)")
+    parser.add_argument("--length", type=int, default=12, help="Maximum syllables per answer (default: 12)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-p99-us", type=float, help="Fail if p99 per-keystroke latency exceeds this")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    automaton = Transliterator(romaji_table())
+    compile_ms = (time.perf_counter() - start) * 1000
+    print(f"Table: {len(ROMAJI_TABLE)} spellings, {len(automaton.transitions)} states, "
+          f"compiled in {compile_ms:.2f}ms")
+
+    samples = bench_keystrokes(typed_words(args.words, args.length, args.seed))
+    stats = percentiles(samples)
+    print(f"  {len(samples)} keystrokes: " + "  ".join(f"{k} {v:7.1f}us" for k, v in stats.items()))
+    print(f"  p99 uses {stats['p99'] / FRAME_BUDGET_US * 100:.2f}% of a {FRAME_BUDGET_US / 1000:.1f}ms frame")
+
+    if args.max_p99_us is not None and stats["p99"] > args.max_p99_us:
+        print(f"FAIL: p99 {stats['p99']:.1f}us exceeds budget {args.max_p99_us:.1f}us")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Load test for the local quiz server: sustained answers per second from many clients.
+
+Starts ``server.py`` on a free port with a throwaway data directory (or targets
+a running server with ``--port``) and drives simulated learners over keep-alive
+connections:
+
+    python benchmarks/load_test.py --clients 300 --duration 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from engine import MODES  # noqa: E402
+
+
+# ---------------------------- CLIENT ----------------------------
+class Client:
+    """One simulated learner on a single keep-alive connection"""
+
+    def __init__(self, host, port, name, rng):
+        self.host, self.port, self.name, self.rng = host, port, name, rng
+        self.reader = self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def call(self, method, action, payload=None):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.writer.write((f"{method} /learners/{self.name}/{action} HTTP/1.1\r\nHost: {self.host}\r\n"
+                           f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+                           ).encode("latin-1") + body)
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        status = int(head.split(b" ", 2)[1])
+        length = next(int(line.split(b":", 1)[1]) for line in head.split(b"\r\n")
+                      if line.lower().startswith(b"content-length:"))
+        reply = json.loads(await self.reader.readexactly(length))
+        if status != 200:
+            raise RuntimeError(f"{action}: HTTP {status} {reply}")
+        return reply
+
+    async def run(self, deadline, latencies):
+        """Answer cards until the deadline; returns how many answers were sent"""
+        await self.connect()
+        multiple_choice = self.rng.random() < 0.5
+        answers = 0
+        await self.call("POST", "session", {"mode": self.rng.choice(MODES), "multiple_choice": multiple_choice})
+        while time.perf_counter() < deadline:
+            card = await self.call("POST", "next")
+            if card.get("done"):
+                await self.call("POST", "session", {"mode": self.rng.choice(MODES),
+                                                    "multiple_choice": multiple_choice})
+                continue
+            guess = self.rng.choice(card["options"]) if "options" in card else self.rng.choice(("?", "a"))
+            start = time.perf_counter()
+            await self.call("POST", "answer", {"answer": guess})
+            latencies.append((time.perf_counter() - start) * 1e6)
+            answers += 1
+        self.writer.close()
+        return answers
+
+
+# ---------------------------- LOAD TEST ----------------------------
+async def load_test(host, port, clients, duration, seed):
+    rng = random.Random(seed)
+    latencies = []
+    pool = [Client(host, port, f"learner{i:04d}", random.Random(rng.random())) for i in range(clients)]
+    start = time.perf_counter()
+    counts = await asyncio.gather(*(client.run(start + duration, latencies) for client in pool))
+    elapsed = time.perf_counter() - start
+    return sum(counts), elapsed, latencies
+
+
+async def wait_for_server(host, port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]  # noqa: E731
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": ordered[-1]}
+
+
+# ---------------------------- COMMAND LINE ----------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=200, help="Concurrent simulated learners (default: 200)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run (default: 10)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="Target an already running server instead of starting one")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--min-rate", type=float, help="Fail if sustained answers/s falls below this")
+    args = parser.parse_args()
+
+    server = None
+    with tempfile.TemporaryDirectory() as data_dir:
+        port = args.port
+        if port is None:
+            import socket
+            with socket.socket() as probe:
+                probe.bind((args.host, 0))
+                port = probe.getsockname()[1]
+            server = subprocess.Popen([sys.executable, os.path.join(ROOT, "server.py"), "--host", args.host,
+                                       "--port", str(port), "--data-dir", data_dir], stdout=subprocess.DEVNULL)
+        try:
+            asyncio.run(wait_for_server(args.host, port))
+            answers, elapsed, latencies = asyncio.run(
+                load_test(args.host, port, args.clients, args.duration, args.seed))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    rate = answers / elapsed
+    stats = percentiles(latencies) if latencies else {}
+    print(f"{args.clients} clients, {elapsed:.1f}s: {answers} answers, {rate:,.0f} answers/s sustained")
+    print("  answer latency " + "  ".join(f"{k} {v / 1000:7.2f}ms" for k, v in stats.items()))
+    if args.min_rate is not None and rate < args.min_rate:
+        print(f"FAIL: {rate:,.0f} answers/s is below {args.min_rate:,.0f}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
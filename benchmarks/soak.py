@@ -0,0 +1,132 @@
+"""Long-session soak test: drives the real Tk app through many screen transitions.
+
+Fails if the Python heap (``tracemalloc``) or the number of Tcl commands keeps
+growing after warm-up, the signature of leaked bindings and callbacks. Also
+reports Space-to-next-card latency with and without the idle-time prefetch.
+Needs a display; on a headless machine run it under Xvfb:
+
+    xvfb-run python benchmarks/soak.py --transitions 20000
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tkinter as tk  # noqa: E402
+
+from engine import MODES  # noqa: E402
+from reuniclus import ReuniclusApp  # noqa: E402
+
+
+# ---------------------------- DRIVER ----------------------------
+def run_session(app, rng, multiple_choice, latencies):
+    """One full practice session through the UI handlers; returns transitions made.
+
+    Half the answers are followed by an idle pass, as when a learner reads the
+    feedback, so the next card is prefetched; ``latencies`` collects the
+    Space-to-next-card time for both cases.
+    """
+    app.multiple_choice_mode = multiple_choice
+    app.start_practice(rng.choice(MODES))
+    transitions = 1
+    while app.current_screen_name == "card":
+        if multiple_choice:
+            app.choose_option(rng.randrange(len(app.current_options)))
+        else:
+            right = rng.random() < 0.7
+            app.answer_var.set(app.engine.correct_answer() if right else "x")
+            app.check_answer()
+        idle = rng.random() < 0.5
+        if idle:
+            app.root.update_idletasks()
+        app.show_next_card()
+        latencies["prefetched" if idle else "cold"].append(app.last_transition_ms)
+        transitions += 2
+    return transitions
+
+
+def drive(app, rng, transitions, latencies=None):
+    """Sessions in both modes, with menu and reference chart visits in between"""
+    latencies = latencies if latencies is not None else {"cold": [], "prefetched": []}
+    done = 0
+    while done < transitions:
+        done += run_session(app, rng, rng.random() < 0.5, latencies)
+        app.show_reference()
+        app.create_main_menu()
+        done += 2
+        app.root.update()  # Let idle work (redraws, deferred command cleanup) run
+    return done
+
+
+def measure(app):
+    """``(traced heap bytes, Tcl command count, live managed bindings)`` after a full GC"""
+    app.root.update()
+    gc.collect()
+    heap, _ = tracemalloc.get_traced_memory()
+    commands = len(app.root.tk.splitlist(app.root.tk.call("info", "commands")))
+    return heap, commands, app.bindings.count()
+
+
+# ---------------------------- COMMAND LINE ----------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transitions", type=int, default=20000, help="Screen transitions to drive (default: 20000)")
+    parser.add_argument("--warmup", type=int, default=2000, help="Transitions before the baseline (default: 2000)")
+    parser.add_argument("--max-heap-growth-kb", type=float, default=256,
+                        help="Allowed heap growth after warm-up (default: 256 KB)")
+    parser.add_argument("--max-command-growth", type=int, default=5,
+                        help="Allowed Tcl command growth after warm-up (default: 5)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # Stats files and the glyph cache land in the throwaway directory
+        root = tk.Tk()
+        root.withdraw()
+        app = ReuniclusApp(root)
+        app.finish_startup()
+
+        tracemalloc.start(10)
+        drive(app, rng, args.warmup)
+        heap_before, commands_before, bindings_before = measure(app)
+        snapshot_before = tracemalloc.take_snapshot()
+
+        latencies = {"cold": [], "prefetched": []}
+        done = drive(app, rng, args.transitions, latencies)
+        heap_after, commands_after, bindings_after = measure(app)
+        snapshot_after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        app.exit_app()
+        os.chdir(os.path.dirname(tmp))
+
+    heap_growth_kb = (heap_after - heap_before) / 1024
+    command_growth = commands_after - commands_before
+    print(f"{done} transitions after {args.warmup} warm-up")
+    print(f"  heap      {heap_before / 1024:9.1f} KB -> {heap_after / 1024:9.1f} KB  ({heap_growth_kb:+.1f} KB)")
+    print(f"  tcl cmds  {commands_before:9d}    -> {commands_after:9d}     ({command_growth:+d})")
+    print(f"  bindings  {bindings_before:9d}    -> {bindings_after:9d}")
+    for name, samples in latencies.items():
+        ordered = sorted(samples) or [0.0]
+        print(f"  next card ({name:10}) p50 {ordered[len(ordered) // 2]:6.2f}ms  "
+              f"p95 {ordered[int(len(ordered) * 0.95)]:6.2f}ms")
+
+    failed = False
+    if heap_growth_kb > args.max_heap_growth_kb:
+        print(f"FAIL: heap grew {heap_growth_kb:.1f} KB (budget {args.max_heap_growth_kb:.0f} KB); top growth:")
+        for stat in snapshot_after.compare_to(snapshot_before, "traceback")[:5]:
+            print(f"  {stat.size_diff / 1024:+.1f} KB  {stat.traceback.format()[-1].strip()}")
+        failed = True
+    if command_growth > args.max_command_growth:
+        print(f"FAIL: {command_growth} Tcl commands leaked (budget {args.max_command_growth})")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
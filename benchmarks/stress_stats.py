@@ -0,0 +1,112 @@
+"""Stress test: several processes answering cards into the same JSON stats files.
+
+Each process runs its own ``StatsWriter`` (as each open Reuniclus window does)
+with a small compaction interval, so appends and snapshot rewrites from
+different processes interleave constantly. Fails unless the final stats, and
+the answer history, count every answer from every process exactly once.
+
+    python benchmarks/stress_stats.py --processes 6 --answers 2000
+"""
+import argparse
+import collections
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import stats_store  # noqa: E402
+from deck import hiragana_deck  # noqa: E402
+from stats_store import StatsJournal, StatsWriter, answer_record, default_stats  # noqa: E402
+
+
+# ---------------------------- WORKER ----------------------------
+def hammer(snapshot_path, journal_path, answers, compact_every, seed):
+    """Answer random cards into the shared files; returns what was answered"""
+    stats_store.COMPACT_EVERY = compact_every
+    rng = random.Random(seed)
+    keys = list(hiragana_deck().column("kana"))
+    store = StatsJournal(snapshot_path, journal_path)
+    stats = store.load(default_stats(keys))
+    writer = StatsWriter(store, stats)
+
+    counts = collections.Counter()
+    correct = collections.Counter()
+    streak = longest_streak = stats["streak"]  # A new window carries on the account's current streak
+    for _ in range(answers):
+        key = rng.choice(keys)
+        is_correct = rng.random() < 0.8
+        writer.submit(answer_record(key, is_correct, time.strftime("%Y-%m-%d %H:%M:%S"),
+                                    None if is_correct else "x"))
+        counts[key] += 1
+        correct[key] += is_correct
+        streak = streak + 1 if is_correct else 0
+        longest_streak = max(longest_streak, streak)
+        if rng.random() < 0.05:
+            time.sleep(rng.uniform(0, 0.002))  # Let the other writers get ahead
+    writer.close()
+    return counts, correct, longest_streak, writer.counters()
+
+
+# ---------------------------- COMMAND LINE ----------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=6)
+    parser.add_argument("--answers", type=int, default=2000, help="Answers per process (default: 2000)")
+    parser.add_argument("--compact-every", type=int, default=25,
+                        help="Compaction interval per writer (default: 25, far below the app's)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_path = os.path.join(tmp, "reuniclus_stats.json")
+        journal_path = os.path.join(tmp, "reuniclus_stats.journal")
+        start = time.perf_counter()
+        with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+            results = pool.starmap(hammer, [(snapshot_path, journal_path, args.answers, args.compact_every, seed)
+                                            for seed in range(args.processes)])
+        elapsed = time.perf_counter() - start
+        final_store = StatsJournal(snapshot_path, journal_path)
+        final = final_store.read(default_stats(()))
+        history = collections.Counter(record["k"] for record in final_store.history())
+
+    expected_counts = sum((counts for counts, _, _, _ in results), collections.Counter())
+    expected_correct = sum((correct for _, correct, _, _ in results), collections.Counter())
+    total = args.processes * args.answers
+    print(f"{args.processes} processes x {args.answers} answers in {elapsed:.2f}s "
+          f"({total / elapsed:.0f} answers/s)")
+    for index, (_, _, longest, counters) in enumerate(results):
+        print(f"  process {index}: {counters['writes']:5d} writes, max {counters['max_write_ms']:6.1f} ms, "
+              f"longest streak {longest}")
+
+    failures = []
+    if final["total_attempts"] != total:
+        failures.append(f"total_attempts {final['total_attempts']} != {total}")
+    if final["total_correct"] != sum(expected_correct.values()):
+        failures.append(f"total_correct {final['total_correct']} != {sum(expected_correct.values())}")
+    for key, attempts in expected_counts.items():
+        card = final["hiragana_stats"].get(key, {"correct": 0, "attempts": 0})
+        if (card["attempts"], card["correct"]) != (attempts, expected_correct[key]):
+            failures.append(f"{key}: {card['correct']}/{card['attempts']} != {expected_correct[key]}/{attempts}")
+    daily_attempts = sum(attempts for _, attempts in final.get("daily", {}).values())
+    if daily_attempts != total:
+        failures.append(f"daily attempts {daily_attempts} != {total}")
+    if history != expected_counts:
+        failures.append(f"history holds {sum(history.values())} answers, "
+                        f"{sum((history - expected_counts).values())} extra and "
+                        f"{sum((expected_counts - history).values())} missing")
+    longest = max(longest for _, _, longest, _ in results)
+    if final["longest_streak"] != longest:
+        failures.append(f"longest_streak {final['longest_streak']} != {longest}")
+
+    print(f"final: {final['total_correct']}/{final['total_attempts']} correct, "
+          f"longest streak {final['longest_streak']}")
+    for failure in failures[:10]:
+        print("FAIL:", failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+class BindingManager:
+    """Owns event bindings by scope (usually a screen) and releases them together.
+
+    tkinter registers a Tcl command for every Python callback it binds and only
+    deletes it when the widget is destroyed, and ``unbind`` leaves it behind. On
+    a long-lived root window, rebinding per card or per visit therefore grows
+    the interpreter for as long as the app runs. ``release`` removes exactly the
+    callbacks bound here and deletes their Tcl commands.
+    """
+
+    def __init__(self):
+        self._scopes = {}  # Scope -> [(widget, bind tag, sequence, funcid)]
+
+    def bind(self, scope, widget, sequence, callback):
+        """Bind ``callback`` on ``widget`` until ``scope`` is released"""
+        funcid = widget.bind(sequence, callback, add="+")
+        self._scopes.setdefault(scope, []).append((widget, str(widget), sequence, funcid))
+        return funcid
+
+    def bind_all(self, scope, widget, sequence, callback):
+        """Application-wide binding (``bind_all``) until ``scope`` is released"""
+        funcid = widget.bind_all(sequence, callback, add="+")
+        self._scopes.setdefault(scope, []).append((widget, "all", sequence, funcid))
+        return funcid
+
+    def replace(self, scope, widget, bindings):
+        """Release ``scope`` and bind ``{sequence: callback}`` on ``widget`` in its place"""
+        self.release(scope)
+        for sequence, callback in bindings.items():
+            self.bind(scope, widget, sequence, callback)
+
+    def release(self, scope):
+        """Unbind everything bound under ``scope`` and free the Tcl commands"""
+        for widget, tag, sequence, funcid in self._scopes.pop(scope, ()):
+            try:
+                script = widget.tk.call("bind", tag, sequence)
+                kept = [line for line in script.split("\n") if line and funcid not in line]
+                widget.tk.call("bind", tag, sequence, "\n".join(kept))
+                # The callback may be the one running right now (a key press that
+                # changes screens), so its command is deleted once Tk is idle
+                widget.after_idle(self._delete_command, widget, funcid)
+            except Exception:
+                pass  # Widget already destroyed along with its bindings
+
+    @staticmethod
+    def _delete_command(widget, funcid):
+        try:
+            widget.deletecommand(funcid)
+        except Exception:
+            pass
+
+    def release_all(self):
+        for scope in list(self._scopes):
+            self.release(scope)
+
+    def count(self):
+        """Live bindings across all scopes"""
+        return sum(len(bound) for bound in self._scopes.values())
@@ -0,0 +1,90 @@
+"""Progress dashboard figures, read straight from the aggregates in the stats dict.
+
+``apply_answer`` keeps per-card counters and per-day counts (``daily``) current
+as each answer arrives, so everything here is O(cards + days shown) no matter
+how many attempts are stored. Front ends only draw what ``dashboard`` returns.
+"""
+import heapq
+from datetime import date, timedelta
+
+# ---------------------------- CONSTANTS ----------------------------
+ROLLING_WINDOWS = (7, 30)  # Days of rolling accuracy shown
+ACTIVITY_DAYS = 30  # Days in the activity strip
+WEAKEST_COUNT = 8  # Weakest cards listed
+MIN_ATTEMPTS = 3  # Answers a card needs before it can rank among the weakest
+ROW_WIDTH = 5  # Cards per heatmap row for decks without sections
+
+
+# ---------------------------- FIGURES ----------------------------
+def accuracy(correct, attempts):
+    """Percentage, or ``None`` when nothing was answered"""
+    return correct / attempts * 100 if attempts else None
+
+
+def activity(daily, days=ACTIVITY_DAYS, today=None):
+    """``(day, correct, attempts)`` for each of the last ``days`` days, oldest first"""
+    today = today or date.today()
+    strip = []
+    for offset in range(days - 1, -1, -1):
+        day = (today - timedelta(days=offset)).isoformat()
+        correct, attempts = daily.get(day, (0, 0))
+        strip.append((day, correct, attempts))
+    return strip
+
+
+def rolling_accuracy(daily, days, today=None):
+    """``(correct, attempts, accuracy %)`` over the last ``days`` days, today included"""
+    correct = attempts = 0
+    for _, day_correct, day_attempts in activity(daily, days, today):
+        correct += day_correct
+        attempts += day_attempts
+    return correct, attempts, accuracy(correct, attempts)
+
+
+def grid_rows(deck):
+    """Card ids grouped into chart rows: the deck's sections, or runs of ``ROW_WIDTH``"""
+    starts = [start for _, start in deck.sections] or list(range(0, len(deck), ROW_WIDTH))
+    if starts and starts[0] != 0:
+        starts.insert(0, 0)
+    ends = starts[1:] + [len(deck)]
+    return [list(range(start, end)) for start, end in zip(starts, ends) if start < end]
+
+
+def heatmap(stats, deck):
+    """Per chart row, ``(kana, accuracy %, attempts)`` for each card (accuracy ``None`` if unseen)"""
+    per_card = stats["hiragana_stats"]
+    rows = []
+    for card_ids in grid_rows(deck):
+        cells = []
+        for card_id in card_ids:
+            counts = per_card.get(deck.key(card_id))
+            correct, attempts = (counts["correct"], counts["attempts"]) if counts else (0, 0)
+            cells.append((deck.kana(card_id), accuracy(correct, attempts), attempts))
+        rows.append(cells)
+    return rows
+
+
+def weakest_cards(stats, deck, count=WEAKEST_COUNT, min_attempts=MIN_ATTEMPTS):
+    """The ``count`` lowest-accuracy cards as ``(kana, romaji, accuracy %, attempts)``"""
+    per_card = stats["hiragana_stats"]
+    ranked = []
+    for card_id, key in enumerate(deck.keys()):
+        counts = per_card.get(key)
+        if counts and counts["attempts"] >= min_attempts:
+            ranked.append((counts["correct"] / counts["attempts"], -counts["attempts"], card_id))
+    return [(deck.kana(card_id), deck.romaji(card_id), ratio * 100, -negative_attempts)
+            for ratio, negative_attempts, card_id in heapq.nsmallest(count, ranked)]
+
+
+def dashboard(stats, deck, today=None):
+    """Everything the dashboard screen shows, for the current deck"""
+    daily = stats.get("daily", {})
+    seen = sum(1 for key in deck.keys() if stats["hiragana_stats"].get(key, {}).get("attempts"))
+    return {
+        "rolling": [(days,) + rolling_accuracy(daily, days, today) for days in ROLLING_WINDOWS],
+        "activity": activity(daily, ACTIVITY_DAYS, today),
+        "heatmap": heatmap(stats, deck),
+        "weakest": weakest_cards(stats, deck),
+        "seen": seen,
+        "cards": len(deck),
+    }
@@ -0,0 +1,245 @@
+import argparse
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+
+# ---------------------------- CONSTANTS ----------------------------
+DECK_MAGIC = b"RDCK"
+DECK_VERSION = 1
+DECK_FIELDS = ("kana", "romaji")  # Field order of every card in a deck
+ID_FIELD = "id"  # Optional third field: a stable card ID, used as the stats key instead of the kana
+HEADER = struct.Struct("<4sHHII")  # magic, version, field count, card count, metadata length
+
+# ---------------------------- BUILT-IN DATA ----------------------------
+HIRAGANA_ROWS = [
+    ("あ", "a"), ("い", "i"), ("う", "u"), ("え", "e"), ("お", "o"),
+    ("か", "ka"), ("き", "ki"), ("く", "ku"), ("け", "ke"), ("こ", "ko"),
+    ("さ", "sa"), ("し", "shi"), ("す", "su"), ("せ", "se"), ("そ", "so"),
+    ("た", "ta"), ("ち", "chi"), ("つ", "tsu"), ("て", "te"), ("と", "to"),
+    ("な", "na"), ("に", "ni"), ("ぬ", "nu"), ("ね", "ne"), ("の", "no"),
+    ("は", "ha"), ("ひ", "hi"), ("ふ", "fu"), ("へ", "he"), ("ほ", "ho"),
+    ("ま", "ma"), ("み", "mi"), ("む", "mu"), ("め", "me"), ("も", "mo"),
+    ("や", "ya"), ("ゆ", "yu"), ("よ", "yo"),
+    ("ら", "ra"), ("り", "ri"), ("る", "ru"), ("れ", "re"), ("ろ", "ro"),
+    ("わ", "wa"), ("を", "wo"), ("ん", "n"),
+]
+
+# Reference chart section headers as (title, first card index)
+HIRAGANA_SECTIONS = [
+    ("Basic Hiragana Characters", 0), ("K-row Characters", 5),
+    ("S-row Characters", 10), ("T-row Characters", 15),
+    ("N-row Characters", 20), ("H-row Characters", 25),
+    ("M-row Characters", 30), ("Y-row Characters", 35),
+    ("R-row Characters", 38), ("W-row Characters & N", 43),
+]
+
+
+# ---------------------------- DECK ----------------------------
+class Deck:
+    """Read-only card deck stored as one UTF-8 string blob plus an offsets table.
+
+    Cards are addressed by integer ID (their position in the deck). Strings are
+    decoded from the blob on access and interned, so a deck loaded from disk via
+    ``mmap`` costs roughly the same memory whether it holds 46 or 46,000 cards.
+    Stats are kept per ``key``, which survives reordering and re-importing.
+    """
+
+    __slots__ = ("name", "fields", "sections", "_count", "_width", "_offsets", "_blob", "_mmap")
+
+    def __init__(self, name, fields, sections, count, offsets, blob, mapping=None):
+        self.name = name
+        self.fields = tuple(fields)
+        self.sections = [tuple(section) for section in sections]
+        self._count = count
+        self._width = len(self.fields)
+        self._offsets = offsets  # count * width + 1 byte offsets into the blob
+        self._blob = blob
+        self._mmap = mapping
+
+    @classmethod
+    def from_rows(cls, name, rows, sections=(), fields=DECK_FIELDS):
+        """Build an in-memory deck from an iterable of field tuples"""
+        offsets = array("I", [0])
+        blob = bytearray()
+        count = 0
+        for row in rows:
+            if len(row) != len(fields):
+                raise ValueError(f"Expected {len(fields)} fields per card, got {row!r}")
+            for value in row:
+                blob += value.encode("utf-8")
+                offsets.append(len(blob))
+            count += 1
+        return cls(name, fields, sections, count, offsets, bytes(blob))
+
+    @classmethod
+    def load(cls, path):
+        """Map a binary deck file into memory without decoding its cards"""
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, width, count, meta_length = HEADER.unpack_from(mapping, 0)
+        if magic != DECK_MAGIC or version != DECK_VERSION:
+            mapping.close()
+            raise ValueError(f"{path} is not a version {DECK_VERSION} Reuniclus deck")
+
+        meta_start = HEADER.size
+        meta = json.loads(mapping[meta_start:meta_start + meta_length].decode("utf-8"))
+        offsets_start = _align(meta_start + meta_length)
+        offsets_end = offsets_start + (count * width + 1) * 4
+        offsets = memoryview(mapping)[offsets_start:offsets_end]
+        if sys.byteorder == "little":
+            offsets = offsets.cast("I")  # Zero-copy view straight into the mapped file
+        else:
+            offsets = array("I", offsets.tobytes())
+            offsets.byteswap()
+        blob = memoryview(mapping)[offsets_end:]
+        return cls(meta["name"], meta["fields"], meta.get("sections", []), count, offsets, blob, mapping)
+
+    def save(self, path):
+        """Write the deck in the compact binary format read by ``Deck.load``"""
+        with open(path, "wb") as f:
+            _write_deck(f, self.name, self.fields, self.sections, self._count, self._offsets)
+            f.write(self._blob[:self._offsets[-1]])
+
+    def close(self):
+        """Release the file mapping of a deck opened with ``Deck.load``"""
+        if self._mmap is not None:
+            if isinstance(self._offsets, memoryview):
+                self._offsets.release()
+            self._blob.release()
+            self._mmap.close()
+            self._mmap = None
+
+    def __len__(self):
+        return self._count
+
+    def value(self, card_id, field_index):
+        """Decode one field of one card"""
+        if not 0 <= card_id < self._count:
+            raise IndexError(f"Card {card_id} is not in deck {self.name!r}")
+        slot = card_id * self._width + field_index
+        return sys.intern(str(self._blob[self._offsets[slot]:self._offsets[slot + 1]], "utf-8"))
+
+    def field(self, card_id, name):
+        """Decode the named field of one card"""
+        return self.value(card_id, self.fields.index(name))
+
+    def kana(self, card_id):
+        """The kana face of a card"""
+        return self.value(card_id, 0)
+
+    def key(self, card_id):
+        """The stable ID stats are kept under: the ``id`` field if the deck has one, else the kana"""
+        return self.value(card_id, self._width - 1 if self.fields[-1] == ID_FIELD else 0)
+
+    def keys(self):
+        """Yield every card's stats key in ID order"""
+        return self.column(ID_FIELD if self.fields[-1] == ID_FIELD else "kana")
+
+    def romaji(self, card_id):
+        """The romaji reading of a card"""
+        return self.value(card_id, 1)
+
+    def column(self, name):
+        """Yield one field for every card in ID order"""
+        field_index = self.fields.index(name)
+        for card_id in range(self._count):
+            yield self.value(card_id, field_index)
+
+
+class DeckBuilder:
+    """Writes a deck file from rows as they arrive, without holding the cards in memory.
+
+    Strings go straight to a temporary blob file; only the offsets table (4 bytes
+    per field) is kept until ``finish`` assembles the deck.
+    """
+
+    def __init__(self, name, fields=DECK_FIELDS):
+        self.name = name
+        self.fields = tuple(fields)
+        self.sections = []
+        self.count = 0
+        self._offsets = array("I", [0])
+        self._blob = tempfile.TemporaryFile()
+
+    def add(self, row, section=None):
+        """Append one card; a new ``section`` title starts a reference chart section here"""
+        if len(row) != len(self.fields):
+            raise ValueError(f"Expected {len(self.fields)} fields per card, got {row!r}")
+        if section and (not self.sections or self.sections[-1][0] != section):
+            self.sections.append((section, self.count))
+        end = self._offsets[-1]
+        for value in row:
+            data = value.encode("utf-8")
+            self._blob.write(data)
+            end += len(data)
+            self._offsets.append(end)
+        self.count += 1
+
+    def finish(self, path):
+        """Write the deck file (via a temp file and an atomic rename)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            _write_deck(f, self.name, self.fields, self.sections, self.count, self._offsets)
+            self._blob.seek(0)
+            shutil.copyfileobj(self._blob, f)
+        os.replace(tmp_path, path)
+        self.close()
+
+    def close(self):
+        self._blob.close()
+
+
+def _write_deck(f, name, fields, sections, count, offsets):
+    """Header, metadata and offsets table; the blob follows"""
+    meta = json.dumps({"name": name, "fields": list(fields), "sections": sections},
+                      ensure_ascii=False).encode("utf-8")
+    offsets = array("I", offsets)
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    f.write(HEADER.pack(DECK_MAGIC, DECK_VERSION, len(fields), count, len(meta)))
+    f.write(meta)
+    f.write(b"\0" * (_align(HEADER.size + len(meta)) - HEADER.size - len(meta)))
+    f.write(offsets.tobytes())
+
+
+def _align(offset, boundary=4):
+    return (offset + boundary - 1) // boundary * boundary
+
+
+def hiragana_deck():
+    """The built-in basic hiragana deck"""
+    return Deck.from_rows("Hiragana", HIRAGANA_ROWS, HIRAGANA_SECTIONS)
+
+
+def read_tsv_rows(path):
+    """Read ``kana<TAB>romaji[<TAB>section]`` lines, collecting section starts"""
+    rows, sections = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) < 2 or not parts[0]:
+                continue
+            if len(parts) > 2 and parts[2] and (not sections or sections[-1][0] != parts[2]):
+                sections.append((parts[2], len(rows)))
+            rows.append((parts[0], parts[1]))
+    return rows, sections
+
+
+# ---------------------------- COMMAND LINE ----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a binary Reuniclus deck file")
+    parser.add_argument("source", help="TSV file with kana, romaji and an optional section column")
+    parser.add_argument("output", help="Deck file to write")
+    parser.add_argument("--name", help="Deck name shown in the app (default: source file name)")
+    args = parser.parse_args()
+
+    rows, sections = read_tsv_rows(args.source)
+    name = args.name or os.path.splitext(os.path.basename(args.source))[0]
+    Deck.from_rows(name, rows, sections).save(args.output)
+    print(f"Wrote {len(rows)} cards to {args.output}")
@@ -0,0 +1,412 @@
+"""Streaming deck import and export: CSV/TSV, Anki packages and Reuniclus packages.
+
+Rows flow through a generator pipeline (read, validate, de-duplicate, write) into
+a ``DeckBuilder``, so memory stays flat however large the file: only a small
+digest per card is kept to spot duplicates. Every card gets a stable ID, which
+the stats store keys on: the source's ``id`` column (or the Anki note ID) when
+there is one, otherwise the kana. Exports carry those IDs plus, optionally, the
+per-card stats, so a deck and its stats round-trip through a ``.rpkg`` package
+(a zip holding ``deck.json`` and ``cards.tsv``) or a plain CSV/TSV file::
+
+    python deck_io.py import vocabulary.csv vocabulary.rdk
+    python deck_io.py export vocabulary.rdk backup.rpkg --stats reuniclus_stats.json
+"""
+import argparse
+import csv
+import hashlib
+import html
+import io
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unicodedata
+import zipfile
+
+from deck import DECK_FIELDS, ID_FIELD, Deck, DeckBuilder
+from deck_registry import DECKS_DIR
+
+# ---------------------------- CONSTANTS ----------------------------
+PROGRESS_EVERY = 1000  # Rows between progress callbacks
+MAX_FIELD_LENGTH = 200  # Characters per field
+MAX_REPORTED_ERRORS = 50  # Rejected rows listed in a report (all are counted)
+PACKAGE_META = "deck.json"
+PACKAGE_CARDS = "cards.tsv"
+EXPORT_COLUMNS = ["id", "kana", "romaji", "section"]
+STATS_COLUMNS = ["correct", "attempts", "srs"]
+
+# Header names understood on import, mapped to our columns
+COLUMN_ALIASES = {
+    "id": "id", "card_id": "id", "guid": "id",
+    "kana": "kana", "hiragana": "kana", "katakana": "kana", "front": "kana", "question": "kana",
+    "romaji": "romaji", "reading": "romaji", "back": "romaji", "answer": "romaji",
+    "section": "section", "group": "section", "tags": "section",
+    "correct": "correct", "attempts": "attempts", "srs": "srs",
+}
+POSITIONAL_COLUMNS = ["kana", "romaji", "section"]  # Files without a header row
+HTML_TAG = re.compile(r"<[^>]+>")
+
+
+class ImportCancelled(Exception):
+    pass
+
+
+class DeckReport:
+    """Counts and the first few problems from one import or export"""
+
+    def __init__(self):
+        self.read = 0
+        self.written = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.errors = []  # (line, message), at most MAX_REPORTED_ERRORS
+        self.stats = []  # (key, counts) carried by the source, for the stats store
+        self.name = None
+        self.path = None  # File written
+        self.seconds = 0.0
+
+    def reject(self, line, message):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+    def summary(self):
+        text = (f"{self.written} cards from {self.read} rows ({self.duplicates} duplicates skipped, "
+                f"{self.rejected} rejected) in {self.seconds:.1f}s")
+        if self.stats:
+            text += f"; stats for {len(self.stats)} cards"
+        return text
+
+
+# ---------------------------- READING ----------------------------
+def read_rows(path, progress=None):
+    """Yield raw row dicts (``line``, ``kana``, ``romaji``, optional ``id``/``section``/stats)"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".apkg", ".colpkg"):
+        yield from read_anki(path, progress)
+    elif extension == ".rpkg":
+        with zipfile.ZipFile(path) as package, package.open(PACKAGE_CARDS) as f:
+            total = package.getinfo(PACKAGE_CARDS).file_size
+            yield from read_delimited(_counted_lines(f, total, progress), "\t")
+    else:
+        with open(path, "rb") as f:
+            delimiter = "," if extension == ".csv" else "\t"
+            yield from read_delimited(_counted_lines(f, os.path.getsize(path), progress), delimiter)
+
+
+def read_delimited(lines, delimiter):
+    """Rows of a CSV/TSV stream; a header row is recognised by its column names"""
+    columns = None
+    for number, cells in enumerate(csv.reader(lines, delimiter=delimiter), start=1):
+        if not cells or not any(cells) or cells[0].startswith("#"):
+            continue  # Blank, or a comment/directive line as in Anki text exports
+        if columns is None:
+            names = [COLUMN_ALIASES.get(cell.strip().lower()) for cell in cells]
+            if "kana" in names and "romaji" in names:
+                columns = names
+                continue
+            columns = POSITIONAL_COLUMNS
+        row = {"line": number}
+        for name, cell in zip(columns, cells):
+            if name is not None:
+                row[name] = cell
+        yield row
+
+
+def read_anki(path, progress=None):
+    """Notes of an Anki package: first field as the kana, second as the reading"""
+    with zipfile.ZipFile(path) as package:
+        names = package.namelist()
+        member = next((name for name in ("collection.anki21", "collection.anki2") if name in names), None)
+        if member is None:
+            raise ValueError("Unsupported Anki package (export it with \"Support older Anki versions\")")
+        with tempfile.TemporaryDirectory() as tmp:
+            collection = package.extract(member, tmp)
+            db = sqlite3.connect(collection)
+            try:
+                total = db.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+                for number, (note_id, fields, tags) in enumerate(
+                        db.execute("SELECT id, flds, tags FROM notes ORDER BY id"), start=1):
+                    fields = fields.split("\x1f")
+                    yield {"line": number, "id": f"anki-{note_id}", "kana": _plain(fields[0]),
+                           "romaji": _plain(fields[1]) if len(fields) > 1 else "",
+                           "section": tags.split()[0] if tags.split() else ""}
+                    if progress is not None and number % PROGRESS_EVERY == 0:
+                        progress(number, total)
+            finally:
+                db.close()
+
+
+def _plain(field):
+    """Anki fields are HTML; keep the text"""
+    return html.unescape(HTML_TAG.sub("", field.replace("<br>", " ")))
+
+
+def _counted_lines(f, total, progress):
+    """Decode a binary stream line by line, reporting bytes read"""
+    done = 0
+    for number, raw in enumerate(f, start=1):
+        done += len(raw)
+        yield raw.decode("utf-8-sig" if number == 1 else "utf-8")
+        if progress is not None and number % PROGRESS_EVERY == 0:
+            progress(done, total)
+    if progress is not None:
+        progress(done, total)
+
+
+# ---------------------------- PIPELINE ----------------------------
+def validate(rows, report):
+    """Normalise fields and drop rows that can't become cards"""
+    for row in rows:
+        report.read += 1
+        for name in ("id", "kana", "romaji", "section"):
+            value = row.get(name)
+            if value is not None:
+                row[name] = unicodedata.normalize("NFC", " ".join(value.split()))
+        if not row.get("kana") or not row.get("romaji"):
+            report.reject(row["line"], "missing kana or romaji")
+            continue
+        if any(len(row.get(name) or "") > MAX_FIELD_LENGTH for name in ("id", "kana", "romaji", "section")):
+            report.reject(row["line"], f"field longer than {MAX_FIELD_LENGTH} characters")
+            continue
+        try:
+            row["stats"] = _row_stats(row)
+        except ValueError as e:
+            report.reject(row["line"], f"bad stats: {e}")
+            continue
+        yield row
+
+
+def _row_stats(row):
+    """Per-card stats carried by an exported row, or ``None``"""
+    attempts = int(row.get("attempts") or 0)
+    if not attempts:
+        return None
+    counts = {"correct": int(row.get("correct") or 0), "attempts": attempts}
+    if not 0 <= counts["correct"] <= counts["attempts"]:
+        raise ValueError("correct must be between 0 and attempts")
+    if row.get("srs"):
+        counts["srs"] = json.loads(row["srs"])
+    return counts
+
+
+def dedupe(rows, report):
+    """Drop repeated cards; a different card reusing an ID is rejected (first one wins)"""
+    seen = {}  # Digest of the card ID -> digest of its content
+    for row in rows:
+        row["id"] = row.get("id") or row["kana"]
+        key = _digest(row["id"])
+        content = _digest(row["kana"] + "\t" + row["romaji"])
+        earlier = seen.get(key)
+        if earlier is None:
+            seen[key] = content
+            yield row
+        elif earlier == content:
+            report.duplicates += 1
+        else:
+            report.reject(row["line"], f"ID {row['id']!r} already used by a different card")
+
+
+def _digest(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+
+
+def import_deck(source, output, name=None, progress=None, cancelled=None):
+    """Stream ``source`` (CSV, TSV, .apkg or .rpkg) into the deck file ``output``.
+
+    ``progress(done, total)`` is called every ``PROGRESS_EVERY`` rows and
+    ``cancelled()`` is checked as often; a cancelled import leaves no file behind.
+    Stats found in the source are returned in ``report.stats`` for the caller to
+    hand to its stats store (``import_cards``).
+    """
+    start = time.perf_counter()
+    report = DeckReport()
+    report.path = output
+    report.name = name or _package_name(source) or os.path.splitext(os.path.basename(source))[0]
+    builder = DeckBuilder(report.name, DECK_FIELDS + (ID_FIELD,))
+    try:
+        for row in dedupe(validate(read_rows(source, progress), report), report):
+            if cancelled is not None and report.read % PROGRESS_EVERY == 0 and cancelled():
+                raise ImportCancelled()
+            builder.add((row["kana"], row["romaji"], row["id"]), row.get("section"))
+            if row["stats"] is not None:
+                report.stats.append((row["id"], row["stats"]))
+        if not builder.count:
+            raise ValueError("No usable cards found")
+        builder.finish(output)
+    finally:
+        builder.close()
+    report.written = builder.count
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def _package_name(path):
+    if not path.lower().endswith(".rpkg"):
+        return None
+    with zipfile.ZipFile(path) as package:
+        return json.loads(package.read(PACKAGE_META)).get("name")
+
+
+# ---------------------------- EXPORT ----------------------------
+def export_deck(deck, output, stats=None, progress=None, cancelled=None):
+    """Write ``deck`` (and per-card ``stats``, if given) as CSV, TSV or a .rpkg package"""
+    start = time.perf_counter()
+    report = DeckReport()
+    report.path = output
+    report.name = deck.name
+    columns = EXPORT_COLUMNS + (STATS_COLUMNS if stats is not None else [])
+    extension = os.path.splitext(output)[1].lower()
+
+    tmp_path = f"{output}.tmp"
+    try:
+        if extension == ".rpkg":
+            with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as package:
+                package.writestr(PACKAGE_META, json.dumps({"name": deck.name, "cards": len(deck)},
+                                                          ensure_ascii=False))
+                with package.open(PACKAGE_CARDS, "w") as raw, \
+                        io.TextIOWrapper(raw, encoding="utf-8", newline="") as f:
+                    _write_rows(f, "\t", columns, deck, stats, report, progress, cancelled)
+        else:
+            with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                _write_rows(f, "," if extension == ".csv" else "\t", columns, deck, stats, report,
+                            progress, cancelled)
+        os.replace(tmp_path, output)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def _write_rows(f, delimiter, columns, deck, stats, report, progress, cancelled):
+    writer = csv.writer(f, delimiter=delimiter, lineterminator="\n")
+    writer.writerow(columns)
+    section_starts = {start: title for title, start in deck.sections}
+    per_card = (stats or {}).get("hiragana_stats", {})
+    states = (stats or {}).get("srs", {})
+    section = ""
+    for card_id in range(len(deck)):
+        section = section_starts.get(card_id, section)
+        key = deck.key(card_id)
+        row = [key, deck.kana(card_id), deck.romaji(card_id), section]
+        if stats is not None:
+            counts = per_card.get(key, {})
+            state = states.get(key)
+            row += [counts.get("correct", 0), counts.get("attempts", 0), json.dumps(state) if state else ""]
+        writer.writerow(row)
+        report.read += 1
+        report.written += 1
+        if (card_id + 1) % PROGRESS_EVERY == 0:
+            if progress is not None:
+                progress(card_id + 1, len(deck))
+            if cancelled is not None and cancelled():
+                raise ImportCancelled()
+    if progress is not None:
+        progress(len(deck), len(deck))
+
+
+# ---------------------------- BACKGROUND JOBS ----------------------------
+class DeckJob:
+    """Runs ``import_deck`` or ``export_deck`` on a worker thread.
+
+    The UI polls ``progress`` (a ``(done, total)`` pair) and ``finished`` from
+    ``after`` callbacks; once finished, ``report`` or ``error`` is set.
+    """
+
+    def __init__(self, function, *args, **kwargs):
+        self.progress = (0, 0)
+        self.report = None
+        self.error = None
+        self.finished = False
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(function, args, kwargs),
+                                        name="reuniclus-deck-io", daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def fraction(self):
+        done, total = self.progress
+        return min(done / total, 1.0) if total else 0.0
+
+    def _run(self, function, args, kwargs):
+        try:
+            self.report = function(*args, progress=self._progress, cancelled=self._cancel.is_set, **kwargs)
+        except Exception as e:
+            self.error = e
+        self.finished = True
+
+    def _progress(self, done, total):
+        self.progress = (done, total)  # A single assignment, so the UI thread never sees half an update
+
+
+def imported_deck_path(source, decks_dir=DECKS_DIR):
+    """Where the app stores the deck imported from ``source``"""
+    os.makedirs(decks_dir, exist_ok=True)
+    stem = re.sub(r"[^\w.-]+", "_", os.path.splitext(os.path.basename(source))[0]) or "deck"
+    return os.path.join(decks_dir, f"{stem}.rdk")
+
+
+def load_stats_file(path):
+    """The stats dict of a JSON stats file or a SQLite stats database"""
+    from stats_store import StatsJournal, default_stats
+    if path.endswith((".sqlite", ".db")):
+        from stats_sqlite import SqliteStatsStore
+        store = SqliteStatsStore(path)
+        stats = store.load(default_stats(()))
+    else:
+        store = StatsJournal(path, os.path.splitext(path)[0] + ".journal")
+        stats = store.read(default_stats(()))
+    store.close()
+    return stats
+
+
+def open_stats_store(path):
+    from stats_store import StatsJournal
+    if path.endswith((".sqlite", ".db")):
+        from stats_sqlite import SqliteStatsStore
+        return SqliteStatsStore(path)
+    return StatsJournal(path, os.path.splitext(path)[0] + ".journal")
+
+
+# ---------------------------- COMMAND LINE ----------------------------
+def _print_progress(done, total):
+    if total:
+        print(f"\r{done / total:6.1%}", end="", file=sys.stderr, flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import and export Reuniclus decks")
+    commands = parser.add_subparsers(dest="command", required=True)
+    importer = commands.add_parser("import", help="CSV/TSV/.apkg/.rpkg -> binary deck")
+    importer.add_argument("source")
+    importer.add_argument("output", help="Deck file to write (.rdk)")
+    importer.add_argument("--name", help="Deck name shown in the app (default: from the source)")
+    importer.add_argument("--stats", help="Add stats carried by the source to this stats file (.json or .sqlite)")
+    exporter = commands.add_parser("export", help="Binary deck -> CSV/TSV/.rpkg")
+    exporter.add_argument("deck", help="Deck file (.rdk), or 'hiragana' for the built-in deck")
+    exporter.add_argument("output", help="File to write (.csv, .tsv or .rpkg)")
+    exporter.add_argument("--stats", help="Include per-card stats from this stats file (.json or .sqlite)")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        report = import_deck(args.source, args.output, args.name, _print_progress)
+        print(f"\r{report.name}: {report.summary()}")
+        for line, message in report.errors:
+            print(f"  row {line}: {message}")
+        if args.stats and report.stats:
+            store = open_stats_store(args.stats)
+            print(f"Added stats for {store.import_cards(report.stats)} cards to {args.stats}")
+            store.close()
+    else:
+        from deck import hiragana_deck
+        deck = hiragana_deck() if args.deck == "hiragana" else Deck.load(args.deck)
+        stats = load_stats_file(args.stats) if args.stats else None
+        report = export_deck(deck, args.output, stats, _print_progress)
+        print(f"\rWrote {report.written} cards to {args.output} in {report.seconds:.1f}s")
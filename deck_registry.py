@@ -0,0 +1,197 @@
+"""Every deck the app can offer, declared up front and built on first use.
+
+Built-in decks are metadata only (a title plus the card sets they combine)
+until a learner selects one; deck files are just a path. Selecting a deck
+materializes its cards once and gives it an index cache that every engine
+studying it shares (distractor and answer tables), plus a slot for the
+reference chart layout, so switching back and forth costs nothing after the
+first visit. Those indexes belong to one deck, as they are keyed by its card
+IDs, so the mixed deck builds its own rather than reusing the Hiragana and
+Katakana decks'. What decks do share is their card sets: each (script, card set)
+section list is built once for every deck that contains it. Stats are kept per
+kana, so あ has one history whether it is studied in the Hiragana deck or the
+mixed one.
+"""
+import argparse
+import functools
+import os
+
+from deck import HIRAGANA_ROWS, HIRAGANA_SECTIONS, Deck
+from romaji import SMALL_YA, YOON, to_katakana
+
+# ---------------------------- CONSTANTS ----------------------------
+DECKS_DIR = "reuniclus_decks"  # Where the app keeps imported decks
+DEFAULT_DECK = "hiragana"
+SCRIPTS = {"hiragana": "Hiragana", "katakana": "Katakana"}  # Script -> title
+
+# ---------------------------- CARD SETS ----------------------------
+# Sections of (title, rows) in hiragana; katakana versions are shifted from these
+DAKUTEN_SECTIONS = [
+    ("G-row Dakuten", [("が", "ga"), ("ぎ", "gi"), ("ぐ", "gu"), ("げ", "ge"), ("ご", "go")]),
+    ("Z-row Dakuten", [("ざ", "za"), ("じ", "ji"), ("ず", "zu"), ("ぜ", "ze"), ("ぞ", "zo")]),
+    ("D-row Dakuten", [("だ", "da"), ("ぢ", "ji"), ("づ", "zu"), ("で", "de"), ("ど", "do")]),
+    ("B-row Dakuten", [("ば", "ba"), ("び", "bi"), ("ぶ", "bu"), ("べ", "be"), ("ぼ", "bo")]),
+    ("P-row Handakuten", [("ぱ", "pa"), ("ぴ", "pi"), ("ぷ", "pu"), ("ぺ", "pe"), ("ぽ", "po")]),
+]
+YOON_SKIP = {"dy"}  # ぢゃ/ぢゅ/ぢょ are too rare to drill
+
+
+def basic_sections():
+    """The basic gojūon chart as (title, rows) sections"""
+    starts = [start for _, start in HIRAGANA_SECTIONS] + [len(HIRAGANA_ROWS)]
+    return [(title, HIRAGANA_ROWS[start:end]) for (title, start), end in zip(HIRAGANA_SECTIONS, starts[1:])]
+
+
+def yoon_sections():
+    """Contracted sounds (きゃ, しゅ, ちょ ...) built from the transliteration table"""
+    sections = []
+    for spellings, kana in YOON:
+        consonant = spellings[0]  # Hepburn
+        if consonant in YOON_SKIP:
+            continue
+        rows = [(kana + small, consonant + vowel) for vowel, small in SMALL_YA.items()]
+        sections.append((f"{consonant.upper()}-row Yōon", rows))
+    return sections
+
+
+CARD_SETS = {"basic": basic_sections, "dakuten": lambda: DAKUTEN_SECTIONS, "yoon": yoon_sections}
+
+# Built-in decks as (name, title, [(script, card set)])
+BUILT_IN_DECKS = [
+    ("hiragana", "Hiragana", [("hiragana", "basic")]),
+    ("katakana", "Katakana", [("katakana", "basic")]),
+    ("hiragana-dakuten", "Hiragana Dakuten & Handakuten", [("hiragana", "dakuten")]),
+    ("katakana-dakuten", "Katakana Dakuten & Handakuten", [("katakana", "dakuten")]),
+    ("hiragana-yoon", "Hiragana Yōon", [("hiragana", "yoon")]),
+    ("katakana-yoon", "Katakana Yōon", [("katakana", "yoon")]),
+    ("mixed", "Hiragana + Katakana", [("hiragana", "basic"), ("katakana", "basic")]),
+    ("all-kana", "All Kana", [(script, card_set) for script in SCRIPTS for card_set in CARD_SETS]),
+]
+
+
+# ---------------------------- REGISTRY ----------------------------
+class DeckSpec:
+    """What the registry knows about a deck before it is built"""
+
+    __slots__ = ("name", "title", "build")
+
+    def __init__(self, name, title, build):
+        self.name = name
+        self.title = title
+        self.build = build  # Called with no arguments; returns a Deck
+
+
+class LoadedDeck:
+    """A materialized deck plus the tables built for it so far"""
+
+    __slots__ = ("name", "deck", "indexes", "chart")
+
+    def __init__(self, name, deck):
+        self.name = name
+        self.deck = deck
+        self.indexes = {}  # Shared by every QuizEngine on this deck (not across decks: keyed by card ID)
+        self.chart = None  # Reference chart layout, filled in by the front end
+
+
+class DeckRegistry:
+    """Decks by name, in menu order; nothing is built until ``get``"""
+
+    def __init__(self, built_in=BUILT_IN_DECKS):
+        self.specs = {}
+        self._loaded = {}
+        self._sections = {}  # (script, card set) -> sections, shared by the decks that contain them
+        self._retired = []  # Replaced deck files, closed with the registry
+        for name, title, parts in built_in:
+            self.register(name, title, functools.partial(self._build_kana_deck, title, parts))
+
+    def register(self, name, title, build):
+        """Declare a deck; registering a name again replaces it (rebuilt on next ``get``)"""
+        self.specs[name] = DeckSpec(name, title, build)
+        stale = self._loaded.pop(name, None)
+        if stale is not None:
+            self._retired.append(stale)  # May still be on screen until the caller switches away
+        return name
+
+    def register_file(self, path, title=None):
+        """Declare a binary deck file (not opened until selected); returns its name"""
+        title = title or os.path.splitext(os.path.basename(path))[0]
+        return self.register(os.path.abspath(path), title, functools.partial(Deck.load, path))
+
+    def register_directory(self, directory=DECKS_DIR):
+        """Declare every ``.rdk`` deck file in a directory, if it exists"""
+        try:
+            names = sorted(os.listdir(directory))
+        except FileNotFoundError:
+            return
+        for name in names:
+            if name.endswith(".rdk"):
+                self.register_file(os.path.join(directory, name))
+
+    def __contains__(self, name):
+        return name in self.specs
+
+    def titles(self):
+        """``(name, title)`` of every deck in menu order"""
+        return [(spec.name, spec.title) for spec in self.specs.values()]
+
+    def is_loaded(self, name):
+        return name in self._loaded
+
+    def get(self, name):
+        """The ``LoadedDeck`` for ``name``, building it the first time"""
+        loaded = self._loaded.get(name)
+        if loaded is None:
+            loaded = self._loaded[name] = LoadedDeck(name, self.specs[name].build())
+        return loaded
+
+    def close(self):
+        """Release every deck file this registry opened"""
+        for loaded in list(self._loaded.values()) + self._retired:
+            loaded.deck.close()
+        self._loaded.clear()
+        self._retired.clear()
+
+    # ---------------------------- BUILT-IN DECKS ----------------------------
+    def sections(self, script, card_set):
+        """One card set in one script as (title, rows) sections, built once"""
+        key = (script, card_set)
+        sections = self._sections.get(key)
+        if sections is None:
+            sections = CARD_SETS[card_set]()
+            if script == "katakana":
+                sections = [(title, [(to_katakana(kana), romaji) for kana, romaji in rows])
+                            for title, rows in sections]
+            self._sections[key] = sections
+        return sections
+
+    def _build_kana_deck(self, title, parts):
+        rows, starts = [], []
+        for script, card_set in parts:
+            for section, section_rows in self.sections(script, card_set):
+                if script == "katakana":
+                    section = section.replace("Hiragana", "Katakana")
+                if len(parts) > 1 and SCRIPTS[script] not in section:
+                    section = f"{SCRIPTS[script]}: {section}"
+                starts.append((section, len(rows)))
+                rows += section_rows
+        return Deck.from_rows(title, rows, starts)
+
+
+# ---------------------------- COMMAND LINE ----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List the decks Reuniclus offers, or save one as a deck file")
+    parser.add_argument("name", nargs="?", help="Deck to save (see the list)")
+    parser.add_argument("output", nargs="?", help="Deck file to write")
+    args = parser.parse_args()
+
+    registry = DeckRegistry()
+    registry.register_directory()
+    if not args.name:
+        for name, title in registry.titles():
+            print(f"{name:20} {title}")
+    elif args.name not in registry or not args.output:
+        parser.error("give a deck name from the list and an output file")
+    else:
+        deck = registry.get(args.name).deck
+        deck.save(args.output)
+        print(f"Wrote {len(deck)} cards to {args.output}")
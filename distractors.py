@@ -0,0 +1,146 @@
+import itertools
+import random
+
+from romaji import normalize
+
+# ---------------------------- CONSTANTS ----------------------------
+# Kana that learners commonly mix up because they look alike
+VISUAL_GROUPS = [
+    "ぬめね", "ねれわ", "はほけ", "さちき", "るろ", "いり", "こに", "うら",
+    "あおめ", "たな", "まも", "しつ", "くへ", "そて", "ゆよ",
+    "シツ", "ソン", "シソ", "ツン", "クタ", "ウワフ", "コユ", "チテ", "ヌス", "マア", "ノメ",
+    "へヘ", "りリ", "かカ", "きキ", "もモ", "やヤ", "せセ",  # Across scripts, for mixed decks
+]
+MAX_CONFUSABLES = 6  # Confusable candidates kept per card
+CONFUSABLE_OPTIONS = 2  # Option slots that may go to confusable distractors
+CONFUSABLE_WEIGHT = 1.0  # Base weight of a look-alike or sound-alike candidate
+HISTORY_WEIGHT = 3.0  # Extra weight per time the learner actually gave that answer
+
+
+# ---------------------------- DISTRACTOR INDEX ----------------------------
+class DistractorIndex:
+    """Multiple-choice options for one deck and direction, precomputed once.
+
+    Building the index costs O(deck); serving options for a card is O(1) in the
+    deck size. Distractors prefer look-alike kana and near-miss spellings, weighted
+    by how often the learner has picked them before. An answer the engine would
+    also accept (ヲ when を is asked for, or any card showing the same question)
+    is never offered as a wrong option.
+    """
+
+    def __init__(self, deck, answer_field):
+        self.answer_field = answer_field
+        self.values = []  # Unique answers, sampled uniformly for filler options
+        self._positions = {}  # Answer -> position in self.values
+        self._answers = []  # Card ID -> position of its answer
+
+        for value in deck.column(answer_field):
+            position = self._positions.get(value)
+            if position is None:
+                position = self._positions[value] = len(self.values)
+                self.values.append(value)
+            self._answers.append(position)
+
+        self._accepted = self._build_accepted(deck)  # Card ID -> every accepted answer position, when not just one
+        self._confusables = self._build_confusables(deck)
+
+    def answer(self, card_id):
+        """The correct answer for a card in this direction"""
+        return self.values[self._answers[card_id]]
+
+    def options(self, card_id, count=3, history=None):
+        """Pick ``count`` distinct wrong answers for a card.
+
+        ``history`` maps answers the learner gave for this card to how often.
+        """
+        accepted = self._accepted.get(card_id, (self._answers[card_id],))
+        count = min(count, len(self.values) - len(accepted))  # Tiny decks get fewer options
+        chosen = []
+
+        # Weighted picks among confusable candidates
+        weights = dict.fromkeys(self._confusables[card_id], CONFUSABLE_WEIGHT)
+        for answer, times in (history or {}).items():
+            position = self._positions.get(answer)
+            if position is not None and position not in accepted:
+                weights[position] = weights.get(position, 0) + HISTORY_WEIGHT * times
+        while weights and len(chosen) < min(count, CONFUSABLE_OPTIONS):
+            pick = random.choices(list(weights), weights=list(weights.values()))[0]
+            chosen.append(pick)
+            del weights[pick]
+
+        # Fill the remaining slots uniformly from the whole deck
+        if len(self.values) <= 2 * (count + len(accepted)):
+            pool = [i for i in range(len(self.values)) if i not in accepted and i not in chosen]
+            chosen += random.sample(pool, min(count - len(chosen), len(pool)))
+        while len(chosen) < count:
+            pick = random.randrange(len(self.values))
+            if pick not in accepted and pick not in chosen:
+                chosen.append(pick)
+
+        return [self.values[i] for i in chosen]
+
+    # ---------------------------- INTERNALS ----------------------------
+    def _build_accepted(self, deck):
+        """Answer positions the engine also accepts: the same checked form, or any card's with the same question"""
+        keys = [normalize(value) for value in self.values]
+        aliases = {}
+        for position, key in enumerate(keys):
+            aliases.setdefault(key, []).append(position)
+        question_field = "kana" if self.answer_field == "romaji" else "romaji"
+        questions = list(deck.column(question_field))
+        question_keys = {}
+        for question, position in zip(questions, self._answers):
+            question_keys.setdefault(question, set()).add(keys[position])
+
+        accepted = {}
+        for card_id, question in enumerate(questions):
+            positions = {position for key in question_keys[question] for position in aliases[key]}
+            if len(positions) > 1:
+                accepted[card_id] = frozenset(positions)
+        return accepted
+
+    def _build_confusables(self, deck):
+        """Per card answer positions that look or sound like the correct answer"""
+        # Look-alike questions: learners confuse ぬ/め whichever side they answer in
+        card_ids = {}
+        for card_id, kana in enumerate(deck.column("kana")):
+            card_ids.setdefault(kana, []).append(card_id)
+        lookalikes = {}
+        for group in VISUAL_GROUPS:
+            for kana in group:
+                lookalikes.setdefault(kana, set()).update(other for other in group if other != kana)
+
+        # Near-miss spellings: answers one deletion apart share a key (symmetric delete)
+        neighbours = {}
+        for position, value in enumerate(self.values):
+            for key in _deletion_keys(value):
+                neighbours.setdefault(key, []).append(position)
+
+        confusables = []
+        for card_id, kana in enumerate(deck.column("kana")):
+            correct = self._answers[card_id]
+            lookalike_answers = (self._answers[i] for other in lookalikes.get(kana, ())
+                                 for i in card_ids.get(other, ()))
+            near_misses = (position for key in _deletion_keys(self.values[correct])
+                           for position in neighbours[key])
+
+            accepted = self._accepted.get(card_id, (correct,))
+            unique = []
+            for position in itertools.chain(lookalike_answers, near_misses):
+                if position not in accepted and position not in unique:
+                    unique.append(position)
+                    if len(unique) == MAX_CONFUSABLES:
+                        break  # Stops early, so crowded keys never cost O(deck) per card
+            confusables.append(unique)
+        return confusables
+
+
+def _deletion_keys(value):
+    """The value itself first, then every distinct single-character deletion of it"""
+    keys = [value]
+    if len(value) > 1:
+        for i in range(len(value)):
+            key = value[:i] + value[i + 1:]
+            if key not in keys:
+                keys.append(key)
+    return keys
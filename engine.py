@@ -0,0 +1,219 @@
+import random
+import time
+from datetime import datetime
+
+from distractors import DistractorIndex
+from romaji import is_katakana, normalize, to_hiragana
+from scheduler import Scheduler
+from stats_store import answer_record, apply_record
+
+# ---------------------------- CONSTANTS ----------------------------
+MODES = ("hiragana_to_romaji", "romaji_to_hiragana")
+SPOKEN_KANA = str.maketrans("をぢづ", "おじず")  # Kana usually romanized by how they sound (を as "o")
+MODE_TITLES = {"hiragana_to_romaji": "{script} → Romaji", "romaji_to_hiragana": "Romaji → {script}"}  # See mode_title
+
+# Session feedback tiers as (minimum accuracy %, message); front ends pick the colours
+FEEDBACK_TIERS = [
+    (90, "🌸 Excellent! You're mastering hiragana!"),
+    (75, "🎌 Great job! Keep practicing!"),
+    (60, "💮 Good progress! Regular practice will help you improve."),
+    (0, "🍃 Keep studying! You'll get better with practice."),
+]
+
+
+# ---------------------------- DECK INDEXES ----------------------------
+def deck_index(deck, indexes, table, mode):
+    """The ``"answers"``, ``"distractors"`` or ``"script"`` table for ``mode``, cached in ``indexes``"""
+    index = indexes.get((table, mode))
+    if index is None:
+        if table == "distractors":
+            index = DistractorIndex(deck, "romaji" if mode == "hiragana_to_romaji" else "kana")
+        elif table == "script":
+            scripts = {is_katakana(kana) for kana in deck.column("kana")}
+            index = "Kana" if len(scripts) > 1 else "Katakana" if True in scripts else "Hiragana"
+        else:
+            index = _answers_by_question(deck, mode)
+        indexes[table, mode] = index
+    return index
+
+
+def prepare_indexes(deck, indexes):
+    """Build every table ``QuizEngine`` would otherwise build on first use.
+
+    Large decks take a second or more, so front ends run this ahead of the first
+    card (off the UI thread). Returns build seconds by ``(table, mode)``.
+    """
+    timings = {}
+    for mode in MODES:
+        for table in ("answers", "distractors"):
+            start = time.perf_counter()
+            deck_index(deck, indexes, table, mode)
+            timings[table, mode] = time.perf_counter() - start
+    start = time.perf_counter()
+    deck_index(deck, indexes, "script", None)
+    timings["script", None] = time.perf_counter() - start
+    return timings
+
+
+def _answers_by_question(deck, mode):
+    """Normalized answers for every question that more than one card shows"""
+    question_field, answer_field = ("kana", "romaji") if mode == "hiragana_to_romaji" else ("romaji", "kana")
+    answers = {}
+    for question, answer in zip(deck.column(question_field), deck.column(answer_field)):
+        answers.setdefault(question, set()).add(normalize(answer))
+    return {question: values for question, values in answers.items() if len(values) > 1}
+
+
+# ---------------------------- QUIZ ENGINE ----------------------------
+class QuizEngine:
+    """Display-free practice session logic shared by every front end.
+
+    Owns card selection (via the scheduler), multiple-choice options, answer
+    checking, stat updates and session results. Persistence is delegated to an
+    optional ``sink`` with a ``submit(record)`` method, usually a ``StatsWriter``.
+    ``clock`` returns epoch seconds and can be replaced for simulations.
+    ``indexes`` caches lookup tables derived from the deck; engines studying the
+    same deck can share one dict so the tables are built only once.
+    """
+
+    def __init__(self, deck, stats, sink=None, clock=time.time, indexes=None):
+        self.deck = deck
+        self.stats = stats
+        self.sink = sink
+        self.clock = clock
+        self.scheduler = Scheduler(deck, stats.setdefault("srs", {}))
+        self.indexes = {} if indexes is None else indexes  # (table, mode) -> table, see deck_index
+
+        self.mode = None
+        self.due_only = False
+        self.current_card = None  # Card ID within self.deck
+        self.awaiting_answer = False  # The current card was drawn but not answered yet
+        self.session_size = 0
+        self.session_remaining = 0
+        self.session_correct = 0
+        self.session_total = 0
+
+    # ---------------------------- SESSION ----------------------------
+    def start(self, mode, due_only=False):
+        """Begin a session over the whole deck, or only the cards due now"""
+        if mode not in MODES:
+            raise ValueError(f"Unknown practice mode {mode!r}")
+        self.release_current_card()
+        self.mode = mode
+        self.due_only = due_only
+        self.session_size = self.scheduler.due_count(self.clock()) if due_only else len(self.deck)
+        self.session_remaining = self.session_size
+        self.session_correct = 0
+        self.session_total = 0
+
+    def next_card(self):
+        """Draw the next card, or ``None`` when the session is over.
+
+        Drawing again before answering counts as a skip: the unanswered card steps
+        back in the queue and still uses up one card of the session.
+        """
+        if self.awaiting_answer:
+            self.scheduler.requeue(self.current_card, self.clock())
+            self.awaiting_answer = False
+
+        if self.session_remaining <= 0:
+            return None
+        card = self.scheduler.next_card(self.clock(), self.due_only)
+        if card is None:
+            return None
+
+        self.current_card = card
+        self.awaiting_answer = True
+        self.session_remaining -= 1
+        return card
+
+    def upcoming(self, count):
+        """Card ids likely to be drawn next (the current card is not included)"""
+        return self.scheduler.peek(min(count, max(self.session_remaining, 0)))
+
+    def release_current_card(self):
+        """Return a drawn but unanswered card to the scheduler untouched"""
+        if self.awaiting_answer:
+            self.scheduler.requeue(self.current_card, self.clock(), delay=0)
+            self.awaiting_answer = False
+
+    # ---------------------------- QUESTIONS ----------------------------
+    def question(self):
+        """The face shown to the learner for the current card"""
+        if self.mode == "hiragana_to_romaji":
+            return self.deck.kana(self.current_card)
+        return self.deck.romaji(self.current_card)
+
+    def mode_title(self):
+        """Name of the current mode, with the deck's script ("Kana" when it mixes both)"""
+        return MODE_TITLES[self.mode].format(script=deck_index(self.deck, self.indexes, "script", None))
+
+    def answer_label(self):
+        """Prompt for the free-answer field"""
+        if self.mode == "hiragana_to_romaji":
+            return "Romaji:"
+        return "Katakana:" if is_katakana(self.correct_answer()) else "Hiragana:"
+
+    def correct_answer(self):
+        """The expected answer for the current card"""
+        if self.mode == "hiragana_to_romaji":
+            return self.deck.romaji(self.current_card)
+        return self.deck.kana(self.current_card)
+
+    def options(self, count=4):
+        """Shuffled multiple-choice options, favouring answers this learner confuses"""
+        index = deck_index(self.deck, self.indexes, "distractors", self.mode)
+        history = self.stats.get("confusions", {}).get(self.deck.key(self.current_card))
+        options = index.options(self.current_card, count - 1, history) + [index.answer(self.current_card)]
+        random.shuffle(options)
+        return options
+
+    def check(self, user_answer):
+        """Whether an answer is right for the current card.
+
+        Romaji variants (si/shi, tu/tsu) count, and so does the answer of any card
+        showing the same question, since the learner can't tell those apart
+        (ぢ and じ are both "ji"; あ and ア are both "a"). Romaji typed for a kana
+        question also counts when it spells that kana in any system (Nihon-shiki
+        "di" for ぢ, "o" for を). Romaji answers are only compared through kana
+        when typed in ASCII, so the kana on screen is never accepted as its own
+        romaji.
+        """
+        if self.mode == "hiragana_to_romaji":
+            user_answer = str(user_answer).strip().lower()
+            if not user_answer.isascii():
+                return user_answer == self.correct_answer().strip().lower()
+            kana = to_hiragana(self.question())
+            if normalize(user_answer) in (kana, kana.translate(SPOKEN_KANA)):
+                return True
+        user_answer = normalize(user_answer)
+        if user_answer == normalize(self.correct_answer()):
+            return True
+        answers = deck_index(self.deck, self.indexes, "answers", self.mode)
+        return user_answer in answers.get(self.question(), ())
+
+    # ---------------------------- ANSWERS ----------------------------
+    def answer(self, is_correct, user_answer=""):
+        """Record an answer for the current card and return its journal record"""
+        now = self.clock()
+        self.awaiting_answer = False
+        self.session_total += 1
+        if is_correct:
+            self.session_correct += 1
+
+        srs_state = self.scheduler.review(self.current_card, is_correct, now)
+        answered_at = datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
+        record = answer_record(self.deck.key(self.current_card), is_correct, answered_at, user_answer, srs_state)
+        apply_record(self.stats, record)
+        if self.sink is not None:
+            self.sink.submit(record)
+        return record
+
+    def results(self):
+        """Session summary as ``(accuracy %, feedback message, feedback tier)``; tier 0 is best"""
+        if self.session_total == 0:
+            return None
+        accuracy = (self.session_correct / self.session_total) * 100
+        for tier, (threshold, feedback) in enumerate(FEEDBACK_TIERS):
+            if accuracy >= threshold:
+                return accuracy, feedback, tier
@@ -0,0 +1,204 @@
+"""Pre-rendered card faces: each glyph is drawn once into a PhotoImage and reused.
+
+Rendering needs Pillow and a font file that covers the text; rendered faces are
+also written to an on-disk PNG cache, which Tk can load without Pillow. When
+neither is available callers fall back to plain text, using ``tkinter.font``
+objects that are resolved once and shared.
+"""
+import base64
+import collections
+import glob
+import hashlib
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tkinter as tk
+from tkinter import font as tkfont
+
+try:
+    from PIL import Image, ImageDraw, ImageFont  # Optional: only needed to render new faces
+except ImportError:
+    Image = None
+
+# ---------------------------- CONSTANTS ----------------------------
+GLYPH_CACHE_DIR = "reuniclus_glyphs"  # Rendered PNGs, reused across runs
+GLYPH_CACHE_SIZE = 256  # PhotoImages kept in memory (least recently used evicted first)
+GLYPH_PADDING = 4  # Transparent margin around each rendered face (px)
+
+# Families tried, in order, when the requested one is missing or cannot show kana
+FALLBACK_FAMILIES = ["Noto Sans CJK JP", "Noto Sans JP", "Yu Gothic", "Hiragino Sans", "Meiryo",
+                     "MS Gothic", "IPAGothic", "TakaoGothic", "Droid Sans Fallback"]
+FONT_DIRS = {
+    "win32": [os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts")],
+    "darwin": ["/System/Library/Fonts", "/Library/Fonts", os.path.expanduser("~/Library/Fonts")],
+}.get(sys.platform, ["/usr/share/fonts", "/usr/local/share/fonts", os.path.expanduser("~/.fonts"),
+                     os.path.expanduser("~/.local/share/fonts")])
+
+
+# ---------------------------- FONTS ----------------------------
+class FontResolver:
+    """Turns ``(family, size[, style])`` specs into shared ``tkinter.font.Font`` objects.
+
+    The installed family list is read once and fallbacks are settled once per
+    spec, so widgets configured with these fonts skip Tk's per-widget lookup.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._families = None
+        self._fonts = {}
+        self._files = {}
+
+    def font(self, spec):
+        """The shared Font for a ``(family, size[, "bold"|"italic"...])`` tuple"""
+        named = self._fonts.get(spec)
+        if named is None:
+            family, size, *styles = spec
+            named = self._fonts[spec] = tkfont.Font(
+                root=self.root, family=self.family(family), size=size,
+                weight="bold" if "bold" in styles else "normal",
+                slant="italic" if "italic" in styles else "roman")
+        return named
+
+    def family(self, family):
+        """``family`` if installed, else the first installed fallback, else Tk's default"""
+        if self._families is None:
+            self._families = set(tkfont.families(self.root))
+        for candidate in [family] + FALLBACK_FAMILIES:
+            if candidate in self._families:
+                return candidate
+        return tkfont.nametofont("TkDefaultFont", root=self.root).actual("family")
+
+    def font_file(self, family, bold, needs_kana):
+        """Path of a font file for Pillow, preferring ones that can show kana when needed"""
+        key = (family, bold, needs_kana)
+        if key not in self._files:
+            self._files[key] = find_font_file(family, bold, needs_kana)
+        return self._files[key]
+
+
+def find_font_file(family, bold=False, needs_kana=False):
+    """Locate a TrueType/OpenType file for ``family`` (or a kana-capable fallback)"""
+    if shutil.which("fc-match"):  # fontconfig already knows about coverage and fallbacks
+        pattern = family + (":bold" if bold else "") + (":lang=ja" if needs_kana else "")
+        try:
+            path = subprocess.run(["fc-match", "-f", "%{file}", pattern], capture_output=True,
+                                  text=True, timeout=5).stdout.strip()
+            if path and os.path.exists(path):
+                return path
+        except (OSError, subprocess.SubprocessError):
+            pass
+
+    families = (FALLBACK_FAMILIES + [family]) if needs_kana else ([family] + FALLBACK_FAMILIES)
+    files = [path for folder in FONT_DIRS for path in glob.glob(os.path.join(folder, "**", "*.[ot]t[fc]"),
+                                                                 recursive=True)]
+    for candidate in families:
+        wanted = candidate.replace(" ", "").lower()
+        matches = sorted((path for path in files if wanted in os.path.basename(path).replace(" ", "").lower()),
+                         key=lambda path: ("bold" in path.lower()) != bold)
+        if matches:
+            return matches[0]
+    return None
+
+
+# ---------------------------- GLYPH CACHE ----------------------------
+class GlyphCache:
+    """LRU cache of card faces as PhotoImages, keyed by text, font and colour.
+
+    ``get`` returns ``None`` when a face can't be rendered (no Pillow and no
+    cached PNG, or no usable font file); show plain text with ``font`` instead.
+    Keep a reference to the returned image (e.g. ``label.image = image``) for as
+    long as it is displayed.
+    """
+
+    def __init__(self, root, cache_dir=GLYPH_CACHE_DIR, capacity=GLYPH_CACHE_SIZE):
+        self.root = root
+        self.fonts = FontResolver(root)
+        self.cache_dir = cache_dir
+        self.capacity = capacity
+        self.images = collections.OrderedDict()
+        self.dpi = root.winfo_fpixels("1i")
+        self.unrenderable = set()  # Keys that failed once and won't be retried
+
+        # Counters
+        self.hits = 0
+        self.disk_hits = 0
+        self.renders = 0
+
+    def font(self, spec):
+        return self.fonts.font(spec)
+
+    def get(self, text, spec, color):
+        """PhotoImage of ``text`` in the font ``spec`` and ``color``, or ``None``"""
+        key = (text, spec, color)
+        image = self.images.get(key)
+        if image is not None:
+            self.images.move_to_end(key)
+            self.hits += 1
+            return image
+        if key in self.unrenderable:
+            return None
+
+        image = self._load(key)
+        if image is None:
+            self.unrenderable.add(key)
+            return None
+        self.images[key] = image
+        if len(self.images) > self.capacity:
+            self.images.popitem(last=False)
+        return image
+
+    def _load(self, key):
+        path = self._path(key)
+        if path is not None and os.path.exists(path):
+            try:
+                image = tk.PhotoImage(master=self.root, file=path)  # Tk reads PNG natively
+                self.disk_hits += 1
+                return image
+            except tk.TclError:
+                pass  # Corrupt cache entry; render it again
+
+        png = self._render(*key)
+        if png is None:
+            return None
+        self.renders += 1
+        if path is not None:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(png)
+            except OSError as e:
+                print("Could not cache glyph:", e)
+        return tk.PhotoImage(master=self.root, data=base64.b64encode(png))
+
+    def _path(self, key):
+        if not self.cache_dir:
+            return None
+        digest = hashlib.sha1(repr((key, round(self.dpi, 1))).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.png")
+
+    def _render(self, text, spec, color):
+        """PNG bytes for one face, drawn with Pillow on a transparent background"""
+        if Image is None:
+            return None
+        family, size, *styles = spec
+        path = self.fonts.font_file(family, "bold" in styles, any(ord(ch) > 0x2E7F for ch in text))
+        if path is None:
+            return None
+        try:
+            face = ImageFont.truetype(path, round(size * self.dpi / 72))
+        except OSError:
+            return None
+
+        left, top, right, bottom = face.getbbox(text)
+        image = Image.new("RGBA", (right - left + 2 * GLYPH_PADDING, bottom - top + 2 * GLYPH_PADDING))
+        ImageDraw.Draw(image).text((GLYPH_PADDING - left, GLYPH_PADDING - top), text, font=face, fill=color)
+        buffer = io.BytesIO()
+        image.save(buffer, "PNG")
+        return buffer.getvalue()
+
+    def counters(self):
+        return {"images": len(self.images), "hits": self.hits, "disk_hits": self.disk_hits,
+                "renders": self.renders, "unrenderable": len(self.unrenderable)}
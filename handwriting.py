@@ -0,0 +1,303 @@
+"""Handwritten kana recognition by matching strokes against per-kana templates.
+
+A drawing is treated as one pen path: its strokes joined in writing order,
+scaled into a unit box and resampled to ``RESAMPLE_POINTS`` evenly spaced
+points, each carrying x, y and how far through the strokes it is (so stroke
+order counts). Templates are prepared the same way once, when loaded, into a
+single array holding only what the Sakoe-Chiba band can reach, and recognizing
+is one batched DTW of the drawing against every template at once: the dynamic
+program walks the anti-diagonals of the cost matrices, each step vectorized
+across all templates.
+
+Templates are kept in ``reuniclus_strokes.json``. Record your own with "Teach"
+on the handwriting panel, or import KanjiVG stroke data (files named by code
+point, e.g. ``03042.svg`` for あ):
+
+    python handwriting.py kanjivg kanjivg/kanji/ --deck all-kana
+    python handwriting.py info
+"""
+import argparse
+import json
+import os
+import re
+
+import numpy as np
+
+# ---------------------------- CONSTANTS ----------------------------
+STROKES_FILE = "reuniclus_strokes.json"
+RESAMPLE_POINTS = 32  # Points per resampled drawing
+STROKE_ORDER_WEIGHT = 0.3  # Weight of the stroke-progress feature against position
+STROKE_COUNT_PENALTY = 0.08  # Added to a match's distance per stroke of difference
+DTW_BAND = 6  # Sakoe-Chiba band: how far (in points) a match may drift off the diagonal
+TOP_CANDIDATES = 3
+BEZIER_SAMPLES = 8  # Points per curve segment when importing KanjiVG paths
+SVG_PATH = re.compile(r'<path\b[^>]*?\sd="([^"]+)"')
+SVG_TOKEN = re.compile(r"[MmCcSsLlHhVvZz]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+# ---------------------------- STROKE FEATURES ----------------------------
+def normalize_strokes(strokes):
+    """Strokes scaled into the unit box (aspect kept, centred); empty strokes dropped"""
+    strokes = [np.asarray(stroke, dtype=float).reshape(-1, 2) for stroke in strokes if len(stroke)]
+    if not strokes:
+        return []
+    points = np.concatenate(strokes)
+    low, high = points.min(axis=0), points.max(axis=0)
+    scale = max((high - low).max(), 1e-9)
+    offset = low - (scale - (high - low)) / 2
+    return [(stroke - offset) / scale for stroke in strokes]
+
+
+def resample(strokes, count=RESAMPLE_POINTS):
+    """``(count, 3)`` features: x, y and stroke progress at evenly spaced points along the pen path"""
+    strokes = normalize_strokes(strokes)
+    if not strokes:
+        raise ValueError("Nothing was drawn")
+    path = np.concatenate(strokes)
+    progress = np.concatenate([np.full(len(stroke), index, dtype=float) for index, stroke in enumerate(strokes)])
+    progress /= max(len(strokes) - 1, 1)
+
+    lengths = np.hypot(*np.diff(path, axis=0).T)
+    distance = np.concatenate(([0.0], np.cumsum(lengths)))
+    if distance[-1] == 0:  # A single dot
+        return np.tile(np.append(path[0], progress[0] * STROKE_ORDER_WEIGHT), (count, 1))
+    targets = np.linspace(0, distance[-1], count)
+    return np.column_stack((np.interp(targets, distance, path[:, 0]),
+                            np.interp(targets, distance, path[:, 1]),
+                            np.interp(targets, distance, progress) * STROKE_ORDER_WEIGHT))
+
+
+def compose(glyph_strokes):
+    """Strokes of several characters written side by side (yōon like きゃ), left to right"""
+    composed = []
+    for slot, strokes in enumerate(glyph_strokes):
+        composed += [[(x + slot, y) for x, y in stroke] for stroke in strokes]
+    return composed
+
+
+def diagonal_indexes(count, band):
+    """The banded cells of a ``count`` x ``count`` DTW table, in anti-diagonal order.
+
+    Returns ``(rows, cols, spans)``: the (i, j) of every cell (1-based, as in the
+    table) and, per anti-diagonal k = i + j from 2 up, ``(lo, hi, start)`` where
+    rows ``lo <= i < hi`` are inside the band and ``start`` is their offset in
+    ``rows``/``cols``.
+    """
+    rows, cols, spans = [], [], []
+    start = 0
+    for k in range(2, 2 * count + 1):
+        i = np.arange(max(1, k - count), min(count, k - 1) + 1)
+        i = i[np.abs(2 * i - k) <= band]  # |i - j| <= band, a run of rows
+        lo, hi = (int(i[0]), int(i[-1]) + 1) if len(i) else (1, 1)
+        spans.append((lo, hi, start))
+        rows.append(i)
+        cols.append(k - i)
+        start += len(i)
+    return np.concatenate(rows), np.concatenate(cols), spans
+
+
+def band_templates(features, diagonals):
+    """Template features ``(t, n, d)`` gathered at the banded cells' columns, as float32 ``(d, cells, t)``"""
+    _, cols, _ = diagonals
+    return np.ascontiguousarray(features[:, cols - 1].transpose(2, 1, 0), dtype=np.float32)
+
+
+def batched_dtw(query, banded, diagonals):
+    """DTW distance from ``query`` (n, d) to each template in ``banded`` (see ``band_templates``), as a (t,) array.
+
+    Only cells inside the band are ever costed. Each anti-diagonal depends on
+    the two before it alone, so the table is kept as two rows indexed by i and
+    every step is a few contiguous slices across all templates.
+    """
+    rows, _, spans = diagonals
+    count, total = len(query), banded.shape[2]
+    diff = banded - query[rows - 1].T.astype(np.float32)[:, :, None]
+    np.square(diff, out=diff)
+    cost = diff.sum(axis=0)
+    np.sqrt(cost, out=cost)  # (banded cells, t)
+
+    before = np.full((count + 1, total), np.inf, dtype=np.float32)  # Diagonal k - 2; k = 0 is the (0, 0) corner
+    before[0] = 0
+    last = np.full((count + 1, total), np.inf, dtype=np.float32)  # Diagonal k - 1
+    for lo, hi, start in spans:
+        current = np.full((count + 1, total), np.inf, dtype=np.float32)
+        best = np.minimum(np.minimum(last[lo - 1:hi - 1], last[lo:hi]), before[lo - 1:hi - 1])
+        np.add(cost[start:start + hi - lo], best, out=current[lo:hi])
+        before, last = last, current
+    return last[count] / (2 * count)
+
+
+# ---------------------------- TEMPLATES ----------------------------
+class StrokeTemplates:
+    """Stroke samples per kana, as stored in the templates file"""
+
+    def __init__(self, samples=None, path=STROKES_FILE):
+        self.samples = samples or {}  # Kana -> [strokes, ...], each stroke [[x, y], ...] in the unit box
+        self.path = path
+
+    @classmethod
+    def load(cls, path=STROKES_FILE):
+        """Read a templates file; a missing file is an empty set"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                samples = json.load(f).get("templates", {})
+        except FileNotFoundError:
+            samples = {}
+        return cls(samples, path)
+
+    def save(self, path=None):
+        path = path or self.path
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "templates": self.samples}, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def add(self, kana, strokes):
+        """Keep one more sample of ``kana``; returns it as stored"""
+        sample = [[[round(x, 3), round(y, 3)] for x, y in stroke] for stroke in normalize_strokes(strokes)]
+        self.samples.setdefault(kana, []).append(sample)
+        return sample
+
+    def __len__(self):
+        return sum(len(samples) for samples in self.samples.values())
+
+
+class Recognizer:
+    """Recognizes a drawing against every template in one batched DTW"""
+
+    def __init__(self, templates, points=RESAMPLE_POINTS, band=DTW_BAND):
+        self.templates = templates
+        self.points = points
+        self.diagonals = diagonal_indexes(points, band)
+        self.labels = []
+        features, stroke_counts = [], []
+        for kana, samples in templates.samples.items():
+            for strokes in samples:
+                self.labels.append(kana)
+                features.append(resample(strokes, points))
+                stroke_counts.append(len(strokes))
+        self.banded = band_templates(np.array(features).reshape(-1, points, 3), self.diagonals)
+        self.stroke_counts = np.array(stroke_counts, dtype=float)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __contains__(self, kana):
+        """Whether ``kana`` has a template, i.e. can be recognized at all"""
+        return bool(self.templates.samples.get(kana))
+
+    def add(self, kana, strokes):
+        """Learn one more sample (also kept in the templates)"""
+        sample = self.templates.add(kana, strokes)
+        self.labels.append(kana)
+        banded = band_templates(resample(sample, self.points)[None], self.diagonals)
+        self.banded = np.concatenate((self.banded, banded), axis=2)
+        self.stroke_counts = np.append(self.stroke_counts, len(sample))
+
+    def recognize(self, strokes, top=TOP_CANDIDATES):
+        """Best matches as ``[(kana, distance)]``, closest first and one per kana"""
+        if not self.labels:
+            return []
+        query = resample(strokes, self.points)
+        distances = batched_dtw(query, self.banded, self.diagonals).astype(float)
+        distances += STROKE_COUNT_PENALTY * np.abs(self.stroke_counts - len(normalize_strokes(strokes)))
+
+        matches = []
+        for index in np.argsort(distances):
+            kana = self.labels[index]
+            if all(kana != seen for seen, _ in matches):
+                matches.append((kana, float(distances[index])))
+                if len(matches) == top:
+                    break
+        return matches
+
+
+# ---------------------------- KANJIVG IMPORT ----------------------------
+def parse_svg_path(d):
+    """Points along an SVG path (the subset KanjiVG uses: M L H V C S Z, absolute or relative)"""
+    tokens = SVG_TOKEN.findall(d)
+    points, position, start, control = [], np.zeros(2), np.zeros(2), None
+    command, i = None, 0
+    while i < len(tokens):
+        if tokens[i].isalpha():
+            command = tokens[i]
+            i += 1
+            if command in "Zz":
+                points.append(start.copy())
+                position, control = start.copy(), None
+                continue
+        relative = command.islower()
+        kind = command.upper()
+        arity = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4}[kind]
+        values = np.array([float(token) for token in tokens[i:i + arity]])
+        i += arity
+        origin = position if relative else np.zeros(2)
+
+        if kind in "ML":
+            position = origin + values
+            if kind == "M" and not points:
+                start = position.copy()
+            points.append(position.copy())
+            command = ("l" if relative else "L") if kind == "M" else command  # Extra pairs are line-tos
+            control = None
+        elif kind in "HV":
+            axis = 0 if kind == "H" else 1
+            position = position.copy()
+            position[axis] = (position[axis] if relative else 0) + values[0]
+            points.append(position.copy())
+            control = None
+        else:
+            if kind == "C":
+                first, second, end = origin + values[0:2], origin + values[2:4], origin + values[4:6]
+            else:  # S: the first control point mirrors the previous curve's second
+                first = 2 * position - control if control is not None else position.copy()
+                second, end = origin + values[0:2], origin + values[2:4]
+            t = np.linspace(0, 1, BEZIER_SAMPLES + 1)[1:, None]
+            points += list((1 - t) ** 3 * position + 3 * (1 - t) ** 2 * t * first
+                           + 3 * (1 - t) * t ** 2 * second + t ** 3 * end)
+            position, control = end, second
+    return [(float(x), float(y)) for x, y in points]
+
+
+def read_kanjivg(path):
+    """The strokes of one KanjiVG character file, in stroke order"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [parse_svg_path(d) for d in SVG_PATH.findall(f.read())]
+
+
+def import_kanjivg(directory, kana_list, templates):
+    """Add a template for each kana (or yōon pair) whose characters all have KanjiVG files"""
+    added, missing = 0, []
+    for kana in kana_list:
+        paths = [os.path.join(directory, f"{ord(ch):05x}.svg") for ch in kana]
+        if not all(os.path.exists(path) for path in paths):
+            missing.append(kana)
+            continue
+        templates.add(kana, compose([read_kanjivg(path) for path in paths]))
+        added += 1
+    return added, missing
+
+
+# ---------------------------- COMMAND LINE ----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage Reuniclus handwriting templates")
+    parser.add_argument("--templates", default=STROKES_FILE, help=f"Templates file (default: {STROKES_FILE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    kanjivg = commands.add_parser("kanjivg", help="Import stroke templates from KanjiVG SVG files")
+    kanjivg.add_argument("directory", help="KanjiVG kanji/ directory")
+    kanjivg.add_argument("--deck", default="all-kana", help="Built-in deck whose kana to import (default: all-kana)")
+    commands.add_parser("info", help="Count the templates per kana")
+    args = parser.parse_args()
+
+    templates = StrokeTemplates.load(args.templates)
+    if args.command == "kanjivg":
+        from deck_registry import DeckRegistry
+        deck = DeckRegistry().get(args.deck).deck
+        added, missing = import_kanjivg(args.directory, list(deck.column("kana")), templates)
+        templates.save(args.templates)
+        print(f"Imported {added} templates into {args.templates}"
+              + (f"; no KanjiVG file for {' '.join(missing)}" if missing else ""))
+    else:
+        print(f"{len(templates)} templates for {len(templates.samples)} kana in {args.templates}")
+        for kana, samples in templates.samples.items():
+            print(f"  {kana}  {len(samples)}")
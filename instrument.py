@@ -0,0 +1,181 @@
+"""Opt-in latency instrumentation with Chrome trace export and an in-app overlay.
+
+Records screen transitions, screen builds, stats writes, widget counts and Tk
+event-loop lag as Chrome trace events. Open the file written by
+``python reuniclus.py --trace session.json`` in ``chrome://tracing`` or
+https://ui.perfetto.dev. F12 toggles the overlay.
+"""
+import collections
+import json
+import os
+import threading
+import time
+import tkinter as tk
+
+# ---------------------------- CONSTANTS ----------------------------
+HEARTBEAT_MS = 50  # Event-loop lag probe interval
+OVERLAY_REFRESH_MS = 500
+MAX_TRACE_EVENTS = 200_000  # Oldest events are dropped past this, so long sessions stay bounded
+LAG_WINDOW = 200  # Heartbeats summarised by the overlay (10 s at HEARTBEAT_MS)
+
+
+def count_widgets(widget):
+    """Number of widgets in the tree under ``widget``, itself included"""
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+# ---------------------------- TRACE ----------------------------
+class TraceRecorder:
+    """Thread-safe buffer of Chrome trace events (timestamps from ``time.perf_counter``)"""
+
+    def __init__(self, max_events=MAX_TRACE_EVENTS):
+        self.events = collections.deque(maxlen=max_events)
+        self.pid = os.getpid()
+        self._threads = {}
+        self._lock = threading.Lock()
+
+    def complete(self, name, category, start, end=None, **args):
+        """Record a finished span from two ``perf_counter`` readings"""
+        end = time.perf_counter() if end is None else end
+        self._add({"name": name, "cat": category, "ph": "X", "ts": start * 1e6,
+                   "dur": (end - start) * 1e6, "args": args})
+
+    def counter(self, name, **values):
+        """Record counter values, drawn as a stacked graph in the trace viewer"""
+        self._add({"name": name, "ph": "C", "ts": time.perf_counter() * 1e6, "args": values})
+
+    def instant(self, name, category, **args):
+        self._add({"name": name, "cat": category, "ph": "i", "s": "t",
+                   "ts": time.perf_counter() * 1e6, "args": args})
+
+    def save(self, path):
+        """Write every buffered event as a Chrome trace JSON file"""
+        with self._lock:
+            events = list(self.events)
+            threads = dict(self._threads)
+        events += [{"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+                   for tid, name in threads.items()]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def _add(self, event):
+        thread = threading.current_thread()
+        event["pid"] = self.pid
+        event["tid"] = thread.ident
+        with self._lock:
+            self._threads.setdefault(thread.ident, thread.name)
+            self.events.append(event)
+
+
+# ---------------------------- INSTRUMENTATION ----------------------------
+class Instrumentation:
+    """Hooks the app calls into, plus the event-loop heartbeat and the overlay.
+
+    ``trace_path`` is where ``close`` writes the trace (``None`` keeps the data
+    in memory for the overlay only). ``stats_counters`` returns the stats
+    writer's counters, or ``None`` while stats are still loading.
+    """
+
+    def __init__(self, root, trace_path=None, stats_counters=None):
+        self.root = root
+        self.trace_path = trace_path
+        self.stats_counters = stats_counters or (lambda: None)
+        self.trace = TraceRecorder()
+        self.lags = collections.deque(maxlen=LAG_WINDOW)  # Milliseconds late per heartbeat
+        self.last_transition = ("-", 0.0)
+        self.widgets = 0
+        self.overlay = None
+        self.overlay_visible = False
+        self._overlay_after = None  # Pending refresh, cancelled when the overlay is hidden
+        self._expected = None
+        self._closed = False
+
+        self.root.bind("<F12>", lambda e: self.toggle_overlay(), add="+")
+        self._schedule_heartbeat()
+
+    # ---------------------------- HOOKS ----------------------------
+    def transition(self, name, start, end):
+        """A screen transition handler ran from ``start`` to ``end``"""
+        self.trace.complete(name, "transition", start, end)
+        self.last_transition = (name, (end - start) * 1000)
+        self.widgets = count_widgets(self.root)
+        self.trace.counter("widgets", count=self.widgets)
+        # Idle callbacks queued now run after Tk's pending redraws: input-to-frame time
+        self.root.after_idle(lambda: self.trace.complete(f"{name} → frame", "frame", start))
+
+    def screen_built(self, name, start):
+        self.trace.complete(f"build {name}", "build", start)
+
+    def stats_written(self, operation, start, end, records):
+        """Called from the stats writer thread after each append or compaction"""
+        self.trace.complete(f"stats {operation}", "io", start, end, records=records)
+
+    def startup(self, profile):
+        """Replay the cold-start phases as spans"""
+        for name, ms, total in profile.phases:
+            end = profile.start + total / 1000
+            self.trace.complete(f"startup {name}", "startup", end - ms / 1000, end)
+
+    # ---------------------------- EVENT LOOP ----------------------------
+    def _schedule_heartbeat(self):
+        self._expected = time.perf_counter() + HEARTBEAT_MS / 1000
+        self.root.after(HEARTBEAT_MS, self._heartbeat)
+
+    def _heartbeat(self):
+        if self._closed:
+            return
+        lag = max(0.0, (time.perf_counter() - self._expected) * 1000)
+        self.lags.append(lag)
+        self.trace.counter("event loop lag (ms)", lag=round(lag, 2))
+        self._schedule_heartbeat()
+
+    def lag_summary(self):
+        """``(p95, max)`` event-loop lag in ms over the recent heartbeats"""
+        if not self.lags:
+            return 0.0, 0.0
+        ordered = sorted(self.lags)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], ordered[-1]
+
+    # ---------------------------- OVERLAY ----------------------------
+    def toggle_overlay(self):
+        if self.overlay is None:
+            self.overlay = tk.Label(self.root, font=("Courier", 10), bg="#222222", fg="#7CFC00",
+                                    justify=tk.LEFT, anchor="nw", padx=8, pady=6)
+        if self._overlay_after is not None:
+            self.root.after_cancel(self._overlay_after)
+            self._overlay_after = None
+        self.overlay_visible = not self.overlay_visible
+        if not self.overlay_visible:
+            self.overlay.place_forget()
+            return
+        self.overlay.place(relx=1.0, x=-10, y=10, anchor="ne")
+        self.overlay.lift()
+        # Placed widgets only map once Tk is idle (never before mainloop with --overlay)
+        self._overlay_after = self.root.after_idle(self._refresh_overlay)
+
+    def _refresh_overlay(self):
+        self._overlay_after = None
+        if self._closed or not self.overlay_visible:
+            return
+        name, ms = self.last_transition
+        lag_p95, lag_max = self.lag_summary()
+        lines = [f"transition {ms:7.1f} ms  {name}",
+                 f"widgets    {self.widgets:7d}",
+                 f"loop lag   {lag_p95:7.1f} ms p95  {lag_max:.1f} max"]
+        counters = self.stats_counters()
+        if counters is not None:
+            lines.append(f"stats io   {counters['last_write_ms']:7.1f} ms last  "
+                         f"{counters['max_write_ms']:.1f} max  queue {counters['queue_depth']}")
+        lines.append(f"trace      {len(self.trace.events):7d} events")
+        self.overlay.configure(text="\n".join(lines))
+        self.overlay.lift()
+        self._overlay_after = self.root.after(OVERLAY_REFRESH_MS, self._refresh_overlay)
+
+    def close(self):
+        """Stop the heartbeat and write the trace file, if one was requested"""
+        self._closed = True
+        if self.trace_path:
+            try:
+                self.trace.save(self.trace_path)
+            except Exception as e:
+                print("Could not save trace:", e)
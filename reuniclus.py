@@ -1,9 +1,22 @@
-import tkinter as tk
-from tkinter import ttk, font
-import random
-import json
+import time
+PROCESS_START = time.perf_counter()  # Startup profiling counts module imports too
+
+try:
+    import tkinter as tk
+    from tkinter import ttk, font, filedialog
+except ImportError:  # The terminal front end (--tui) runs without Tk
+    tk = None
+import argparse
+import bisect
+import functools
 import os
-from datetime import datetime
+import sys
+import threading
+from deck_registry import DECKS_DIR, DEFAULT_DECK, DeckRegistry
+from engine import QuizEngine, prepare_indexes
+from romaji import is_katakana, live_kana, to_kana, to_katakana
+from bindings import BindingManager
+from stats_store import StatsJournal, StatsWriter, add_card_stats, default_stats
 
 # ---------------------------- CONSTANTS & STYLING ----------------------------
 BG_COLOR = "#FFF5F5"  # Soft pinkish-white
@@ -12,50 +25,126 @@ SECONDARY_COLOR = "#6A5ACD"  # Royal purple
 TEXT_COLOR = "#333333"
 CORRECT_COLOR = "#4CAF50"  # Soft green
 INCORRECT_COLOR = "#F44336"  # Soft red
+FEEDBACK_COLORS = [CORRECT_COLOR, CORRECT_COLOR, SECONDARY_COLOR, PRIMARY_COLOR]  # By engine feedback tier
 BUTTON_FONT = ("Nunito", 12, "bold")  # Changed to Nunito for better readability
 TITLE_FONT = ("Nunito", 28, "bold")  # Increased size, changed to Nunito
 CARD_FONT_LARGE = ("Nunito", 80, "bold")  # Increased size, changed to Nunito
 CARD_FONT_SMALL = ("Nunito", 20)  # Increased size, changed to Nunito
+CHART_FONT = ("Nunito", 40)  # Reference chart characters
 APP_NAME = "Reuniclus"  # Official app name
 APP_TAGLINE = "Hiragana Learning Studio"  # Added tagline
+CHART_HEADER_HEIGHT = 60  # Reference chart section header row height (px)
+CHART_ROW_HEIGHT = 80  # Reference chart character row height (px)
+STARTUP_BUDGET_MS = 250  # Cold-start budget for the first frame (--profile-startup)
+AUDIO_PRELOAD_AHEAD = 5  # Upcoming cards whose clips are decoded in the background
+IMPORT_POLL_MS = 100  # How often deck import progress is shown
+HEAT_CELL = 56  # Progress dashboard heatmap cell size (px)
+HEAT_LABEL_WIDTH = 80  # Progress dashboard heatmap row label column (px)
+UNSEEN_COLOR = "#E8E0E0"  # Heatmap cells never answered
+HANDWRITING_SIZE = 200  # Handwriting canvas width and height (px)
+PEN_WIDTH = 6  # Handwriting stroke width (px)
+MIN_PEN_STEP = 2  # Pen moves shorter than this (px) are not recorded
+STROKES_FILE = "reuniclus_strokes.json"  # Handwriting templates; handwriting.py itself needs NumPy
+
+# ---------------------------- HELPERS ----------------------------
+def heat_color(accuracy):
+    """Heatmap colour from red (0%) through amber to green (100%); grey when unseen"""
+    if accuracy is None:
+        return UNSEEN_COLOR
+    share = accuracy / 100
+    red = 244 if share < 0.5 else int(244 - (244 - 76) * (share - 0.5) * 2)
+    green = int(67 + (175 - 67) * min(share * 2, 1))
+    return f"#{red:02X}{green:02X}50"
+
+def timed_transition(method):
+    """Record how long a screen transition took in ``last_transition_ms``"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        result = method(self, *args, **kwargs)
+        end = time.perf_counter()
+        self.last_transition_ms = (end - start) * 1000
+        if self.instrument is not None:
+            self.instrument.transition(method.__name__, start, end)
+        return result
+    return wrapper
+
+class StartupProfile:
+    """Wall-clock breakdown of cold start, one entry per phase"""
+
+    def __init__(self, start=None):
+        self.start = self.last = time.perf_counter() if start is None else start
+        self.phases = []  # (name, milliseconds, milliseconds since start)
+
+    def mark(self, name):
+        """Close the current phase under ``name``"""
+        now = time.perf_counter()
+        self.phases.append((name, (now - self.last) * 1000, (now - self.start) * 1000))
+        self.last = now
+
+    def elapsed_ms(self, name):
+        """Milliseconds from process start to the end of phase ``name``"""
+        return next(total for phase, _, total in self.phases if phase == name)
+
+    def report(self, budget_ms):
+        """Text table of every phase, with the first frame checked against the budget"""
+        lines = ["Startup profile:"]
+        lines += [f"  {name:12} {ms:8.1f} ms   (at {total:8.1f} ms)" for name, ms, total in self.phases]
+        first_frame = self.elapsed_ms("first_frame")
+        verdict = "OK" if first_frame <= budget_ms else "OVER BUDGET"
+        lines.append(f"  first frame {first_frame:.1f} ms / budget {budget_ms:.0f} ms: {verdict}")
+        lines.append(f"  interactive {self.phases[-1][2]:.1f} ms")
+        return "\n".join(lines)
 
 # ---------------------------- MAIN APP ----------------------------
 class ReuniclusApp:  # Renamed class to reflect the official name
-    def __init__(self, root):
+    def __init__(self, root, deck_path=None, stats_db=None, profile=None, on_ready=None,
+                 trace_path=None, overlay=False, audio_path=None):
         self.root = root
         self.root.title(f"{APP_NAME} - {APP_TAGLINE}")
         self.root.geometry("900x750")  # Increased window size for better spacing
         self.root.configure(bg=BG_COLOR)
-        
-        # Try to load custom fonts
-        try:
-            # Attempt to load Nunito font if available on system
-            font.nametofont("TkDefaultFont").configure(family="Nunito", size=11)
-        except:
-            # Fallback to system fonts if Nunito is not available
-            pass
-        
-        # App data
-        self.flashcards = self.initialize_flashcards()
-        self.current_card = None
-        self.stats = self.load_stats()
-        self.session_correct = 0
-        self.session_total = 0
+        self.profile = profile or StartupProfile()
+        self.on_ready = on_ready  # Called once the deferred startup work is done
+        self.instrument = None
+        if trace_path or overlay:
+            from instrument import Instrumentation  # Opt-in profiling only
+            self.instrument = Instrumentation(root, trace_path, self.stats_counters)
+            if overlay:
+                self.instrument.toggle_overlay()
+        
+        # App data; stats and the engine are loaded after the first frame
+        self.decks = DeckRegistry()  # Every deck on offer; each is built the first time it's selected
+        self.deck_entry = self.load_deck(deck_path)  # Selected deck with its shared indexes
+        self.deck = self.deck_entry.deck
+        self.stats_db = stats_db
+        self.stats = None
+        self.stats_store = None
+        self.stats_writer = None
+        self.engine = None  # All quiz logic lives here
+        self.glyphs = None  # Pre-rendered card faces, set up with the fonts
+        self.audio_path = audio_path
+        self.audio = None  # Pronunciation player, opened after startup when a clip pack is given
         self.multiple_choice_mode = False
+        self.due_only_mode = False  # Only drill cards the scheduler says are due
+        self.handwriting_mode = False  # Write kana on a canvas instead of typing them
+        self.recognizer = None  # Handwriting recognizer, loaded the first time handwriting is turned on
+        self.strokes = []  # Strokes on the handwriting canvas, each a list of (x, y)
+        self.teach_sample = None  # (kana, strokes) the answer screen offers to learn as a template
         self.practice_mode = None  # Initialize practice_mode
-        self.practice_cards = []  # Initialize practice_cards
-        
-        # Style configuration
+        self.screens = {}  # Screen name -> persistent frame, built on first use
+        self.current_screen = None
+        self.current_screen_name = None
+        self.bindings = BindingManager()  # Per-screen key bindings, released on leaving the screen
+        self.current_options = []  # Multiple-choice options on the card screen
+        self.next_card_ready = None  # Card screen already filled in off-screen: True, False (session over) or None
+        self.last_transition_ms = 0.0
+        self.import_job = None  # Deck import running on a worker thread
+        self.profile.mark("deck")
+        
+        # Only the frame background is styled up front, so the first frame isn't grey
         self.style = ttk.Style()
         self.style.configure("TFrame", background=BG_COLOR)
-        self.style.configure("TButton", 
-                            font=BUTTON_FONT, 
-                            foreground="white", 
-                            background=PRIMARY_COLOR,
-                            padding=12)  # Increased padding
-        self.style.map("TButton",
-                      background=[("active", SECONDARY_COLOR)],
-                      foreground=[("active", "white")])
         
         # Main container with increased padding
         self.main_frame = ttk.Frame(root, padding=(40, 30))  # Increased padding
@@ -66,102 +155,309 @@ class ReuniclusApp:  # Renamed class to reflect the official name
         
         # Bind Escape key to return to main menu
         self.root.bind('<Escape>', lambda e: self.create_main_menu())
+        self.root.protocol("WM_DELETE_WINDOW", self.exit_app)
+        self.profile.mark("menu")
 
-    # ---------------------------- FLASHCARD DATA ----------------------------
-    def initialize_flashcards(self):
-        """Create the hiragana flashcard dictionary"""
-        return [
-            {"hiragana": "あ", "romaji": "a"}, {"hiragana": "い", "romaji": "i"}, 
-            {"hiragana": "う", "romaji": "u"}, {"hiragana": "え", "romaji": "e"}, 
-            {"hiragana": "お", "romaji": "o"}, {"hiragana": "か", "romaji": "ka"}, 
-            {"hiragana": "き", "romaji": "ki"}, {"hiragana": "く", "romaji": "ku"}, 
-            {"hiragana": "け", "romaji": "ke"}, {"hiragana": "こ", "romaji": "ko"}, 
-            {"hiragana": "さ", "romaji": "sa"}, {"hiragana": "し", "romaji": "shi"}, 
-            {"hiragana": "す", "romaji": "su"}, {"hiragana": "せ", "romaji": "se"}, 
-            {"hiragana": "そ", "romaji": "so"}, {"hiragana": "た", "romaji": "ta"}, 
-            {"hiragana": "ち", "romaji": "chi"}, {"hiragana": "つ", "romaji": "tsu"}, 
-            {"hiragana": "て", "romaji": "te"}, {"hiragana": "と", "romaji": "to"}, 
-            {"hiragana": "な", "romaji": "na"}, {"hiragana": "に", "romaji": "ni"}, 
-            {"hiragana": "ぬ", "romaji": "nu"}, {"hiragana": "ね", "romaji": "ne"}, 
-            {"hiragana": "の", "romaji": "no"}, {"hiragana": "は", "romaji": "ha"}, 
-            {"hiragana": "ひ", "romaji": "hi"}, {"hiragana": "ふ", "romaji": "fu"}, 
-            {"hiragana": "へ", "romaji": "he"}, {"hiragana": "ほ", "romaji": "ho"}, 
-            {"hiragana": "ま", "romaji": "ma"}, {"hiragana": "み", "romaji": "mi"}, 
-            {"hiragana": "む", "romaji": "mu"}, {"hiragana": "め", "romaji": "me"}, 
-            {"hiragana": "も", "romaji": "mo"}, {"hiragana": "や", "romaji": "ya"}, 
-            {"hiragana": "ゆ", "romaji": "yu"}, {"hiragana": "よ", "romaji": "yo"}, 
-            {"hiragana": "ら", "romaji": "ra"}, {"hiragana": "り", "romaji": "ri"}, 
-            {"hiragana": "る", "romaji": "ru"}, {"hiragana": "れ", "romaji": "re"}, 
-            {"hiragana": "ろ", "romaji": "ro"}, {"hiragana": "わ", "romaji": "wa"}, 
-            {"hiragana": "を", "romaji": "wo"}, {"hiragana": "ん", "romaji": "n"}
+        # Everything else runs one step per idle callback, after the menu is on screen
+        self.startup_steps = [
+            ("first_frame", None),
+            ("fonts", self.load_fonts),
+            ("styles", self.configure_styles),
+            ("stats", self.load_stats),
+            ("engine", self.create_engine),
+            ("indexes", self.build_indexes),
+            ("audio", self.load_audio),
         ]
+        self.root.after_idle(self.run_idle_startup)
 
-    # ---------------------------- STATS HANDLING ----------------------------
-    def load_stats(self):
-        """Load previous statistics from file"""
+    # ---------------------------- DEFERRED STARTUP ----------------------------
+    def run_idle_startup(self):
+        """Run one deferred startup step, letting Tk paint and handle input in between"""
+        if self.startup_steps:
+            self.run_startup_step()
+        if self.startup_steps:
+            self.root.after_idle(self.run_idle_startup)
+
+    def run_startup_step(self):
+        name, step = self.startup_steps.pop(0)
+        if step is not None:
+            step()
+        self.profile.mark(name)
+        if not self.startup_steps:
+            self.startup_complete()
+
+    def finish_startup(self):
+        """Run any deferred startup work right away (the user got ahead of the idle queue)"""
+        while self.startup_steps:
+            self.run_startup_step()
+
+    def startup_complete(self):
+        if self.current_screen is self.screens.get("menu"):
+            self.refresh_menu_stats()
+        if self.instrument is not None:
+            self.instrument.startup(self.profile)
+        if self.on_ready is not None:
+            self.on_ready(self)
+
+    def load_fonts(self):
+        """Try to load custom fonts, and set up the card face cache"""
         try:
-            if os.path.exists("reuniclus_stats.json"):  # Updated filename
-                with open("reuniclus_stats.json", "r", encoding="utf-8") as f:
-                    return json.load(f)
-        except Exception:
+            # Attempt to load Nunito font if available on system
+            font.nametofont("TkDefaultFont").configure(family="Nunito", size=11)
+        except:
+            # Fallback to system fonts if Nunito is not available
             pass
-        
-        # Default stats structure
-        default_stats = {
-            "total_correct": 0,
-            "total_attempts": 0,
-            "hiragana_stats": {},
-            "streak": 0,
-            "longest_streak": 0,
-            "last_session": None
-        }
-        
-        # Initialize stats for each hiragana character
-        for card in self.flashcards:
-            default_stats["hiragana_stats"][card["hiragana"]] = {"correct": 0, "attempts": 0}
-            
-        return default_stats
-    
-    def save_stats(self):
-        """Save statistics to file"""
+        from glyphs import GlyphCache  # Pulls in Pillow when installed, so not at import time
+        self.glyphs = GlyphCache(self.root)
+
+    def card_font(self, spec):
+        """Resolved, shared font for a large card face (the plain tuple until fonts load)"""
+        return self.glyphs.font(spec) if self.glyphs is not None else spec
+
+    def card_face(self, text, spec, color):
+        """Cached pre-rendered image of a card face, or ``None`` to draw it as text"""
+        return self.glyphs.get(text, spec, color) if self.glyphs is not None else None
+
+    def configure_styles(self):
+        """Button style configuration"""
+        self.style.configure("TButton", 
+                            font=BUTTON_FONT, 
+                            foreground="white", 
+                            background=PRIMARY_COLOR,
+                            padding=12)  # Increased padding
+        self.style.map("TButton",
+                      background=[("active", SECONDARY_COLOR)],
+                      foreground=[("active", "white")])
+
+    def create_engine(self):
+        self.engine = QuizEngine(self.deck, self.stats, self.stats_writer, indexes=self.deck_entry.indexes)
+
+    def build_indexes(self):
+        """Build the deck's answer and option tables on a worker thread, ahead of the first card"""
+        threading.Thread(target=prepare_indexes, args=(self.deck, self.deck_entry.indexes),
+                         name="reuniclus-indexes", daemon=True).start()
+
+    def load_audio(self):
+        """Open the pronunciation clip pack, if one was given"""
+        if not self.audio_path:
+            return
         try:
-            self.stats["last_session"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            with open("reuniclus_stats.json", "w", encoding="utf-8") as f:  # Updated filename
-                json.dump(self.stats, f, ensure_ascii=False, indent=2)
+            from audio import AudioPlayer, ClipPack
+            self.audio = AudioPlayer(ClipPack.load(self.audio_path))
         except Exception as e:
-            print("Could not save stats:", e)
+            print("Could not load audio:", e)
+
+    def play_card_audio(self, card):
+        if self.audio is not None:
+            self.audio.play(self.deck.kana(card))
+
+    # ---------------------------- FLASHCARD DATA ----------------------------
+    def load_deck(self, deck_path):
+        """Select a registry deck by name or a binary deck file, falling back to hiragana"""
+        self.decks.register_directory(DECKS_DIR)  # Imported decks are listed, not opened
+        name = DEFAULT_DECK
+        if deck_path in self.decks:
+            name = deck_path
+        elif deck_path:
+            name = self.decks.register_file(deck_path)
+        try:
+            return self.decks.get(name)
+        except Exception as e:
+            print("Could not load deck:", e)
+            return self.decks.get(DEFAULT_DECK)
+
+    def switch_deck(self, name):
+        """Study the named deck from now on; its cards keep their own stats. Returns success"""
+        self.finish_startup()
+        try:
+            entry = self.decks.get(name)  # Built on first selection, cached after
+        except Exception as e:
+            print("Could not load deck:", e)
+            return False
+        self.engine.release_current_card()
+        self.next_card_ready = None
+        self.deck_entry, self.deck = entry, entry.deck
+        self.engine = QuizEngine(self.deck, self.stats, self.stats_writer, indexes=entry.indexes)
+        self.build_indexes()
+        if "reference" in self.screens:
+            self.chart_title_label.configure(text=self.chart_title())
+            self.layout_chart()
+            self.draw_chart_rows()
+        return True
+
+    def select_deck(self):
+        """Switch to the deck picked in the menu's deck selector"""
+        name = self.deck_choices[self.deck_selector.current()][0]
+        if name != self.deck_entry.name and not self.switch_deck(name):
+            self.refresh_deck_selector()  # Show the deck still in use
+
+    def refresh_deck_selector(self):
+        """List every registered deck in the menu, with the current one selected"""
+        self.deck_choices = self.decks.titles()
+        names = [name for name, _ in self.deck_choices]
+        self.deck_selector.configure(values=[title for _, title in self.deck_choices])
+        self.deck_selector.current(names.index(self.deck_entry.name))
+
+    def import_deck(self):
+        """Import a CSV/TSV/Anki/.rpkg file on a worker thread, then switch to it"""
+        if self.import_job is not None:
+            return
+        source = filedialog.askopenfilename(parent=self.root, title="Import Deck",
+                                            filetypes=[("Decks", "*.csv *.tsv *.txt *.apkg *.rpkg"),
+                                                       ("All files", "*")])
+        if not source:
+            return
+        import deck_io  # Only needed when importing
+        self.finish_startup()  # The stats store takes any stats the file carries
+        store = self.stats_store
+
+        def run(progress, cancelled):
+            report = deck_io.import_deck(source, deck_io.imported_deck_path(source),
+                                         progress=progress, cancelled=cancelled)
+            if report.stats:
+                store.import_cards(report.stats)
+            return report
+
+        self.import_job = deck_io.DeckJob(run)
+        self.poll_import()
+
+    def poll_import(self):
+        job = self.import_job
+        if not job.finished:
+            self.menu_import_label.configure(text=f"📥 Importing… {job.fraction():.0%}")
+            self.root.after(IMPORT_POLL_MS, self.poll_import)
+            return
+
+        self.import_job = None
+        if job.error is not None:
+            print("Could not import deck:", job.error)
+            self.menu_import_label.configure(text=f"📥 Import failed: {job.error}")
+            return
+        report = job.report
+        add_card_stats(self.stats, report.stats)  # Already on disk; mirror it for this session
+        self.switch_deck(self.decks.register_file(report.path, report.name))
+        self.refresh_deck_selector()
+        self.menu_import_label.configure(text=f"📚 {report.name}: {report.summary()}")
+        if self.current_screen_name == "menu":
+            self.refresh_menu_stats()
+
+    # ---------------------------- STATS HANDLING ----------------------------
+    def load_stats(self):
+        """Load previous statistics from the JSON files or a SQLite stats database"""
+        if self.stats_db:
+            from stats_sqlite import SqliteStatsStore  # Only needed for the database backend
+            self.stats_store = SqliteStatsStore(self.stats_db)
+        else:
+            self.stats_store = StatsJournal()
+
+        self.stats = self.stats_store.load(default_stats(self.deck.keys()))
+        self.stats_writer = StatsWriter(self.stats_store, self.stats)
+        if self.instrument is not None:
+            self.stats_writer.observer = self.instrument.stats_written
+
+    def stats_counters(self):
+        """Stats writer counters, or ``None`` while stats are still loading"""
+        return self.stats_writer.counters() if self.stats_writer is not None else None
+
+    # ---------------------------- SCREENS ----------------------------
+    def get_screen(self, name):
+        """The persistent frame for a screen, built (but not shown) the first time"""
+        screen = self.screens.get(name)
+        if screen is None:
+            start = time.perf_counter()
+            screen = ttk.Frame(self.main_frame)
+            getattr(self, f"build_{name}_screen")(screen)
+            if self.instrument is not None:
+                self.instrument.screen_built(name, start)
+            self.screens[name] = screen
+        return screen
+
+    def show_screen(self, name):
+        """Swap the visible screen, building it the first time it is needed"""
+        screen = self.get_screen(name)
+        if self.current_screen is not screen:
+            if self.current_screen is not None:
+                self.current_screen.pack_forget()
+                self.bindings.release(self.current_screen_name)
+            screen.pack(fill=tk.BOTH, expand=True)
+            self.current_screen = screen
+            self.current_screen_name = name
+        return screen
 
     # ---------------------------- MAIN MENU ----------------------------
+    @timed_transition
     def create_main_menu(self):
+        """Show the main menu and refresh the stats summary in place"""
+        self.next_card_ready = None
+        if self.engine is not None:
+            self.engine.release_current_card()  # Including a prefetched card
+        self.show_screen("menu")
+        self.multiple_choice_var.set(self.multiple_choice_mode)
+        self.due_only_var.set(self.due_only_mode)
+        self.handwriting_var.set(self.handwriting_mode)
+        self.refresh_menu_stats()
+
+    def refresh_menu_stats(self):
+        """Fill in the menu's stats summary (a placeholder until stats are loaded)"""
+        if self.stats is None:
+            self.menu_stats_label.configure(text="🎯 Loading stats…")
+            self.menu_streak_label.configure(text="")
+            return
+
+        accuracy = 0
+        if self.stats["total_attempts"] > 0:
+            accuracy = (self.stats["total_correct"] / self.stats["total_attempts"]) * 100
+
+        stats_text = f"🎯 {self.stats['total_correct']}/{self.stats['total_attempts']} correct ({accuracy:.1f}%)"
+        streak_text = f"🔥 Streak: {self.stats['streak']} (Best: {self.stats['longest_streak']})"
+
+        self.menu_stats_label.configure(text=stats_text)
+        self.menu_streak_label.configure(text=streak_text)
+
+    def build_menu_screen(self, screen):
         """Create the main menu interface with improved spacing"""
-        self.clear_frame()
-        self.root.unbind('<Return>')
-        
         # Logo and title with elegant spacing
-        title_frame = ttk.Frame(self.main_frame)
+        title_frame = ttk.Frame(screen)
         title_frame.pack(pady=40)  # Increased top padding
-        
+
         # Main title with app name
-        tk.Label(title_frame, 
-                text=f"✨ {APP_NAME} ✨", 
-                font=TITLE_FONT, 
-                fg=PRIMARY_COLOR, 
+        tk.Label(title_frame,
+                text=f"✨ {APP_NAME} ✨",
+                font=TITLE_FONT,
+                fg=PRIMARY_COLOR,
                 bg=BG_COLOR).pack(pady=(0, 5))
-        
+
         # Tagline
-        tk.Label(title_frame, 
-                text=APP_TAGLINE, 
+        tk.Label(title_frame,
+                text=APP_TAGLINE,
                 font=("Nunito", 16, "italic"),  # Stylish tagline font
-                fg=SECONDARY_COLOR, 
+                fg=SECONDARY_COLOR,
                 bg=BG_COLOR).pack(pady=(0, 15))
-        
+
+        # Deck selector; decks are only built when picked
+        deck_frame = ttk.Frame(screen)
+        deck_frame.pack(pady=(0, 5))
+
+        tk.Label(deck_frame,
+                text="Deck:",
+                font=("Nunito", 12),
+                fg=TEXT_COLOR,
+                bg=BG_COLOR).pack(side=tk.LEFT, padx=(0, 8))
+        self.deck_selector = ttk.Combobox(deck_frame,
+                                         state="readonly",
+                                         width=32,
+                                         font=("Nunito", 12))
+        self.deck_selector.pack(side=tk.LEFT)
+        self.deck_selector.bind("<<ComboboxSelected>>", lambda e: self.select_deck())
+        self.refresh_deck_selector()
+
         # Mode toggle with better spacing (multiple choice checkbox)
-        mode_frame = ttk.Frame(self.main_frame)
+        mode_frame = ttk.Frame(screen)
         mode_frame.pack(pady=15)  # Increased padding
-        
+
         self.multiple_choice_var = tk.BooleanVar(value=self.multiple_choice_mode)
-        mc_check = tk.Checkbutton(mode_frame, 
-                                 text="Multiple Choice Mode", 
+        mc_check = tk.Checkbutton(mode_frame,
+                                 text="Multiple Choice Mode",
                                  variable=self.multiple_choice_var,
                                  command=self.toggle_multiple_choice,
                                  font=("Nunito", 12),  # Updated font
@@ -170,495 +466,1000 @@ class ReuniclusApp:  # Renamed class to reflect the official name
                                  fg=TEXT_COLOR,
                                  selectcolor=BG_COLOR)
         mc_check.pack(pady=8)  # Increased padding
-        
+
+        self.due_only_var = tk.BooleanVar(value=self.due_only_mode)
+        due_check = tk.Checkbutton(mode_frame,
+                                  text="Due Cards Only",
+                                  variable=self.due_only_var,
+                                  command=self.toggle_due_only,
+                                  font=("Nunito", 12),
+                                  bg=BG_COLOR,
+                                  activebackground=BG_COLOR,
+                                  fg=TEXT_COLOR,
+                                  selectcolor=BG_COLOR)
+        due_check.pack(pady=8)
+
+        self.handwriting_var = tk.BooleanVar(value=self.handwriting_mode)
+        self.handwriting_check = tk.Checkbutton(mode_frame,
+                                               text="Handwriting Input (Romaji → Kana)",
+                                               variable=self.handwriting_var,
+                                               command=self.toggle_handwriting,
+                                               font=("Nunito", 12),
+                                               bg=BG_COLOR,
+                                               activebackground=BG_COLOR,
+                                               fg=TEXT_COLOR,
+                                               selectcolor=BG_COLOR)
+        self.handwriting_check.pack(pady=8)
+        if not os.path.exists(STROKES_FILE):  # Cheap check; NumPy is only imported when ticked
+            self.disable_handwriting("import stroke templates first")
+
         # Practice buttons with improved spacing
-        button_frame = ttk.Frame(self.main_frame)
+        button_frame = ttk.Frame(screen)
         button_frame.pack(pady=25)  # Increased padding
-        
-        study_button = ttk.Button(button_frame, 
-                                 text="Study Hiragana → Romaji", 
+
+        study_button = ttk.Button(button_frame,
+                                 text="Study Kana → Romaji",
                                  command=lambda: self.start_practice("hiragana_to_romaji"))
         study_button.pack(pady=15, fill=tk.X, padx=70)  # Increased padding and width
-        
-        reverse_button = ttk.Button(button_frame, 
-                                   text="Study Romaji → Hiragana", 
+
+        reverse_button = ttk.Button(button_frame,
+                                   text="Study Romaji → Kana",
                                    command=lambda: self.start_practice("romaji_to_hiragana"))
         reverse_button.pack(pady=15, fill=tk.X, padx=70)  # Increased padding and width
-        
-        reference_button = ttk.Button(button_frame, 
-                                     text="Hiragana Reference Chart", 
+
+        reference_button = ttk.Button(button_frame,
+                                     text="Reference Chart",
                                      command=self.show_reference)
         reference_button.pack(pady=15, fill=tk.X, padx=70)  # Increased padding and width
-        
+
+        progress_button = ttk.Button(button_frame,
+                                    text="Progress Dashboard",
+                                    command=self.show_dashboard)
+        progress_button.pack(pady=15, fill=tk.X, padx=70)
+
+        analytics_button = ttk.Button(button_frame,
+                                     text="Learning Analytics",
+                                     command=self.show_analytics)
+        analytics_button.pack(pady=15, fill=tk.X, padx=70)
+
+        import_button = ttk.Button(button_frame,
+                                  text="Import Deck…",
+                                  command=self.import_deck)
+        import_button.pack(pady=15, fill=tk.X, padx=70)
+        self.menu_import_label = tk.Label(button_frame,
+                                         font=("Nunito", 11),
+                                         fg=SECONDARY_COLOR,
+                                         bg=BG_COLOR)
+        self.menu_import_label.pack()
+
         # Stats display with improved spacing
-        stats_frame = ttk.Frame(self.main_frame)
+        stats_frame = ttk.Frame(screen)
         stats_frame.pack(pady=30, fill=tk.X, padx=70)  # Increased padding
-        
+
         # Add a decorative line above stats
         separator = ttk.Separator(stats_frame, orient='horizontal')
         separator.pack(fill=tk.X, pady=(0, 15))
-        
-        accuracy = 0
-        if self.stats["total_attempts"] > 0:
-            accuracy = (self.stats["total_correct"] / self.stats["total_attempts"]) * 100
-            
-        stats_text = f"🎯 {self.stats['total_correct']}/{self.stats['total_attempts']} correct ({accuracy:.1f}%)"
-        streak_text = f"🔥 Streak: {self.stats['streak']} (Best: {self.stats['longest_streak']})"
-        
-        tk.Label(stats_frame, 
-                 text=stats_text, 
-                 font=("Nunito", 14),  # Updated font and size
-                 bg=BG_COLOR).pack(pady=8)  # Increased padding
-        tk.Label(stats_frame, 
-                 text=streak_text, 
-                 font=("Nunito", 14),  # Updated font and size
-                 bg=BG_COLOR).pack(pady=8)  # Increased padding
-        
+
+        self.menu_stats_label = tk.Label(stats_frame,
+                                        font=("Nunito", 14),  # Updated font and size
+                                        bg=BG_COLOR)
+        self.menu_stats_label.pack(pady=8)  # Increased padding
+        self.menu_streak_label = tk.Label(stats_frame,
+                                         font=("Nunito", 14),  # Updated font and size
+                                         bg=BG_COLOR)
+        self.menu_streak_label.pack(pady=8)  # Increased padding
+
         # Exit button (small and subtle)
-        exit_button = ttk.Button(self.main_frame, 
-                                text="Exit", 
-                                command=self.root.destroy)
+        exit_button = ttk.Button(screen,
+                                text="Exit",
+                                command=self.exit_app)
         exit_button.pack(pady=20)  # Increased padding
 
     # ---------------------------- PRACTICE MODE ----------------------------
     def start_practice(self, mode):
         """Start practice session with selected mode"""
+        self.finish_startup()
         self.practice_mode = mode
-        self.practice_cards = self.flashcards.copy()
-        random.shuffle(self.practice_cards)
-        self.session_correct = 0
-        self.session_total = 0
+        self.next_card_ready = None
+        self.engine.start(mode, self.due_only_mode)
         self.show_next_card()
 
+    @timed_transition
     def show_next_card(self):
-        """Show the next flashcard with improved spacing"""
-        self.clear_frame()
-        
-        if not self.practice_cards:
+        """Show the next flashcard; usually just a swap, as it was prepared during feedback"""
+        ready, self.next_card_ready = self.next_card_ready, None
+        if ready is None:
+            ready = self.prepare_next_card()
+        if not ready:
             self.show_session_results()
             return
-        
-        self.current_card = self.practice_cards.pop(0)
-        
+
+        self.show_screen("card")
+        if self.practice_mode == "romaji_to_hiragana":  # Hearing the kana would give away its romaji
+            self.play_card_audio(self.engine.current_card)
+        if self.multiple_choice_mode:
+            self.main_frame.focus_set()  # Keep Space away from the hidden entry
+            self.bindings.replace("card", self.root, {"<space>": lambda e: self.show_next_card()})
+        elif self.handwriting_active():
+            self.main_frame.focus_set()
+            self.bindings.replace("card", self.root, {"<Return>": lambda e: self.check_drawing(),
+                                                      "<BackSpace>": lambda e: self.undo_stroke()})
+        else:
+            self.answer_entry.focus()
+            self.bindings.replace("card", self.root, {"<Return>": lambda e: self.check_answer()})
+
+    def prepare_next_card(self):
+        """Draw the next card and fill in the card screen, visible or not; False when the session is over"""
+        if self.engine.next_card() is None:
+            return False
+        self.get_screen("card")
+
+        # Show practice mode and card count
+        self.card_mode_label.configure(text=f"{APP_NAME} - {self.engine.mode_title()}")
+        self.card_count_label.configure(
+            text=f"Cards: {self.engine.session_remaining + 1}/{self.engine.session_size}")
+        self.show_question_face(self.engine.question())
+        if self.audio is not None:
+            self.audio.preload(self.deck.kana(card) for card in
+                               [self.engine.current_card] + self.engine.upcoming(AUDIO_PRELOAD_AHEAD))
+
+        if self.multiple_choice_mode:
+            self.show_multiple_choice()
+        elif self.handwriting_active():
+            self.show_handwriting(self.engine.answer_label())
+        else:
+            self.show_free_answer(self.engine.answer_label())
+        return True
+
+    def prefetch_next_card(self):
+        """Idle callback: prepare the next card off-screen while the learner reads the feedback"""
+        if self.current_screen_name == "answer" and self.next_card_ready is None:
+            start = time.perf_counter()
+            self.next_card_ready = self.prepare_next_card()
+            if self.instrument is not None:
+                self.instrument.trace.complete("prefetch next card", "prefetch", start)
+
+    def build_card_screen(self, screen):
+        """Create the flashcard screen with both answer panels"""
         # Header with session info
-        header_frame = ttk.Frame(self.main_frame)
+        header_frame = ttk.Frame(screen)
         header_frame.pack(fill=tk.X, pady=(10, 30))
-        
-        # Show practice mode and card count
-        mode_text = "Hiragana → Romaji" if self.practice_mode == "hiragana_to_romaji" else "Romaji → Hiragana"
-        cards_remaining = len(self.practice_cards) + 1
-        
-        tk.Label(header_frame, 
-                text=f"{APP_NAME} - {mode_text}",
-                font=("Nunito", 14, "bold"),
-                fg=SECONDARY_COLOR,
-                bg=BG_COLOR).pack(side=tk.LEFT, padx=20)
-        
-        tk.Label(header_frame, 
-                text=f"Cards: {cards_remaining}/{len(self.flashcards)}",
-                font=("Nunito", 12),
-                fg=TEXT_COLOR,
-                bg=BG_COLOR).pack(side=tk.RIGHT, padx=20)
-        
+
+        self.card_mode_label = tk.Label(header_frame,
+                                       font=("Nunito", 14, "bold"),
+                                       fg=SECONDARY_COLOR,
+                                       bg=BG_COLOR)
+        self.card_mode_label.pack(side=tk.LEFT, padx=20)
+
+        self.card_count_label = tk.Label(header_frame,
+                                        font=("Nunito", 12),
+                                        fg=TEXT_COLOR,
+                                        bg=BG_COLOR)
+        self.card_count_label.pack(side=tk.RIGHT, padx=20)
+
         # Question display (centered card) with improved spacing
-        card_frame = ttk.Frame(self.main_frame)
+        card_frame = ttk.Frame(screen)
         card_frame.pack(expand=True, pady=50)
-        
-        if self.practice_mode == "hiragana_to_romaji":
-            question = self.current_card["hiragana"]
-            answer_label = "Romaji:"
-        else:
-            question = self.current_card["romaji"]
-            answer_label = "Hiragana:"
-        
+
         # Card container with visual border effect
-        card_container = tk.Frame(card_frame, 
-                                 bd=2, 
-                                 relief=tk.RIDGE, 
+        card_container = tk.Frame(card_frame,
+                                 bd=2,
+                                 relief=tk.RIDGE,
                                  bg=BG_COLOR,
                                  highlightbackground=PRIMARY_COLOR,
                                  highlightthickness=2)
         card_container.pack(padx=40, pady=20, ipadx=40, ipady=40)
-        
+
         # Large hiragana/romaji display
-        tk.Label(card_container, 
-                text=question, 
-                font=CARD_FONT_LARGE, 
-                fg=PRIMARY_COLOR, 
-                bg=BG_COLOR).pack(pady=20)
-        
-        if self.multiple_choice_mode:
-            self.show_multiple_choice()
+        self.question_label = tk.Label(card_container,
+                                      font=self.card_font(CARD_FONT_LARGE),
+                                      fg=PRIMARY_COLOR,
+                                      bg=BG_COLOR)
+        self.question_label.pack(pady=20)
+
+        self.build_free_answer_panel(screen)
+        self.build_multiple_choice_panel(screen)
+        self.build_handwriting_panel(screen)
+
+    def show_question_face(self, text):
+        """Show the question as a cached image, falling back to text"""
+        image = self.card_face(text, CARD_FONT_LARGE, PRIMARY_COLOR)
+        if image is None:
+            self.question_label.configure(image="", text=text)
         else:
-            self.show_free_answer(answer_label)
+            self.question_label.configure(image=image, text="")
+        self.question_label.image = image  # Keep the image alive while it is shown
 
-    def show_free_answer(self, answer_label):
+    def build_free_answer_panel(self, screen):
         """Elegant free-answer input with improved spacing"""
-        answer_frame = ttk.Frame(self.main_frame)
+        self.free_answer_panel = ttk.Frame(screen)
+
+        answer_frame = ttk.Frame(self.free_answer_panel)
         answer_frame.pack(pady=30)  # Increased padding
-        
-        tk.Label(answer_frame, 
-                text=answer_label, 
-                font=("Nunito", 14, "bold"),  # Updated font
-                fg=TEXT_COLOR, 
-                bg=BG_COLOR).pack(side=tk.LEFT, padx=10)  # Increased padding
-        
+
+        self.answer_prompt_label = tk.Label(answer_frame,
+                                           font=("Nunito", 14, "bold"),  # Updated font
+                                           fg=TEXT_COLOR,
+                                           bg=BG_COLOR)
+        self.answer_prompt_label.pack(side=tk.LEFT, padx=10)  # Increased padding
+
         self.answer_var = tk.StringVar()
-        answer_entry = ttk.Entry(answer_frame, 
-                                textvariable=self.answer_var, 
-                                font=CARD_FONT_SMALL, 
-                                width=18)  # Increased width
-        answer_entry.pack(side=tk.LEFT, padx=10)  # Increased padding
-        answer_entry.focus()
-        
+        self.answer_var.trace_add("write", self.on_answer_typed)
+        self.kana_input = False  # Convert typed romaji to hiragana (romaji → hiragana mode)
+        self.katakana_input = False  # ...and on to katakana when the answer is katakana
+        self.answer_entry = ttk.Entry(answer_frame,
+                                     textvariable=self.answer_var,
+                                     font=CARD_FONT_SMALL,
+                                     width=18)  # Increased width
+        self.answer_entry.pack(side=tk.LEFT, padx=10)  # Increased padding
+
         # Buttons (centered) with improved spacing
-        button_frame = ttk.Frame(self.main_frame)
+        button_frame = ttk.Frame(self.free_answer_panel)
         button_frame.pack(pady=40)  # Increased padding
-        
-        ttk.Button(button_frame, 
-                  text="Check Answer (Enter)", 
+
+        ttk.Button(button_frame,
+                  text="Check Answer (Enter)",
                   command=self.check_answer).pack(side=tk.LEFT, padx=15)  # Increased padding
-        
-        ttk.Button(button_frame, 
-                  text="Back to Menu (Esc)", 
+
+        ttk.Button(button_frame,
+                  text="Back to Menu (Esc)",
                   command=self.create_main_menu).pack(side=tk.LEFT, padx=15)  # Increased padding
-        
-        self.root.bind('<Return>', lambda e: self.check_answer())
 
-    def show_multiple_choice(self):
+    def build_multiple_choice_panel(self, screen):
         """Stylish multiple-choice buttons with improved spacing"""
-        if self.practice_mode == "hiragana_to_romaji":
-            correct_answer = self.current_card["romaji"]
-            all_answers = [card["romaji"] for card in self.flashcards if card["romaji"] != correct_answer]
-        else:
-            correct_answer = self.current_card["hiragana"]
-            all_answers = [card["hiragana"] for card in self.flashcards if card["hiragana"] != correct_answer]
-        
-        # Select 3 incorrect answers
-        options = random.sample(all_answers, min(3, len(all_answers))) + [correct_answer]
-        random.shuffle(options)
-        
+        self.multiple_choice_panel = ttk.Frame(screen)
+
         # Grid of choice buttons with improved spacing
-        choice_frame = ttk.Frame(self.main_frame)
+        choice_frame = ttk.Frame(self.multiple_choice_panel)
         choice_frame.pack(pady=40, padx=60)  # Increased padding
-        
+
         # Configure columns with equal weight
         choice_frame.columnconfigure(0, weight=1)
         choice_frame.columnconfigure(1, weight=1)
-        
-        for i, option in enumerate(options):
-            btn = ttk.Button(choice_frame, 
-                            text=option, 
-                            command=lambda o=option: self.check_answer(o))
+
+        self.choice_buttons = []
+        for i in range(4):
+            btn = ttk.Button(choice_frame, command=lambda i=i: self.choose_option(i))  # Bound once
             btn.grid(row=i//2, column=i%2, padx=15, pady=15, sticky="nsew")  # Increased padding
-        
+            self.choice_buttons.append(btn)
+
         # Navigation buttons with improved spacing
-        nav_frame = ttk.Frame(self.main_frame)
+        nav_frame = ttk.Frame(self.multiple_choice_panel)
         nav_frame.pack(pady=30)  # Increased padding
-        
-        ttk.Button(nav_frame, 
-                  text="Skip (Space)", 
+
+        ttk.Button(nav_frame,
+                  text="Skip (Space)",
                   command=self.show_next_card).pack(side=tk.LEFT, padx=15)  # Increased padding
-        
-        ttk.Button(nav_frame, 
-                  text="Back to Menu (Esc)", 
+
+        ttk.Button(nav_frame,
+                  text="Back to Menu (Esc)",
                   command=self.create_main_menu).pack(side=tk.LEFT, padx=15)  # Increased padding
-        
-        self.root.bind('<space>', lambda e: self.show_next_card())
 
-    def check_answer(self, user_answer=None):
+    def show_free_answer(self, answer_label):
+        """Switch the card screen to the free-answer panel"""
+        self.multiple_choice_panel.pack_forget()
+        self.handwriting_panel.pack_forget()
+        self.free_answer_panel.pack()
+
+        self.answer_prompt_label.configure(text=answer_label)
+        self.answer_var.set("")
+        self.kana_input = self.engine.mode == "romaji_to_hiragana"
+        self.katakana_input = self.kana_input and is_katakana(self.engine.correct_answer())
+
+    def on_answer_typed(self, *args):
+        """Turn romaji into hiragana on each keystroke when the answer is kana"""
+        if not self.kana_input:
+            return
+        text = self.answer_var.get()
+        converted = live_kana(text)
+        if self.katakana_input:
+            converted = to_katakana(converted)
+        if converted != text:
+            self.answer_var.set(converted)  # Re-enters this trace once, as a no-op
+            self.answer_entry.icursor(tk.END)
+
+    def show_multiple_choice(self):
+        """Switch the card screen to the multiple-choice panel with fresh options"""
+        self.free_answer_panel.pack_forget()
+        self.handwriting_panel.pack_forget()
+        self.multiple_choice_panel.pack()
+
+        # 3 incorrect answers, favouring ones this learner tends to confuse
+        self.current_options = self.engine.options()
+
+        for i, btn in enumerate(self.choice_buttons):
+            if i < len(self.current_options):
+                btn.configure(text=self.current_options[i])
+                btn.grid()
+            else:
+                btn.grid_remove()
+
+    def choose_option(self, index):
+        """Answer with one of the multiple-choice buttons"""
+        self.check_answer(self.current_options[index])
+
+    def check_answer(self, user_answer=None, drawing=None):
         """Check the user's answer against the correct answer"""
         if user_answer is None:  # Free answer mode
             user_answer = self.answer_var.get().strip().lower()
-        
-        if self.practice_mode == "hiragana_to_romaji":
-            correct_answer = self.current_card["romaji"]
-        else:  # romaji_to_hiragana
-            correct_answer = self.current_card["hiragana"]
-        
-        is_correct = (str(user_answer).lower() == str(correct_answer).lower())
-        self.show_answer(is_correct, user_answer)
-
-    def show_answer(self, is_correct=False, user_answer=""):
-        """Luxe answer feedback screen with improved spacing"""
-        self.clear_frame()
-        self.root.unbind('<Return>')
-        self.root.unbind('<space>')
-        
-        # Update stats
-        self.session_total += 1
-        card_hiragana = self.current_card["hiragana"]
-        
-        if card_hiragana not in self.stats["hiragana_stats"]:
-            self.stats["hiragana_stats"][card_hiragana] = {"correct": 0, "attempts": 0}
-            
-        self.stats["hiragana_stats"][card_hiragana]["attempts"] += 1
-        self.stats["total_attempts"] += 1
-        
+            if self.kana_input:
+                user_answer = to_kana(user_answer)  # Finish a trailing "n"
+                if self.katakana_input:
+                    user_answer = to_katakana(user_answer)
+
+        self.show_answer(self.engine.check(user_answer), user_answer, drawing)
+
+    @timed_transition
+    def show_answer(self, is_correct=False, user_answer="", drawing=None):
+        """Luxe answer feedback screen, updated in place"""
+        # Update stats (the engine hands the record to the stats writer)
+        self.engine.answer(is_correct, user_answer)
+        card = self.engine.current_card
+
         if is_correct:
-            self.session_correct += 1
-            self.stats["total_correct"] += 1
-            self.stats["hiragana_stats"][card_hiragana]["correct"] += 1
-            self.stats["streak"] += 1
-            self.stats["longest_streak"] = max(self.stats["streak"], self.stats["longest_streak"])
             result_text = "✅ Correct!"
             result_color = CORRECT_COLOR
         else:
-            self.stats["streak"] = 0
             result_text = "❌ Incorrect"
             result_color = INCORRECT_COLOR
-        
+
+        self.show_screen("answer")
+        self.result_label.configure(text=result_text, fg=result_color)
+        kana = self.deck.kana(card)
+        self.detail_hiragana_label.configure(text=f"{'Katakana' if is_katakana(kana) else 'Hiragana'}: {kana}")
+        self.detail_romaji_label.configure(text=f"Romaji: {self.deck.romaji(card)}")
+        self.detail_answer_label.configure(text=f"Your answer: {user_answer}")
+        self.teach_sample = (kana, drawing) if drawing and not is_correct else None
+        if self.teach_sample:  # Perhaps misread: offer to learn the drawing
+            self.teach_button.configure(text=f"I Wrote {kana}: Teach My Drawing", state=tk.NORMAL)
+            self.teach_button.pack(pady=(0, 10))
+        else:
+            self.teach_button.pack_forget()
+        self.main_frame.focus_set()
+        self.play_card_audio(card)
+
+        self.bindings.replace("answer", self.root, {"<space>": lambda e: self.show_next_card()})
+        self.root.after_idle(self.prefetch_next_card)
+
+    def build_answer_screen(self, screen):
+        """Create the answer feedback screen with improved spacing"""
         # Header with app name
-        header_frame = ttk.Frame(self.main_frame)
+        header_frame = ttk.Frame(screen)
         header_frame.pack(fill=tk.X, pady=(10, 30))
-        
-        tk.Label(header_frame, 
+
+        tk.Label(header_frame,
                 text=APP_NAME,
                 font=("Nunito", 14, "bold"),
                 fg=SECONDARY_COLOR,
                 bg=BG_COLOR).pack(side=tk.LEFT, padx=20)
-        
+
         # Result display (centered) with improved spacing
-        result_frame = ttk.Frame(self.main_frame)
-        result_frame.pack(expand=True, pady=20) 
-        
-        tk.Label(result_frame, 
-                text=result_text, 
-                font=("Nunito", 28, "bold"),  # Updated font and size 
-                fg=result_color, 
-                bg=BG_COLOR).pack(pady=25)  # Increased padding
-        
+        result_frame = ttk.Frame(screen)
+        result_frame.pack(expand=True, pady=20)
+
+        self.result_label = tk.Label(result_frame,
+                                    font=("Nunito", 28, "bold"),  # Updated font and size
+                                    bg=BG_COLOR)
+        self.result_label.pack(pady=25)  # Increased padding
+
         # Card details (as a neat "card") with improved styling
-        card_border = tk.Frame(result_frame, 
-                             bd=2, 
-                             relief=tk.RIDGE, 
+        card_border = tk.Frame(result_frame,
+                             bd=2,
+                             relief=tk.RIDGE,
                              bg=BG_COLOR,
                              highlightbackground=SECONDARY_COLOR,
                              highlightthickness=1)
         card_border.pack(pady=20, padx=60, fill=tk.X)
-        
+
         detail_frame = ttk.Frame(card_border)
         detail_frame.pack(pady=20, padx=30, fill=tk.X)
-        
-        tk.Label(detail_frame, 
-                text=f"Hiragana: {self.current_card['hiragana']}", 
-                font=("Nunito", 22),  # Updated font and size
-                bg=BG_COLOR).pack(pady=8)  # Increased padding
-        
-        tk.Label(detail_frame, 
-                text=f"Romaji: {self.current_card['romaji']}", 
-                font=("Nunito", 18),  # Updated font and size
-                bg=BG_COLOR).pack(pady=8)  # Increased padding
-        
-        tk.Label(detail_frame, 
-                text=f"Your answer: {user_answer}", 
-                font=("Nunito", 16),  # Updated font and size
-                bg=BG_COLOR).pack(pady=12)  # Increased padding
-        
+
+        self.detail_hiragana_label = tk.Label(detail_frame,
+                                             font=("Nunito", 22),  # Updated font and size
+                                             bg=BG_COLOR)
+        self.detail_hiragana_label.pack(pady=8)  # Increased padding
+
+        self.detail_romaji_label = tk.Label(detail_frame,
+                                           font=("Nunito", 18),  # Updated font and size
+                                           bg=BG_COLOR)
+        self.detail_romaji_label.pack(pady=8)  # Increased padding
+
+        self.detail_answer_label = tk.Label(detail_frame,
+                                           font=("Nunito", 16),  # Updated font and size
+                                           bg=BG_COLOR)
+        self.detail_answer_label.pack(pady=12)  # Increased padding
+
         # Next card button (big and inviting) with improved spacing
-        ttk.Button(result_frame, 
-                  text="Next Card (Space)", 
+        ttk.Button(result_frame,
+                  text="Next Card (Space)",
                   command=self.show_next_card).pack(pady=30)  # Increased padding
-        
-        self.root.bind('<space>', lambda e: self.show_next_card())
-        self.save_stats()
+
+        # Shown after a wrong handwritten answer, in case the recognizer misread it
+        self.teach_button = ttk.Button(result_frame, command=self.teach_drawing)
+
+    # ---------------------------- HANDWRITING ----------------------------
+    def handwriting_active(self):
+        """Whether this card's answer is drawn: handwriting on in romaji → kana and a template
+        for its kana (otherwise it's typed; multiple choice still wins)"""
+        return (self.handwriting_mode and self.practice_mode == "romaji_to_hiragana"
+                and self.engine.correct_answer() in self.recognizer)
+
+    def load_recognizer(self):
+        """Prepare the recognizer from the saved stroke templates; a reason it can't, or ``None``"""
+        if self.recognizer is None:
+            try:
+                from handwriting import Recognizer, StrokeTemplates  # Optional: needs NumPy
+            except ImportError:
+                return "install NumPy"
+            try:
+                templates = StrokeTemplates.load(STROKES_FILE)
+            except Exception as e:
+                print("Could not load stroke templates:", e)
+                templates = StrokeTemplates()
+            self.recognizer = Recognizer(templates)
+        if not len(self.recognizer):
+            return "import stroke templates first"
+        return None
+
+    def disable_handwriting(self, reason):
+        self.handwriting_var.set(False)
+        self.handwriting_mode = False
+        self.handwriting_check.configure(text=f"Handwriting Input ({reason})", state=tk.DISABLED)
+
+    def build_handwriting_panel(self, screen):
+        """Canvas to write the kana on, with its buttons; pen events are bound once here"""
+        self.handwriting_panel = ttk.Frame(screen)
+
+        self.handwriting_prompt_label = tk.Label(self.handwriting_panel,
+                                                font=("Nunito", 14, "bold"),
+                                                fg=TEXT_COLOR,
+                                                bg=BG_COLOR)
+        self.handwriting_prompt_label.pack(pady=(0, 8))
+
+        canvas = self.handwriting_canvas = tk.Canvas(self.handwriting_panel,
+                                                     width=HANDWRITING_SIZE,
+                                                     height=HANDWRITING_SIZE,
+                                                     bg="white",
+                                                     highlightbackground=SECONDARY_COLOR,
+                                                     highlightthickness=2,
+                                                     cursor="pencil")
+        canvas.pack()
+        middle = HANDWRITING_SIZE // 2  # Guide lines, like practice paper
+        canvas.create_line(middle, 0, middle, HANDWRITING_SIZE, fill=UNSEEN_COLOR, dash=(4, 4))
+        canvas.create_line(0, middle, HANDWRITING_SIZE, middle, fill=UNSEEN_COLOR, dash=(4, 4))
+        canvas.bind("<ButtonPress-1>", self.start_stroke)
+        canvas.bind("<B1-Motion>", self.extend_stroke)
+
+        button_frame = ttk.Frame(self.handwriting_panel)
+        button_frame.pack(pady=20)
+
+        ttk.Button(button_frame,
+                  text="Check Answer (Enter)",
+                  command=self.check_drawing).pack(side=tk.LEFT, padx=10)
+
+        ttk.Button(button_frame,
+                  text="Undo Stroke (Backspace)",
+                  command=self.undo_stroke).pack(side=tk.LEFT, padx=10)
+
+        ttk.Button(button_frame,
+                  text="Clear",
+                  command=self.clear_drawing).pack(side=tk.LEFT, padx=10)
+
+        ttk.Button(button_frame,
+                  text="Back to Menu (Esc)",
+                  command=self.create_main_menu).pack(side=tk.LEFT, padx=10)
+
+    def show_handwriting(self, answer_label):
+        """Switch the card screen to an empty handwriting canvas"""
+        self.free_answer_panel.pack_forget()
+        self.multiple_choice_panel.pack_forget()
+        self.handwriting_panel.pack()
+
+        self.clear_drawing()
+        self.handwriting_prompt_label.configure(text=f"Write the {answer_label.rstrip(':').lower()}")
+
+    def start_stroke(self, event):
+        """Pen down: begin a stroke with a dot, so taps show too"""
+        self.strokes.append([(event.x, event.y)])
+        radius = PEN_WIDTH / 2
+        self.handwriting_canvas.create_oval(event.x - radius, event.y - radius, event.x + radius, event.y + radius,
+                                            fill=TEXT_COLOR, outline="", tags=("ink", f"stroke{len(self.strokes)}"))
+
+    def extend_stroke(self, event):
+        """Pen moved: extend the stroke, skipping moves too small to matter"""
+        if not self.strokes:
+            return
+        stroke = self.strokes[-1]
+        last_x, last_y = stroke[-1]
+        if abs(event.x - last_x) + abs(event.y - last_y) < MIN_PEN_STEP:
+            return
+        stroke.append((event.x, event.y))
+        self.handwriting_canvas.create_line(last_x, last_y, event.x, event.y,
+                                            width=PEN_WIDTH,
+                                            fill=TEXT_COLOR,
+                                            capstyle=tk.ROUND,
+                                            tags=("ink", f"stroke{len(self.strokes)}"))
+
+    def undo_stroke(self):
+        if self.strokes:
+            self.handwriting_canvas.delete(f"stroke{len(self.strokes)}")
+            self.strokes.pop()
+
+    def clear_drawing(self):
+        self.handwriting_canvas.delete("ink")
+        self.strokes = []
+
+    def check_drawing(self):
+        """Recognize the drawing and check the closest kana as the answer"""
+        if not self.strokes:
+            return
+        start = time.perf_counter()
+        matches = self.recognizer.recognize(self.strokes)
+        if self.instrument is not None:
+            self.instrument.trace.complete("recognize handwriting", "handwriting", start)
+        self.check_answer(matches[0][0] if matches else "", drawing=self.strokes)
+
+    def teach_drawing(self):
+        """Keep the drawing just marked wrong as a template for the card's kana"""
+        if self.teach_sample is None:
+            return
+        kana, strokes = self.teach_sample
+        self.teach_sample = None
+        self.recognizer.add(kana, strokes)
+        try:
+            self.recognizer.templates.save()
+        except OSError as e:
+            print("Could not save stroke templates:", e)
+        self.teach_button.configure(text=f"Learned {kana} ✓", state=tk.DISABLED)
 
     # ---------------------------- REFERENCE CHART ----------------------------
+    @timed_transition
     def show_reference(self):
+        """Show the reference chart (built once on first visit)"""
+        self.finish_startup()  # The chart uses the resolved fonts and glyph cache
+        self.show_screen("reference")
+
+        # Mousewheel scrolling, only while the chart is on screen
+        self.bindings.release("reference")
+        self.bindings.bind_all("reference", self.chart_canvas, "<MouseWheel>",
+                               lambda e: self.chart_canvas.yview_scroll(int(-1*(e.delta/120)), "units"))
+
+    def build_reference_screen(self, screen):
         """Fancy scrollable reference chart with improved spacing"""
-        self.clear_frame()
-        
         # Header with title and back button
-        header_frame = ttk.Frame(self.main_frame)
+        header_frame = ttk.Frame(screen)
         header_frame.pack(fill=tk.X, pady=15)  # Increased padding
-        
-        tk.Label(header_frame, 
-                text=f"{APP_NAME} - 📖 Hiragana Reference", 
-                font=("Nunito", 20, "bold"),  # Updated font and size
-                fg=SECONDARY_COLOR, 
-                bg=BG_COLOR).pack(side=tk.LEFT, padx=25)  # Increased padding
-        
-        ttk.Button(header_frame, 
-                  text="Back (Esc)", 
+
+        self.chart_title_label = tk.Label(header_frame,
+                                         text=self.chart_title(),
+                                         font=("Nunito", 20, "bold"),  # Updated font and size
+                                         fg=SECONDARY_COLOR,
+                                         bg=BG_COLOR)
+        self.chart_title_label.pack(side=tk.LEFT, padx=25)  # Increased padding
+
+        ttk.Button(header_frame,
+                  text="Back (Esc)",
                   command=self.create_main_menu).pack(side=tk.RIGHT, padx=25)  # Increased padding
-        
-        # Scrollable canvas
-        canvas = tk.Canvas(self.main_frame, bg=BG_COLOR, highlightthickness=0)
-        scrollbar = ttk.Scrollbar(self.main_frame, orient="vertical", command=canvas.yview)
-        
-        canvas.configure(yscrollcommand=scrollbar.set)
-        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(20, 0))  # Added padding
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y, padx=(0, 20))  # Added padding
-        
-        # Frame inside canvas
-        chart_frame = ttk.Frame(canvas)
-        canvas.create_window((0, 0), window=chart_frame, anchor="nw")
-        
-        # Add section headers
-        tk.Label(chart_frame, 
-                text="Basic Hiragana Characters", 
-                font=("Nunito", 16, "bold"),
-                fg=PRIMARY_COLOR, 
-                bg=BG_COLOR).grid(row=0, column=0, sticky="w", padx=60, pady=(20, 10))
-        
-        # Add flashcards in a grid with improved spacing
-        for i, card in enumerate(self.flashcards):
-            # Add section headers at appropriate places
-            if i == 5:  # Before "ka" row
-                tk.Label(chart_frame, 
-                        text="K-row Characters", 
-                        font=("Nunito", 16, "bold"),
-                        fg=PRIMARY_COLOR, 
-                        bg=BG_COLOR).grid(row=i+1, column=0, sticky="w", padx=60, pady=(20, 10))
-                i += 1
-            elif i == 10 + 1:  # Before "sa" row (adjusted for header)
-                tk.Label(chart_frame, 
-                        text="S-row Characters", 
-                        font=("Nunito", 16, "bold"),
-                        fg=PRIMARY_COLOR, 
-                        bg=BG_COLOR).grid(row=i+1, column=0, sticky="w", padx=60, pady=(20, 10))
-                i += 1
-            # Add more section headers as needed for other rows
-            
-            row_frame = ttk.Frame(chart_frame)
-            row_frame.grid(row=i+2, column=0, sticky="ew", padx=60, pady=8)  # Increased padding
-            
-            # Add character card with border
-            char_frame = tk.Frame(row_frame, 
-                                bd=1, 
-                                relief=tk.RIDGE, 
-                                bg=BG_COLOR)
-            char_frame.pack(side=tk.LEFT, padx=20)
-            
-            tk.Label(char_frame, 
-                    text=card["hiragana"], 
-                    font=("Nunito", 40),  # Updated font and size
-                    width=2, 
-                    bg=BG_COLOR,
-                    padx=10,
-                    pady=5).pack()
-            
-            tk.Label(row_frame, 
-                    text=card["romaji"], 
-                    font=("Nunito", 18),  # Updated font and size
-                    bg=BG_COLOR).pack(side=tk.LEFT, padx=15)  # Increased padding
-        
-        # Update scrollregion
-        chart_frame.update_idletasks()
-        canvas.config(scrollregion=canvas.bbox("all"))
-        
-        # Mousewheel scrolling
-        canvas.bind_all("<MouseWheel>", lambda e: canvas.yview_scroll(int(-1*(e.delta/120)), "units"))
+
+        # Scrollable canvas; only the rows in view are drawn, from a recycled pool of items
+        self.chart_canvas = tk.Canvas(screen, bg=BG_COLOR, highlightthickness=0)
+        self.chart_scrollbar = ttk.Scrollbar(screen, orient="vertical", command=self.chart_canvas.yview)
+
+        self.chart_canvas.configure(yscrollcommand=self.on_chart_scroll)
+        self.chart_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(20, 0))  # Added padding
+        self.chart_scrollbar.pack(side=tk.RIGHT, fill=tk.Y, padx=(0, 20))  # Added padding
+
+        self.chart_slots = []  # Recycled (border, character, romaji, header, glyph) canvas items
+        self.chart_images = {}  # Glyph item -> PhotoImage it shows (keeps it alive)
+        self.layout_chart()
+        self.chart_canvas.bind("<Configure>", lambda e: self.draw_chart_rows())
+
+    def chart_title(self):
+        return f"{APP_NAME} - 📖 {self.deck.name} Reference"
+
+    def layout_chart(self):
+        """Chart row positions, with section headers from the deck metadata (computed once per deck)"""
+        if self.deck_entry.chart is None:
+            section_titles = {start: title for title, start in self.deck.sections}
+            rows = []  # ("header", title) or ("card", index)
+            row_tops = []
+
+            y = 0
+            for i in range(len(self.deck)):
+                if i in section_titles:
+                    rows.append(("header", section_titles[i]))
+                    row_tops.append(y)
+                    y += CHART_HEADER_HEIGHT
+                rows.append(("card", i))
+                row_tops.append(y)
+                y += CHART_ROW_HEIGHT
+            self.deck_entry.chart = (rows, row_tops, y)
+
+        self.chart_rows, self.chart_row_tops, height = self.deck_entry.chart
+        self.chart_canvas.configure(scrollregion=(0, 0, 0, height + CHART_ROW_HEIGHT // 2))
+        self.chart_canvas.yview_moveto(0)
+
+    def on_chart_scroll(self, first, last):
+        """Keep the scrollbar in sync and redraw whatever scrolled into view"""
+        self.chart_scrollbar.set(first, last)
+        self.draw_chart_rows()
+
+    def draw_chart_rows(self):
+        """Place pooled canvas items on the rows that are currently visible"""
+        canvas = self.chart_canvas
+        view_top = canvas.canvasy(0)
+        view_bottom = view_top + canvas.winfo_height()
+
+        row = max(bisect.bisect_right(self.chart_row_tops, view_top) - 1, 0)
+        used = 0
+        while row < len(self.chart_rows) and self.chart_row_tops[row] <= view_bottom:
+            if used == len(self.chart_slots):
+                self.chart_slots.append(self.create_chart_slot())
+            self.fill_chart_slot(self.chart_slots[used], self.chart_row_tops[row], *self.chart_rows[row])
+            used += 1
+            row += 1
+
+        for slot in self.chart_slots[used:]:
+            for item in slot:
+                canvas.itemconfigure(item, state="hidden")
+
+    def create_chart_slot(self):
+        """Create one reusable set of canvas items for a chart row"""
+        canvas = self.chart_canvas
+        border = canvas.create_rectangle(0, 0, 0, 0, outline=SECONDARY_COLOR, fill=BG_COLOR)
+        character = canvas.create_text(0, 0, font=self.card_font(CHART_FONT), fill=TEXT_COLOR)
+        romaji = canvas.create_text(0, 0, font=("Nunito", 18), fill=TEXT_COLOR, anchor="w")  # Updated font and size
+        header = canvas.create_text(0, 0, font=("Nunito", 16, "bold"), fill=PRIMARY_COLOR, anchor="w")
+        glyph = canvas.create_image(0, 0, state="hidden")  # Pre-rendered character, when available
+        return border, character, romaji, header, glyph
+
+    def fill_chart_slot(self, slot, top, kind, value):
+        """Point a pooled slot at a header or card row"""
+        canvas = self.chart_canvas
+        border, character, romaji, header, glyph = slot
+        middle = top + CHART_ROW_HEIGHT // 2
+
+        if kind == "header":
+            for item in (border, character, romaji, glyph):
+                canvas.itemconfigure(item, state="hidden")
+            canvas.coords(header, 60, top + CHART_HEADER_HEIGHT - 20)
+            canvas.itemconfigure(header, text=value, state="normal")
+            return
+
+        canvas.itemconfigure(header, state="hidden")
+        canvas.coords(border, 80, top + 8, 160, top + CHART_ROW_HEIGHT - 8)
+        canvas.coords(romaji, 185, middle)
+        canvas.itemconfigure(border, state="normal")
+        canvas.itemconfigure(romaji, text=self.deck.romaji(value), state="normal")
+
+        kana = self.deck.kana(value)
+        image = self.card_face(kana, CHART_FONT, TEXT_COLOR)
+        self.chart_images[glyph] = image
+        if image is None:
+            canvas.itemconfigure(glyph, state="hidden")
+            canvas.coords(character, 120, middle)
+            canvas.itemconfigure(character, text=kana, state="normal")
+        else:
+            canvas.itemconfigure(character, state="hidden")
+            canvas.coords(glyph, 120, middle)
+            canvas.itemconfigure(glyph, image=image, state="normal")
+
+    # ---------------------------- PROGRESS DASHBOARD ----------------------------
+    @timed_transition
+    def show_dashboard(self):
+        """Show the heatmap, rolling accuracy and weakest cards for the current deck"""
+        self.finish_startup()
+        self.show_screen("dashboard")
+        from dashboard import dashboard  # Reads the stats aggregates; no history scan
+        self.draw_dashboard(dashboard(self.stats, self.deck))
+
+    def build_dashboard_screen(self, screen):
+        """Create the progress dashboard screen"""
+        header_frame = ttk.Frame(screen)
+        header_frame.pack(fill=tk.X, pady=15)
+
+        tk.Label(header_frame,
+                text=f"{APP_NAME} - 📈 Progress",
+                font=("Nunito", 20, "bold"),
+                fg=SECONDARY_COLOR,
+                bg=BG_COLOR).pack(side=tk.LEFT, padx=25)
+
+        ttk.Button(header_frame,
+                  text="Back (Esc)",
+                  command=self.create_main_menu).pack(side=tk.RIGHT, padx=25)
+
+        summary_frame = ttk.Frame(screen)
+        summary_frame.pack(fill=tk.X, padx=25)
+        self.dashboard_rolling_label = tk.Label(summary_frame,
+                                               font=("Nunito", 14),
+                                               fg=TEXT_COLOR,
+                                               bg=BG_COLOR,
+                                               justify=tk.LEFT)
+        self.dashboard_rolling_label.pack(side=tk.LEFT)
+        self.dashboard_weakest_label = tk.Label(summary_frame,
+                                               font=("Nunito", 12),
+                                               fg=TEXT_COLOR,
+                                               bg=BG_COLOR,
+                                               justify=tk.LEFT)
+        self.dashboard_weakest_label.pack(side=tk.RIGHT, anchor=tk.N)
+
+        # Last 30 days as bars: height is answers that day, colour is accuracy
+        self.dashboard_activity = tk.Canvas(screen, height=50, bg=BG_COLOR, highlightthickness=0)
+        self.dashboard_activity.pack(fill=tk.X, padx=25, pady=10)
+
+        heatmap_frame = ttk.Frame(screen)
+        heatmap_frame.pack(fill=tk.BOTH, expand=True, padx=25, pady=(0, 20))
+        self.dashboard_heatmap = tk.Canvas(heatmap_frame, bg=BG_COLOR, highlightthickness=0)
+        heatmap_scrollbar = ttk.Scrollbar(heatmap_frame, orient="vertical", command=self.dashboard_heatmap.yview)
+        self.dashboard_heatmap.configure(yscrollcommand=heatmap_scrollbar.set)
+        self.dashboard_heatmap.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        heatmap_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+    def draw_dashboard(self, figures):
+        """Fill the dashboard from ``dashboard.dashboard`` figures"""
+        lines = [f"Last {days} days: " + (f"{accuracy:.1f}% of {attempts} answers" if attempts else "no answers")
+                 for days, _, attempts, accuracy in figures["rolling"]]
+        lines.append(f"Cards seen: {figures['seen']}/{figures['cards']} ({self.deck.name})")
+        self.dashboard_rolling_label.configure(text="\n".join(lines))
+
+        weakest = [f"{kana} ({romaji})  {accuracy:.0f}% of {attempts}"
+                   for kana, romaji, accuracy, attempts in figures["weakest"]]
+        self.dashboard_weakest_label.configure(text="Weakest cards:\n" + ("\n".join(weakest) or "none yet"))
+
+        canvas = self.dashboard_activity
+        canvas.delete("all")
+        canvas.update_idletasks()
+        strip = figures["activity"]
+        width = max(canvas.winfo_width(), 1) / len(strip)
+        most = max(attempts for _, _, attempts in strip) or 1
+        for i, (_, correct, attempts) in enumerate(strip):
+            height = 46 * attempts / most
+            canvas.create_rectangle(i * width + 1, 48 - height, (i + 1) * width - 1, 48,
+                                    fill=heat_color(correct / attempts * 100 if attempts else None), width=0)
+
+        canvas = self.dashboard_heatmap
+        canvas.delete("all")
+        card_font = self.card_font(("Nunito", 20))
+        for row, cells in enumerate(figures["heatmap"]):
+            top = row * HEAT_CELL
+            canvas.create_text(HEAT_LABEL_WIDTH - 12, top + HEAT_CELL // 2, text=f"{cells[0][0]}-row",
+                               font=("Nunito", 12), fill=SECONDARY_COLOR, anchor=tk.E)
+            for column, (kana, accuracy, attempts) in enumerate(cells):
+                left = HEAT_LABEL_WIDTH + column * HEAT_CELL
+                canvas.create_rectangle(left + 2, top + 2, left + HEAT_CELL - 2, top + HEAT_CELL - 2,
+                                        fill=heat_color(accuracy), outline="")
+                canvas.create_text(left + HEAT_CELL // 2, top + HEAT_CELL // 2, text=kana,
+                                   font=card_font, fill=TEXT_COLOR if accuracy is None else "white")
+        canvas.configure(scrollregion=(0, 0, 0, len(figures["heatmap"]) * HEAT_CELL))
+        canvas.yview_moveto(0)
+
+    # ---------------------------- ANALYTICS ----------------------------
+    @timed_transition
+    def show_analytics(self):
+        """Show per-card difficulty, accuracy curves and confusions for this learner"""
+        self.show_screen("analytics")
+        try:
+            import analytics  # Optional: needs NumPy
+        except ImportError:
+            self.set_analytics_text("Install NumPy to see learning analytics.")
+            return
+
+        self.finish_startup()
+        self.stats_writer.flush()  # Analyse everything answered so far
+        try:
+            if isinstance(self.stats_store, StatsJournal):  # Archived plus journaled answers
+                history = analytics.History.from_journal(self.stats_store.journal_path, "you",
+                                                         self.stats_store.snapshot_path)
+            else:  # SQLite keeps every attempt
+                history = analytics.History.from_sqlite(self.stats_store.path, "you")
+            text = analytics.format_report(analytics.report(history))
+        except Exception as e:
+            print("Could not load answer history:", e)
+            text = "No answer history available yet."
+        self.set_analytics_text(text)
+
+    def build_analytics_screen(self, screen):
+        """Create the read-only analytics report screen"""
+        header_frame = ttk.Frame(screen)
+        header_frame.pack(fill=tk.X, pady=15)
+
+        tk.Label(header_frame,
+                text=f"{APP_NAME} - 📊 Learning Analytics",
+                font=("Nunito", 20, "bold"),
+                fg=SECONDARY_COLOR,
+                bg=BG_COLOR).pack(side=tk.LEFT, padx=25)
+
+        ttk.Button(header_frame,
+                  text="Back (Esc)",
+                  command=self.create_main_menu).pack(side=tk.RIGHT, padx=25)
+
+        self.analytics_text = tk.Text(screen,
+                                     font=("Courier", 12),
+                                     fg=TEXT_COLOR,
+                                     bg=BG_COLOR,
+                                     relief=tk.FLAT,
+                                     wrap=tk.NONE)
+        self.analytics_text.pack(fill=tk.BOTH, expand=True, padx=25, pady=(0, 20))
+
+    def set_analytics_text(self, text):
+        """Replace the analytics report text"""
+        self.analytics_text.configure(state=tk.NORMAL)
+        self.analytics_text.delete("1.0", tk.END)
+        self.analytics_text.insert("1.0", text)
+        self.analytics_text.configure(state=tk.DISABLED)
 
     # ---------------------------- HELPER FUNCTIONS ----------------------------
-    def clear_frame(self):
-        """Destroy all widgets in main frame"""
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
-    
+    def exit_app(self):
+        """Flush pending stats to disk before closing the window"""
+        self.bindings.release_all()
+        if self.stats_writer is not None:
+            self.stats_writer.close()
+        if self.audio is not None:
+            self.audio.close()
+        self.decks.close()
+        if self.instrument is not None:
+            self.instrument.close()  # After the writer, so its final compaction is traced
+        self.root.destroy()
+
     def toggle_multiple_choice(self):
         """Toggle multiple choice mode"""
         self.multiple_choice_mode = self.multiple_choice_var.get()
 
+    def toggle_due_only(self):
+        """Toggle drilling only the cards that are due for review"""
+        self.due_only_mode = self.due_only_var.get()
+
+    def toggle_handwriting(self):
+        """Toggle writing kana on a canvas; needs NumPy and stroke templates"""
+        if self.handwriting_var.get():
+            reason = self.load_recognizer()
+            if reason:
+                self.disable_handwriting(reason)
+                return
+        self.handwriting_mode = self.handwriting_var.get()
+
+    @timed_transition
     def show_session_results(self):
-        """Show the results of the practice session with improved spacing"""
-        self.clear_frame()
-        self.root.unbind('<space>')  # Unbind space from answer screen
-        
+        """Show the results of the practice session, updated in place"""
+        self.show_screen("results")
+
+        results = self.engine.results()
+        if results is not None:
+            accuracy, feedback, tier = results
+            feedback_color = FEEDBACK_COLORS[tier]  # Feedback based on accuracy with improved styling
+
+            self.results_studied_label.configure(text=f"Cards studied: {self.engine.session_total}")
+            self.results_correct_label.configure(text=f"Correct answers: {self.engine.session_correct}")
+            self.results_accuracy_label.configure(text=f"Accuracy: {accuracy:.1f}%")
+            self.results_feedback_label.configure(text=feedback, fg=feedback_color)
+
+            self.results_empty_label.pack_forget()
+            self.results_summary.pack()
+        else:
+            self.results_summary.pack_forget()
+            self.results_empty_label.pack(pady=10)  # Increased padding
+
+    def build_results_screen(self, screen):
+        """Create the session results screen with improved spacing"""
         # Header with app name
-        header_frame = ttk.Frame(self.main_frame)
+        header_frame = ttk.Frame(screen)
         header_frame.pack(fill=tk.X, pady=(10, 30))
-        
-        tk.Label(header_frame, 
+
+        tk.Label(header_frame,
                 text=APP_NAME,
                 font=("Nunito", 14, "bold"),
                 fg=SECONDARY_COLOR,
                 bg=BG_COLOR).pack(side=tk.LEFT, padx=20)
-        
+
         # Results title with improved spacing
-        title_label = tk.Label(self.main_frame, 
-                              text="Session Results", 
+        title_label = tk.Label(screen,
+                              text="Session Results",
                               font=("Nunito", 28, "bold"),  # Updated font and size
-                              fg=PRIMARY_COLOR, 
+                              fg=PRIMARY_COLOR,
                               bg=BG_COLOR)
         title_label.pack(pady=25)  # Increased padding
-        
+
         # Results card with border
-        results_card = tk.Frame(self.main_frame, 
-                              bd=2, 
-                              relief=tk.RIDGE, 
+        results_card = tk.Frame(screen,
+                              bd=2,
+                              relief=tk.RIDGE,
                               bg=BG_COLOR,
                               highlightbackground=SECONDARY_COLOR,
                               highlightthickness=1)
         results_card.pack(pady=20, padx=80, fill=tk.X)
-        
+
         results_content = ttk.Frame(results_card)
         results_content.pack(pady=25, padx=30)  # Increased padding
-        
+
         # Results stats with improved spacing
-        if self.session_total > 0:
-            accuracy = (self.session_correct / self.session_total) * 100
-            
-            tk.Label(results_content, 
-                    text=f"Cards studied: {self.session_total}", 
-                    font=("Nunito", 16),  # Updated font and size
-                    bg=BG_COLOR).pack(pady=8)  # Increased padding
-            
-            tk.Label(results_content, 
-                    text=f"Correct answers: {self.session_correct}", 
-                    font=("Nunito", 16),  # Updated font and size
-                    bg=BG_COLOR).pack(pady=8)  # Increased padding
-            
-            tk.Label(results_content, 
-                    text=f"Accuracy: {accuracy:.1f}%", 
-                    font=("Nunito", 16, "bold"),  # Updated font and size, made bold
-                    bg=BG_COLOR).pack(pady=8)  # Increased padding
-            
-            # Feedback based on accuracy with improved styling
-            if accuracy >= 90:
-                feedback = "🌸 Excellent! You're mastering hiragana!"
-                feedback_color = CORRECT_COLOR
-            elif accuracy >= 75:
-                feedback = "🎌 Great job! Keep practicing!"
-                feedback_color = CORRECT_COLOR
-            elif accuracy >= 60:
-                feedback = "💮 Good progress! Regular practice will help you improve."
-                feedback_color = SECONDARY_COLOR
-            else:
-                feedback = "🍃 Keep studying! You'll get better with practice."
-                feedback_color = PRIMARY_COLOR
-            
-            # Separator before feedback
-            separator = ttk.Separator(results_content, orient='horizontal')
-            separator.pack(fill=tk.X, pady=15)
-            
-            tk.Label(results_content, 
-                    text=feedback, 
-                    font=("Nunito", 16),  # Updated font and size
-                    fg=feedback_color,
-                    bg=BG_COLOR).pack(pady=12)  # Increased padding
-        else:
-            tk.Label(results_content, 
-                    text="No cards were studied in this session.", 
-                    font=("Nunito", 16),  # Updated font and size
-                    bg=BG_COLOR).pack(pady=10)  # Increased padding
-        
+        self.results_summary = ttk.Frame(results_content)
+
+        self.results_studied_label = tk.Label(self.results_summary,
+                                             font=("Nunito", 16),  # Updated font and size
+                                             bg=BG_COLOR)
+        self.results_studied_label.pack(pady=8)  # Increased padding
+
+        self.results_correct_label = tk.Label(self.results_summary,
+                                             font=("Nunito", 16),  # Updated font and size
+                                             bg=BG_COLOR)
+        self.results_correct_label.pack(pady=8)  # Increased padding
+
+        self.results_accuracy_label = tk.Label(self.results_summary,
+                                              font=("Nunito", 16, "bold"),  # Updated font and size, made bold
+                                              bg=BG_COLOR)
+        self.results_accuracy_label.pack(pady=8)  # Increased padding
+
+        # Separator before feedback
+        separator = ttk.Separator(self.results_summary, orient='horizontal')
+        separator.pack(fill=tk.X, pady=15)
+
+        self.results_feedback_label = tk.Label(self.results_summary,
+                                              font=("Nunito", 16),  # Updated font and size
+                                              bg=BG_COLOR)
+        self.results_feedback_label.pack(pady=12)  # Increased padding
+
+        self.results_empty_label = tk.Label(results_content,
+                                           text="No cards were studied in this session.",
+                                           font=("Nunito", 16),  # Updated font and size
+                                           bg=BG_COLOR)
+
         # Buttons with improved spacing
-        button_frame = ttk.Frame(self.main_frame)
+        button_frame = ttk.Frame(screen)
         button_frame.pack(pady=40)  # Increased padding
-        
-        menu_button = ttk.Button(button_frame, 
-                                text="Return to Menu (Esc)", 
+
+        menu_button = ttk.Button(button_frame,
+                                text="Return to Menu (Esc)",
                                 command=self.create_main_menu)
         menu_button.pack(side=tk.LEFT, padx=15)  # Increased padding
-        
-        practice_again_button = ttk.Button(button_frame, 
-                                         text="Practice Again", 
+
+        practice_again_button = ttk.Button(button_frame,
+                                         text="Practice Again",
                                          command=lambda: self.start_practice(self.practice_mode))
         practice_again_button.pack(side=tk.LEFT, padx=15)  # Increased padding
 
 # ---------------------------- RUN THE APP ----------------------------
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=f"{APP_NAME} - {APP_TAGLINE}")
+    parser.add_argument("--deck", help="Deck to study: a built-in deck name (see deck_registry.py) or a binary "
+                                       "deck file built with deck.py; defaults to hiragana")
+    parser.add_argument("--stats-db", help="Keep stats in this SQLite database instead of reuniclus_stats.json")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Print a per-phase startup breakdown and quit; exits 1 if over the budget")
+    parser.add_argument("--startup-budget", type=float, default=STARTUP_BUDGET_MS,
+                        help=f"First-frame budget in ms for --profile-startup (default: {STARTUP_BUDGET_MS})")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Record transitions, stats writes and event-loop lag to a Chrome trace file")
+    parser.add_argument("--audio", metavar="PACK", help="Play pronunciation clips from this clip pack (built with audio.py)")
+    parser.add_argument("--overlay", action="store_true", help="Show the latency overlay (toggle with F12)")
+    parser.add_argument("--tui", action="store_true",
+                        help="Practice in the terminal (curses) instead of a window; for SSH and slow machines")
+    args = parser.parse_args()
+
+    profile = StartupProfile(PROCESS_START)
+    profile.mark("imports")
+    if args.tui or tk is None:
+        import tui  # Never touches Tk
+        on_ready = None
+        if args.profile_startup:
+            def on_ready(app):
+                profile.mark("interactive")
+        tui.run(args.deck, args.stats_db, profile, on_ready)
+        if args.profile_startup:
+            print(profile.report(args.startup_budget))
+            sys.exit(profile.elapsed_ms("first_frame") > args.startup_budget)
+        sys.exit(0)
     root = tk.Tk()
-    app = ReuniclusApp(root)  # Updated class name
-    root.mainloop()
\ No newline at end of file
+    profile.mark("tk_root")
+
+    on_ready = None
+    if args.profile_startup:
+        def on_ready(app):
+            print(profile.report(args.startup_budget))
+            app.root.after_idle(app.exit_app)
+
+    app = ReuniclusApp(root, deck_path=args.deck, stats_db=args.stats_db,
+                       profile=profile, on_ready=on_ready,
+                       trace_path=args.trace, overlay=args.overlay, audio_path=args.audio)  # Updated class name
+    root.mainloop()
+    if args.profile_startup and profile.elapsed_ms("first_frame") > args.startup_budget:
+        sys.exit(1)
\ No newline at end of file
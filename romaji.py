@@ -0,0 +1,189 @@
+"""Romaji to hiragana transliteration with a precompiled automaton.
+
+Accepts Hepburn, Kunrei and Nihon-shiki spellings (``shi``/``si``,
+``tsu``/``tu``, ``ja``/``zya``/``jya`` ...) plus the usual IME conventions:
+doubled consonants for っ, ``n'`` or a final ``nn`` for ん and ``x``/``l``
+prefixes for small kana. As in Hepburn, ``nn`` before a vowel is ん plus the
+n-row (``konnichiha``), so ん before a vowel is typed ``n'`` (``kon'ya``).
+Conversion is a single left-to-right pass over a trie compiled into flat
+transition tables, so it is O(length) per call.
+"""
+
+# ---------------------------- TABLES ----------------------------
+VOWELS = "aiueo"
+
+# (romaji spellings, kana); the first spelling of each entry is Hepburn
+SYLLABLES = [
+    (("a",), "あ"), (("i",), "い"), (("u",), "う"), (("e",), "え"), (("o",), "お"),
+    (("ka", "ca"), "か"), (("ki",), "き"), (("ku", "cu", "qu"), "く"), (("ke",), "け"), (("ko", "co"), "こ"),
+    (("ga",), "が"), (("gi",), "ぎ"), (("gu",), "ぐ"), (("ge",), "げ"), (("go",), "ご"),
+    (("sa",), "さ"), (("shi", "si", "ci"), "し"), (("su",), "す"), (("se", "ce"), "せ"), (("so",), "そ"),
+    (("za",), "ざ"), (("ji", "zi"), "じ"), (("zu",), "ず"), (("ze",), "ぜ"), (("zo",), "ぞ"),
+    (("ta",), "た"), (("chi", "ti"), "ち"), (("tsu", "tu"), "つ"), (("te",), "て"), (("to",), "と"),
+    (("da",), "だ"), (("di", "dji"), "ぢ"), (("du", "dzu"), "づ"), (("de",), "で"), (("do",), "ど"),
+    (("na",), "な"), (("ni",), "に"), (("nu",), "ぬ"), (("ne",), "ね"), (("no",), "の"),
+    (("ha",), "は"), (("hi",), "ひ"), (("fu", "hu"), "ふ"), (("he",), "へ"), (("ho",), "ほ"),
+    (("ba",), "ば"), (("bi",), "び"), (("bu",), "ぶ"), (("be",), "べ"), (("bo",), "ぼ"),
+    (("pa",), "ぱ"), (("pi",), "ぴ"), (("pu",), "ぷ"), (("pe",), "ぺ"), (("po",), "ぽ"),
+    (("ma",), "ま"), (("mi",), "み"), (("mu",), "む"), (("me",), "め"), (("mo",), "も"),
+    (("ya",), "や"), (("yu",), "ゆ"), (("yo",), "よ"),
+    (("ra",), "ら"), (("ri",), "り"), (("ru",), "る"), (("re",), "れ"), (("ro",), "ろ"),
+    (("wa",), "わ"), (("wo",), "を"), (("wi",), "ゐ"), (("we",), "ゑ"),
+    (("n'", "xn"), "ん"), (("vu",), "ゔ"),
+    (("xa",), "ぁ"), (("xi",), "ぃ"), (("xu",), "ぅ"), (("xe",), "ぇ"), (("xo",), "ぉ"),
+    (("xya",), "ゃ"), (("xyu",), "ゅ"), (("xyo",), "ょ"), (("xwa",), "ゎ"),
+    (("xtsu", "xtu"), "っ"), (("-",), "ー"),
+]
+
+# Yōon: (consonant spellings, i-row kana); each expands to -ya/-yu/-yo with small ゃゅょ
+YOON = [
+    (("ky",), "き"), (("gy",), "ぎ"), (("sh", "sy"), "し"), (("j", "zy", "jy"), "じ"),
+    (("ch", "ty", "cy"), "ち"), (("dy",), "ぢ"), (("ny",), "に"), (("hy",), "ひ"),
+    (("by",), "び"), (("py",), "ぴ"), (("my",), "み"), (("ry",), "り"),
+]
+
+# Extended sounds used in loanwords and by most IMEs
+EXTENDED = [
+    (("she", "sye"), "しぇ"), (("je", "zye", "jye"), "じぇ"), (("che", "tye", "cye"), "ちぇ"),
+    (("fa",), "ふぁ"), (("fi",), "ふぃ"), (("fe",), "ふぇ"), (("fo",), "ふぉ"), (("fyu",), "ふゅ"),
+    (("thi",), "てぃ"), (("dhi",), "でぃ"), (("twu",), "とぅ"), (("dwu",), "どぅ"),
+    (("va",), "ゔぁ"), (("vi",), "ゔぃ"), (("ve",), "ゔぇ"), (("vo",), "ゔぉ"),
+]
+
+SMALL_YA = {"a": "ゃ", "u": "ゅ", "o": "ょ"}
+KANA_SHIFT = 0x60  # Katakana sit one fixed offset after their hiragana (ぁ..ゖ -> ァ..ヶ)
+KATAKANA_START, KATAKANA_END = "ァ", "ヶ"
+TO_KATAKANA = {code: code + KANA_SHIFT for code in range(ord("ぁ"), ord("ゖ") + 1)}
+TO_HIRAGANA = {code + KANA_SHIFT: code for code in range(ord("ぁ"), ord("ゖ") + 1)}
+SOKUON_CONSONANTS = set("bcdfghjklmpqrstvwxyz")  # Doubled, these become っ (never n)
+
+
+def romaji_table():
+    """Every accepted spelling mapped to its kana"""
+    table = {}
+    for spellings, kana in SYLLABLES + EXTENDED:
+        for spelling in spellings:
+            table[spelling] = kana
+    for consonants, kana in YOON:
+        for consonant in consonants:
+            for vowel, small in SMALL_YA.items():
+                table.setdefault(consonant + vowel, kana + small)
+    # "l" is an alternative small-kana prefix to "x" (la, ltsu ...)
+    for spelling, kana in list(table.items()):
+        if spelling.startswith("x") and spelling != "xn":
+            table["l" + spelling[1:]] = kana
+    table["n"] = "ん"  # Only wins when nothing longer matches (see Transliterator.convert)
+    return table
+
+
+# ---------------------------- AUTOMATON ----------------------------
+class Transliterator:
+    """Trie of romaji spellings compiled into per-state transition dicts.
+
+    State 0 is the root; ``outputs[state]`` is the kana spelled by the path to
+    that state (or ``None``) and ``open[state]`` says whether longer spellings
+    continue from it.
+    """
+
+    __slots__ = ("transitions", "outputs", "open")
+
+    def __init__(self, table):
+        self.transitions = [{}]
+        self.outputs = [None]
+        for spelling, kana in table.items():
+            state = 0
+            for ch in spelling:
+                following = self.transitions[state].get(ch)
+                if following is None:
+                    following = self.transitions[state][ch] = len(self.transitions)
+                    self.transitions.append({})
+                    self.outputs.append(None)
+                state = following
+            self.outputs[state] = kana
+        self.open = [bool(edges) for edges in self.transitions]
+
+    def convert(self, text, final=True):
+        """Transliterate ``text``, passing through anything that isn't romaji.
+
+        With ``final=False`` (live typing) a trailing prefix that could still
+        grow into a longer spelling, like ``ky`` or ``n``, is left unconverted.
+        Already-converted kana pass through, so re-converting is a no-op.
+        """
+        text = text.lower()
+        transitions, outputs, open_ = self.transitions, self.outputs, self.open
+        out = []
+        i, length = 0, len(text)
+        while i < length:
+            ch = text[i]
+            following = text[i + 1] if i + 1 < length else ""
+            if ch in SOKUON_CONSONANTS and (following == ch or (ch == "t" and following == "c")):
+                out.append("っ")  # kka -> っか, tcha -> っちゃ
+                i += 1
+                continue
+            if ch == "n" and following == "n":
+                after = text[i + 2] if i + 2 < length else ""
+                if not after and not final:
+                    out.append("nn")  # Could still become ん + na, ni ...
+                    break
+                out.append("ん")
+                i += 1 if after and after in VOWELS + "y" else 2
+                continue
+            if ch == "m" and following in ("b", "p"):
+                out.append("ん")  # Hepburn shimbun, sempai
+                i += 1
+                continue
+
+            # Longest match; spellings are at most four letters, so this stays O(length)
+            state, j, match, match_end = 0, i, None, i
+            while j < length:
+                state = transitions[state].get(text[j])
+                if state is None:
+                    break
+                j += 1
+                if outputs[state] is not None:
+                    match, match_end = outputs[state], j
+
+            if state is not None and j == length and open_[state] and not final:
+                out.append(text[i:])  # Still being typed
+                break
+            if match is None:
+                out.append(ch)
+                i += 1
+            else:
+                out.append(match)
+                i = match_end
+        return "".join(out)
+
+
+ROMAJI_TABLE = romaji_table()
+AUTOMATON = Transliterator(ROMAJI_TABLE)  # Compiled once at import
+
+
+def to_kana(text):
+    """Fully transliterate romaji to hiragana (a trailing ``n`` becomes ん)"""
+    return AUTOMATON.convert(text, final=True)
+
+
+def live_kana(text):
+    """Transliterate while typing, keeping an unfinished trailing spelling as romaji"""
+    return AUTOMATON.convert(text, final=False)
+
+
+def to_katakana(text):
+    """Hiragana in ``text`` shifted to the matching katakana (everything else unchanged)"""
+    return text.translate(TO_KATAKANA)
+
+
+def to_hiragana(text):
+    """Katakana in ``text`` shifted to the matching hiragana (everything else unchanged)"""
+    return text.translate(TO_HIRAGANA)
+
+
+def is_katakana(text):
+    """Whether ``text`` contains katakana"""
+    return any(KATAKANA_START <= ch <= KATAKANA_END for ch in text)
+
+
+def normalize(text):
+    """Canonical form for answer checks: Hepburn, Kunrei, Nihon-shiki, hiragana and katakana all agree"""
+    return to_hiragana(to_kana(str(text).strip()))
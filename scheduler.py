@@ -0,0 +1,92 @@
+import heapq
+import random
+
+# ---------------------------- CONSTANTS ----------------------------
+DAY = 86400.0  # Seconds
+DEFAULT_EASE = 2.5  # SM-2 starting ease factor
+MIN_EASE = 1.3
+RELEARN_DELAY = 600.0  # A missed card comes back after ten minutes
+SKIP_DELAY = 60.0  # A skipped card steps back this far in the queue
+CORRECT_QUALITY = 4  # SM-2 grade for a right answer ("correct after some thought")
+INCORRECT_QUALITY = 1  # SM-2 grade for a wrong answer
+
+# Indexes into a persisted card state list
+EASE, INTERVAL, REPETITIONS, DUE = range(4)
+
+
+# ---------------------------- SM-2 ----------------------------
+def review_state(state, is_correct, now, interval_scale=1.0):
+    """Return the SM-2 state ``[ease, interval_days, repetitions, due]`` after a review.
+
+    ``interval_scale`` stretches (or shrinks) the wait before a correctly answered
+    card is due again, without changing how its interval grows.
+    """
+    ease, interval, repetitions, _ = state or (DEFAULT_EASE, 0.0, 0, 0.0)
+    quality = CORRECT_QUALITY if is_correct else INCORRECT_QUALITY
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+
+    if is_correct:
+        repetitions += 1
+        if repetitions == 1:
+            interval = 1.0
+        elif repetitions == 2:
+            interval = 6.0
+        else:
+            interval = round(interval * ease, 2)
+        due = now + interval * interval_scale * DAY
+    else:
+        repetitions = 0
+        interval = 0.0
+        due = now + RELEARN_DELAY
+
+    return [round(ease, 3), interval, repetitions, round(due, 1)]
+
+
+# ---------------------------- SCHEDULER ----------------------------
+class Scheduler:
+    """Spaced-repetition queue for one deck, keyed on each card's due time.
+
+    ``next_card`` pops the most overdue card and ``review``/``requeue`` push it
+    back, both O(log n). Cards never seen before are due immediately, in random
+    order. ``states`` is the persisted ``stats["srs"]`` dict (stats key -> state).
+    """
+
+    def __init__(self, deck, states, interval_scale=1.0):
+        self.deck = deck
+        self.states = states
+        self.interval_scale = interval_scale
+        self._heap = []
+        for card_id, key in enumerate(deck.keys()):
+            state = states.get(key)
+            due = state[DUE] if state else 0.0
+            self._heap.append((due, random.random(), card_id))
+        heapq.heapify(self._heap)  # O(n) once per deck
+
+    def __len__(self):
+        return len(self._heap)
+
+    def due_count(self, now):
+        """How many queued cards are due at ``now``"""
+        return sum(1 for due, _, _ in self._heap if due <= now)
+
+    def next_card(self, now, due_only=False):
+        """Pop the card due soonest; ``None`` if empty (or nothing is due in due-only mode)"""
+        if not self._heap or (due_only and self._heap[0][0] > now):
+            return None
+        return heapq.heappop(self._heap)[2]
+
+    def peek(self, count):
+        """The next ``count`` card ids in due order, without popping them"""
+        return [card_id for _, _, card_id in heapq.nsmallest(count, self._heap)]
+
+    def review(self, card_id, is_correct, now):
+        """Reschedule a popped card after an answer and return its new persisted state"""
+        state = review_state(self.states.get(self.deck.key(card_id)), is_correct, now, self.interval_scale)
+        heapq.heappush(self._heap, (state[DUE], random.random(), card_id))
+        return state
+
+    def requeue(self, card_id, now, delay=SKIP_DELAY):
+        """Put a popped card back without grading it (skipped or abandoned)"""
+        state = self.states.get(self.deck.key(card_id))
+        due = max(state[DUE] if state else 0.0, now + delay)
+        heapq.heappush(self._heap, (due, random.random(), card_id))
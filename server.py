@@ -0,0 +1,364 @@
+"""Local multi-learner quiz server: the Reuniclus quiz engine over HTTP/JSON.
+
+One process hosts a classroom of learners over keep-alive HTTP/1.1 on
+localhost. Every learner gets their own ``QuizEngine`` and stats, kept in
+memory and flushed to ``<data-dir>/<learner>.json`` in batches:
+
+    python server.py --port 8765 --data-dir classroom
+
+Endpoints (all JSON):
+
+    POST /learners/<name>/session   {"mode": ..., "due_only": false, "multiple_choice": false}
+    POST /learners/<name>/next      -> {"question", "prompt", "options"?, "remaining", "size"} or {"done", "results"}
+    POST /learners/<name>/answer    {"answer": ...} -> {"correct", "expected", "streak"}
+    GET  /learners/<name>/stats     -> totals for the learner
+    GET  /health                    -> server counters
+"""
+import argparse
+import asyncio
+import copy
+import json
+import os
+import re
+import signal
+import time
+
+from deck import Deck, hiragana_deck
+from engine import QuizEngine, MODES, prepare_indexes
+from stats_store import COMPACT_EVERY, StatsJournal, default_stats
+
+# ---------------------------- CONSTANTS ----------------------------
+DEFAULT_HOST = "127.0.0.1"  # Local only; there is no authentication
+DEFAULT_PORT = 8765
+DATA_DIR = "reuniclus_learners"  # One stats snapshot + journal per learner
+FLUSH_INTERVAL = 1.0  # Seconds between batched stats flushes
+FLUSH_BATCH = 2000  # Pending answers across all learners that trigger an early flush
+MAX_BODY = 64 * 1024  # Largest request body accepted (bytes)
+LEARNER_NAME = re.compile(r"[A-Za-z0-9_-]{1,64}")  # Also used as the stats file name
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class RequestError(Exception):
+    """Client error answered with an HTTP status and a JSON message"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ---------------------------- LEARNERS ----------------------------
+class Learner:
+    """One learner's engine, in-memory stats and answers not yet on disk"""
+
+    def __init__(self, name, engine, store):
+        self.name = name
+        self.engine = engine
+        self.store = store
+        self.multiple_choice = False
+        self.pending = []  # Answer records waiting for the next flush
+
+    def submit(self, record):
+        """Engine sink: keep the record until the server's next batched flush"""
+        self.pending.append(record)
+
+
+class LearnerRegistry:
+    """Learners by name, loaded on first request and flushed to disk in batches"""
+
+    def __init__(self, deck, data_dir=DATA_DIR):
+        self.deck = deck
+        self.data_dir = data_dir
+        self.learners = {}
+        self.indexes = {}  # Lookup tables shared by every engine; the deck never changes
+        prepare_indexes(deck, self.indexes)  # Before serving, so no request builds them on the event loop
+        self._loading = {}  # Name -> task, so concurrent first requests load once
+        self.pending = 0
+        self.flushed = 0
+        self.flushes = 0
+        os.makedirs(data_dir, exist_ok=True)
+
+    async def get(self, name):
+        """The named learner, loading their stats off the event loop the first time"""
+        learner = self.learners.get(name)
+        if learner is not None:
+            return learner
+        if not LEARNER_NAME.fullmatch(name):
+            raise RequestError(400, "Learner names are 1-64 letters, digits, '-' or '_'")
+
+        task = self._loading.get(name)
+        if task is None:
+            task = self._loading[name] = asyncio.ensure_future(asyncio.to_thread(self._load, name))
+        try:
+            learner = await task
+        finally:
+            self._loading.pop(name, None)
+        self.learners.setdefault(name, learner)
+        return self.learners[name]
+
+    def _load(self, name):
+        path = os.path.join(self.data_dir, name)
+        store = StatsJournal(f"{path}.json", f"{path}.journal")
+        stats = store.load(default_stats(self.deck.keys()))
+        learner = Learner(name, None, store)
+        learner.engine = QuizEngine(self.deck, stats, sink=learner, indexes=self.indexes)
+        return learner
+
+    def collect(self):
+        """Detach every learner's pending records (plus a snapshot where compaction is due)"""
+        batches = []
+        for learner in self.learners.values():
+            if not learner.pending:
+                continue
+            records, learner.pending = learner.pending, []
+            snapshot = None
+            if learner.store.pending + len(records) >= COMPACT_EVERY:
+                snapshot = copy.deepcopy(learner.engine.stats)  # Matches the records detached above
+            batches.append((learner.store, records, snapshot))
+        self.pending = 0
+        return batches
+
+    @staticmethod
+    def write(batches):
+        """Append each learner's batch (one fsync per learner), compacting where due"""
+        for store, records, snapshot in batches:
+            try:
+                store.append(records)
+                if snapshot is not None:
+                    store.compact(snapshot)
+            except Exception as e:
+                print("Could not save stats:", e)
+
+    async def flush(self):
+        batches = self.collect()
+        if batches:
+            await asyncio.to_thread(self.write, batches)
+            self.flushes += 1
+            self.flushed += sum(len(records) for _, records, _ in batches)
+
+    def close(self):
+        """Write everything still pending and close every learner's files"""
+        self.write(self.collect())
+        for learner in self.learners.values():
+            if learner.store.pending:
+                learner.store.compact(learner.engine.stats)
+            learner.store.close()
+
+
+# ---------------------------- SERVER ----------------------------
+class QuizServer:
+    """Keep-alive HTTP/1.1 JSON server over a ``LearnerRegistry``"""
+
+    def __init__(self, registry, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.answers = 0
+        self.started = time.monotonic()
+        self._flush_wanted = asyncio.Event()
+        self._stopping = False
+
+    async def serve(self):
+        """Serve until cancelled (Ctrl+C or SIGTERM), flushing stats in the background"""
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        print(f"Reuniclus server on http://{self.host}:{self.port} (stats in {self.registry.data_dir})",
+              flush=True)
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        except (NotImplementedError, AttributeError):
+            pass  # No SIGTERM handlers on Windows
+
+        flusher = asyncio.ensure_future(self.flush_loop())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._stopping = True  # Let an in-flight flush finish rather than racing it
+            self._flush_wanted.set()
+            await flusher
+            self.registry.close()
+
+    async def flush_loop(self):
+        """Flush every FLUSH_INTERVAL seconds, or sooner once FLUSH_BATCH answers pile up"""
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._flush_wanted.wait(), FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_wanted.clear()
+            await self.registry.flush()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except RequestError as e:
+                    await send_response(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    status, payload = 200, await self.route(method, path, body)
+                except RequestError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:
+                    print("Could not handle request:", e)
+                    status, payload = 500, {"error": "Internal error"}
+                self.requests += 1
+                await send_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body):
+        parts = path.strip("/").split("/")
+        if parts == ["health"]:
+            return self.health()
+        if len(parts) != 3 or parts[0] != "learners":
+            raise RequestError(404, f"No such endpoint: {path}")
+
+        _, name, action = parts
+        handler = {("POST", "session"): self.start_session, ("POST", "next"): self.next_card,
+                   ("POST", "answer"): self.answer, ("GET", "stats"): self.learner_stats}.get((method, action))
+        if handler is None:
+            raise RequestError(405 if action in ("session", "next", "answer", "stats") else 404,
+                               f"{method} /learners/<name>/{action} is not supported")
+        return handler(await self.registry.get(name), parse_json(body))
+
+    # ---------------------------- ENDPOINTS ----------------------------
+    def start_session(self, learner, body):
+        mode = body.get("mode", MODES[0])
+        if mode not in MODES:
+            raise RequestError(400, f"mode must be one of {', '.join(MODES)}")
+        learner.multiple_choice = json_flag(body, "multiple_choice")
+        learner.engine.start(mode, json_flag(body, "due_only"))
+        return {"mode": mode, "size": learner.engine.session_size}
+
+    def next_card(self, learner, body):
+        engine = learner.engine
+        if engine.mode is None:
+            raise RequestError(409, "Start a session first")
+        if engine.next_card() is None:
+            results = engine.results()
+            return {"done": True, "results": None if results is None else {
+                "accuracy": round(results[0], 1), "feedback": results[1], "tier": results[2],
+                "correct": engine.session_correct, "total": engine.session_total}}
+
+        card = {"question": engine.question(), "prompt": engine.answer_label(),
+                "remaining": engine.session_remaining, "size": engine.session_size}
+        if learner.multiple_choice:
+            card["options"] = engine.options()
+        return card
+
+    def answer(self, learner, body):
+        engine = learner.engine
+        if not engine.awaiting_answer:
+            raise RequestError(409, "No card is waiting for an answer")
+        user_answer = str(body.get("answer", ""))
+        is_correct = engine.check(user_answer)
+        engine.answer(is_correct, user_answer.strip().lower())
+
+        self.answers += 1
+        self.registry.pending += 1
+        if self.registry.pending >= FLUSH_BATCH:
+            self._flush_wanted.set()
+        return {"correct": is_correct, "expected": engine.correct_answer(), "streak": engine.stats["streak"]}
+
+    def learner_stats(self, learner, body):
+        stats = learner.engine.stats
+        return {key: stats[key] for key in ("total_correct", "total_attempts", "streak",
+                                             "longest_streak", "last_session")}
+
+    def health(self):
+        return {"learners": len(self.registry.learners), "requests": self.requests,
+                "answers": self.answers, "flushes": self.registry.flushes,
+                "flushed_answers": self.registry.flushed,
+                "uptime": round(time.monotonic() - self.started, 1)}
+
+
+# ---------------------------- HTTP ----------------------------
+async def read_request(reader):
+    """Parse one HTTP/1.1 request as ``(method, path, headers, body)``; ``None`` on a clean close"""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise RequestError(400, "Truncated request")
+        return None
+    except asyncio.LimitOverrunError:
+        raise RequestError(413, "Request headers too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise RequestError(400, "Malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    length = headers.get("content-length", "0") or "0"
+    if not (length.isascii() and length.isdigit()):  # Also rejects a sign, so never negative
+        raise RequestError(400, "Invalid Content-Length")
+    length = int(length)
+    if length > MAX_BODY:
+        raise RequestError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), target.split("?", 1)[0], headers, body
+
+
+async def send_response(writer, status, payload, keep_alive=True):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, 'Error')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+
+def parse_json(body):
+    if not body:
+        return {}
+    try:
+        value = json.loads(body)
+    except ValueError:
+        raise RequestError(400, "Body is not valid JSON")
+    if not isinstance(value, dict):
+        raise RequestError(400, "Body must be a JSON object")
+    return value
+
+
+def json_flag(body, name):
+    """An optional ``true``/``false`` field; anything else (e.g. the string "false") is a 400"""
+    value = body.get(name, False)
+    if not isinstance(value, bool):
+        raise RequestError(400, f"{name} must be true or false")
+    return value
+
+
+# ---------------------------- COMMAND LINE ----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the Reuniclus quiz to many local learners")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Interface to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT}; 0 = any)")
+    parser.add_argument("--data-dir", default=DATA_DIR, help=f"Per-learner stats directory (default: {DATA_DIR})")
+    parser.add_argument("--deck", help="Binary deck file (built with deck.py); defaults to hiragana")
+    args = parser.parse_args()
+
+    deck = Deck.load(args.deck) if args.deck else hiragana_deck()
+    try:
+        asyncio.run(QuizServer(LearnerRegistry(deck, args.data_dir), args.host, args.port).serve())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass  # Stats were flushed on the way out
@@ -0,0 +1,395 @@
+"""Simulated learners for choosing card ordering, session length and review intervals.
+
+Each simulated learner forgets every card along an exponential curve,
+``recall = exp(-elapsed / stability)``: reviews strengthen a card more the closer
+it was to being forgotten, and misses weaken it. Per-card difficulty and, when
+timestamped history is available (the answer history JSON stats keep beside
+their journal, or a SQLite stats database), the curve itself are fitted from
+real stats. JSON stats compacted before that history was kept only have
+counters, which fit difficulty alone. Thousands of learners run across a
+process pool, and the report compares how much each strategy leaves remembered
+against the time spent studying::
+
+    python simulate.py hiragana_stats.json learners/*.sqlite --learners 500 --days 30
+"""
+import argparse
+import collections
+import concurrent.futures
+import functools
+import json
+import math
+import os
+import random
+import sqlite3
+import statistics
+from datetime import datetime
+
+from deck import Deck, hiragana_deck
+from scheduler import DAY, Scheduler
+from stats_store import StatsJournal, default_stats
+
+# ---------------------------- CONSTANTS ----------------------------
+DEFAULT_STABILITY = 1.5 * DAY  # Stability after first studying a card, when there's no history to fit
+DEFAULT_GROWTH = 5.0  # How much a successful review strengthens a card (scaled by how hard recall was)
+LAPSE_FACTOR = 0.5  # Stability kept after a miss
+ABILITY_SPREAD = 0.3  # Log-normal spread of learners' memory strength
+PRIOR_ATTEMPTS = 4  # Pseudo-attempts pulling each card's accuracy towards the deck's
+MIN_FIT_REVIEWS = 50  # Repeat attempts needed before the curve is fitted rather than assumed
+SECONDS_CORRECT = 4.0  # Time spent on a card answered right...
+SECONDS_WRONG = 8.0  # ...and on one answered wrong (reading the feedback)
+RETENTION_LATER_DAYS = 7  # Retention is also measured this long after the last session
+
+STABILITY_GRID = [60 * 2 ** (i / 2) for i in range(27)]  # One minute to ~57 days
+GROWTH_GRID = [0.5, 1.0, 1.5, 2.0, 3.0, 4.0, 6.0, 8.0]
+
+
+# ---------------------------- LEARNER MODEL ----------------------------
+def recall_probability(stability, elapsed):
+    """Chance of recalling a card studied ``elapsed`` seconds ago (0 if never studied)"""
+    if stability is None:
+        return 0.0
+    return math.exp(-max(elapsed, 0.0) / stability)
+
+
+def study(stability, first_stability, recall, is_correct, growth, lapse=LAPSE_FACTOR):
+    """Card stability after one attempt (the answer is shown either way)"""
+    if stability is None:
+        return first_stability
+    if is_correct:
+        return stability * (1 + growth * (1 - recall))  # Spacing effect: easy recalls teach little
+    return max(first_stability, stability * lapse)
+
+
+class LearnerModel:
+    """Forgetting-curve parameters: first-study stability per card, plus review growth"""
+
+    def __init__(self, keys, stability, growth=DEFAULT_GROWTH, source="defaults"):
+        self.keys = list(keys)
+        self.stability = stability  # Seconds, one per card
+        self.growth = growth
+        self.source = source
+
+    @classmethod
+    def fit(cls, paths, keys):
+        """Fit per-card difficulty from answer counters and the curve from timestamped attempts"""
+        keys = list(keys)
+        correct, attempts = collections.Counter(), collections.Counter()
+        sequences = []
+        for path in paths:
+            for key, counts in read_counters(path).items():
+                correct[key] += counts.get("correct", 0)
+                attempts[key] += counts.get("attempts", 0)
+            sequences += read_attempts(path)
+
+        multipliers = difficulty_multipliers(keys, correct, attempts)
+        by_key = dict(zip(keys, multipliers))
+        sequences = [(by_key.get(key, 1.0), attempts) for key, attempts in sequences]
+        reviews = sum(len(attempts) - 1 for _, attempts in sequences)
+
+        stability, growth = DEFAULT_STABILITY, DEFAULT_GROWTH
+        source = f"{sum(attempts.values())} answers"
+        if reviews >= MIN_FIT_REVIEWS:
+            stability, growth = max(((s, g) for s in STABILITY_GRID for g in GROWTH_GRID),
+                                    key=lambda params: log_likelihood(sequences, *params))
+            source += f", curve fitted on {reviews} repeat attempts"
+        else:
+            source += f", default curve ({reviews} repeat attempts; {MIN_FIT_REVIEWS} needed to fit)"
+        return cls(keys, [stability * m for m in multipliers], growth, source)
+
+    def describe(self):
+        hours = statistics.median(self.stability) / 3600
+        return (f"model: first-study stability median {hours:.1f} h "
+                f"(range {min(self.stability) / 3600:.1f}-{max(self.stability) / 3600:.1f} h), "
+                f"review growth {self.growth:g}; from {self.source}")
+
+
+def difficulty_multipliers(keys, correct, attempts):
+    """Stability multiplier per card, from its accuracy relative to the whole deck.
+
+    If every card is practised at a similar spacing, ``accuracy = exp(-lag / S)``,
+    so stabilities compare as ``log(deck accuracy) / log(card accuracy)``.
+    """
+    total = sum(attempts[key] for key in keys)
+    if not total:
+        return [1.0] * len(keys)
+    overall = min(max(sum(correct[key] for key in keys) / total, 0.05), 0.995)
+    multipliers = []
+    for key in keys:
+        accuracy = (correct[key] + PRIOR_ATTEMPTS * overall) / (attempts[key] + PRIOR_ATTEMPTS)
+        accuracy = min(max(accuracy, 0.05), 0.995)
+        multipliers.append(min(max(math.log(overall) / math.log(accuracy), 0.25), 4.0))
+    return multipliers
+
+
+def log_likelihood(sequences, stability, growth):
+    """Log-likelihood of observed repeat attempts under one set of curve parameters"""
+    total = 0.0
+    for multiplier, attempts in sequences:
+        first = stability * multiplier
+        current, last = None, None
+        for when, is_correct in attempts:
+            recall = 0.0
+            if current is not None:
+                recall = min(max(recall_probability(current, when - last), 1e-3), 1 - 1e-3)
+                total += math.log(recall if is_correct else 1 - recall)
+            current = study(current, first, recall, is_correct, growth)
+            last = when
+    return total
+
+
+# ---------------------------- READING STATS ----------------------------
+def read_counters(path):
+    """Per-card ``{"correct", "attempts"}`` from a JSON stats file or a SQLite database"""
+    try:
+        if path.endswith((".sqlite", ".db")):
+            with sqlite3.connect(path) as db:
+                rows = db.execute("SELECT card, correct, attempts FROM cards").fetchall()
+            return {card: {"correct": c, "attempts": a} for card, c, a in rows}
+        stats = _json_store(path).read(default_stats(()))
+        return stats.get("hiragana_stats", {})
+    except Exception as e:
+        print("Could not read stats:", path, e)
+        return {}
+
+
+def read_attempts(path):
+    """``[(card, [(epoch seconds, correct), ...])]`` for every card with timestamped attempts"""
+    rows = []
+    try:
+        if path.endswith((".sqlite", ".db")):
+            with sqlite3.connect(path) as db:
+                rows = db.execute("SELECT card, ts, correct FROM attempts ORDER BY id").fetchall()
+        else:  # Archived plus journaled answers
+            rows = [(record["k"], record["t"], record["ok"]) for record in _json_store(path).history()]
+    except Exception as e:
+        print("Could not read answer history:", path, e)
+
+    by_card = collections.defaultdict(list)
+    for card, when, is_correct in rows:
+        try:
+            by_card[card].append((datetime.strptime(when, "%Y-%m-%d %H:%M:%S").timestamp(), bool(is_correct)))
+        except (TypeError, ValueError):
+            continue
+    return [(card, sorted(attempts)) for card, attempts in by_card.items() if len(attempts) > 1]
+
+
+def _json_store(path):
+    """The JSON stats backend for a snapshot, journal or history path"""
+    base = os.path.splitext(path)[0] if path.endswith((".json", ".journal", ".history")) else path
+    return StatsJournal(f"{base}.json", f"{base}.journal")
+
+
+# ---------------------------- ORDERING STRATEGIES ----------------------------
+class RandomOrder:
+    """A fresh shuffle of the whole deck every session (the app's original ordering)"""
+
+    def __init__(self, deck, rng, interval_scale):
+        self.size = len(deck)
+        self.rng = rng
+
+    def session(self, clock, size):
+        yield from self.rng.sample(range(self.size), min(size, self.size))
+
+    def review(self, card, is_correct, now):
+        pass
+
+
+class SequentialOrder(RandomOrder):
+    """Chart order, each session carrying on where the last one stopped"""
+
+    def __init__(self, deck, rng, interval_scale):
+        super().__init__(deck, rng, interval_scale)
+        self.position = 0
+
+    def session(self, clock, size):
+        for _ in range(min(size, self.size)):
+            yield self.position
+            self.position = (self.position + 1) % self.size
+
+
+class WeakestFirst(RandomOrder):
+    """Lowest accuracy so far first (unseen cards count as 50%)"""
+
+    def __init__(self, deck, rng, interval_scale):
+        super().__init__(deck, rng, interval_scale)
+        self.correct = [0] * self.size
+        self.attempts = [0] * self.size
+
+    def session(self, clock, size):
+        ranked = sorted(range(self.size), key=lambda card: ((self.correct[card] + 1) / (self.attempts[card] + 2),
+                                                            self.rng.random()))
+        yield from ranked[:size]
+
+    def review(self, card, is_correct, now):
+        self.correct[card] += is_correct
+        self.attempts[card] += 1
+
+
+class Sm2Order:
+    """The app's spaced-repetition scheduler; ``due_only`` stops a session when nothing is due"""
+
+    due_only = False
+
+    def __init__(self, deck, rng, interval_scale):
+        self.deck = deck
+        self.states = {}
+        self.scheduler = Scheduler(deck, self.states, interval_scale)
+
+    def session(self, clock, size):
+        for _ in range(size):
+            card = self.scheduler.next_card(clock(), self.due_only)
+            if card is None:
+                return
+            yield card
+
+    def review(self, card, is_correct, now):
+        self.states[self.deck.key(card)] = self.scheduler.review(card, is_correct, now)
+
+
+class Sm2DueOnly(Sm2Order):
+    due_only = True
+
+
+STRATEGIES = {"random": RandomOrder, "sequential": SequentialOrder, "weakest": WeakestFirst,
+              "sm2": Sm2Order, "sm2-due": Sm2DueOnly}
+SCHEDULED = ("sm2", "sm2-due")  # Strategies that review intervals apply to
+
+
+# ---------------------------- SIMULATION ----------------------------
+@functools.lru_cache(maxsize=None)
+def load_deck(deck_path):
+    return Deck.load(deck_path) if deck_path else hiragana_deck()
+
+
+def simulate_learner(model, deck, strategy, session_size, days, interval_scale, seed):
+    """One learner's daily sessions; returns study time, practice accuracy and retention"""
+    rng = random.Random(seed)
+    random.seed(seed)  # The scheduler breaks ties with the module-level generator
+    ability = rng.lognormvariate(0, ABILITY_SPREAD)
+    first = [stability * ability for stability in model.stability]
+    stability = [None] * len(first)
+    last_seen = [0.0] * len(first)
+    order = STRATEGIES[strategy](deck, rng, interval_scale)
+
+    now = 0.0
+    seconds = right = answers = 0
+    for day in range(days):
+        now = day * DAY
+        for card in order.session(lambda: now, session_size):
+            recall = recall_probability(stability[card], now - last_seen[card])
+            is_correct = rng.random() < recall
+            stability[card] = study(stability[card], first[card], recall, is_correct, model.growth)
+            last_seen[card] = now
+            order.review(card, is_correct, now)
+            spent = SECONDS_CORRECT if is_correct else SECONDS_WRONG
+            now += spent
+            seconds += spent
+            right += is_correct
+            answers += 1
+
+    end = days * DAY
+    later = end + RETENTION_LATER_DAYS * DAY
+    return {
+        "minutes": seconds / 60,
+        "cards": len(stability),
+        "accuracy": right / answers if answers else 0.0,
+        "retention": statistics.fmean(recall_probability(s, end - t) for s, t in zip(stability, last_seen)),
+        "retention_later": statistics.fmean(recall_probability(s, later - t) for s, t in zip(stability, last_seen)),
+    }
+
+
+def run_batch(model, deck_path, strategy, session_size, days, interval_scale, seeds):
+    """Worker entry point: a batch of learners for one configuration"""
+    deck = load_deck(deck_path)
+    return [simulate_learner(model, deck, strategy, session_size, days, interval_scale, seed) for seed in seeds]
+
+
+def run(model, configs, learners, days, deck_path=None, seed=0, workers=None, batch_size=25):
+    """Simulate ``learners`` per ``(strategy, session size, interval scale)`` config, in parallel.
+
+    Every config sees the same learners (same seeds), so differences come from
+    the strategy rather than the draw.
+    """
+    results = {config: [] for config in configs}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for config in configs:
+            strategy, session_size, interval_scale = config
+            for start in range(0, learners, batch_size):
+                seeds = range(seed + start, seed + min(start + batch_size, learners))
+                future = pool.submit(run_batch, model, deck_path, strategy, session_size, days, interval_scale, seeds)
+                futures[future] = config
+        for future in concurrent.futures.as_completed(futures):
+            results[futures[future]] += future.result()
+    return [summarize(config, runs, days) for config, runs in results.items()]
+
+
+def summarize(config, runs, days):
+    strategy, session_size, interval_scale = config
+    hours = statistics.fmean(run["minutes"] for run in runs) / 60
+    retention = statistics.fmean(run["retention"] for run in runs)
+    return {
+        "strategy": strategy,
+        "session_size": session_size,
+        "interval_scale": interval_scale,
+        "learners": len(runs),
+        "minutes_per_day": hours * 60 / days,
+        "accuracy": statistics.fmean(run["accuracy"] for run in runs),
+        "retention": retention,
+        "retention_stderr": statistics.stdev(run["retention"] for run in runs) / math.sqrt(len(runs))
+        if len(runs) > 1 else 0.0,
+        "retention_later": statistics.fmean(run["retention_later"] for run in runs),
+        "cards_retained_per_hour": retention * statistics.fmean(run["cards"] for run in runs) / hours
+        if hours else 0.0,
+    }
+
+
+def format_report(rows, days):
+    """Plain-text comparison table, best long-term retention first"""
+    rows = sorted(rows, key=lambda row: row["retention_later"], reverse=True)
+    lines = [f"{'strategy':10} {'size':>4} {'scale':>5} {'min/day':>7} {'accuracy':>8} "
+             f"{'retained':>12} {f'+{RETENTION_LATER_DAYS}d':>8} {'cards/h':>8}"]
+    for row in rows:
+        scale = f"{row['interval_scale']:g}" if row["strategy"] in SCHEDULED else "-"
+        lines.append(f"{row['strategy']:10} {row['session_size']:4d} {scale:>5} {row['minutes_per_day']:7.1f} "
+                     f"{row['accuracy']:8.1%} {row['retention']:6.1%} ±{row['retention_stderr']:4.1%} "
+                     f"{row['retention_later']:8.1%} {row['cards_retained_per_hour']:8.1f}")
+    best = rows[0]
+    efficient = max(rows, key=lambda row: row["cards_retained_per_hour"])
+    lines += ["", f"After {days} days: best retention {best['strategy']} × {best['session_size']} cards/day; "
+                  f"most cards retained per hour studied {efficient['strategy']} × {efficient['session_size']} cards/day"]
+    return "\n".join(lines)
+
+
+# ---------------------------- COMMAND LINE ----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare card ordering, session length and review "
+                                                 "intervals on simulated learners")
+    parser.add_argument("stats", nargs="*", help="Stats files to fit the learner model on (JSON stats, whose "
+                                                 ".history archive fits the forgetting curve, or .sqlite; "
+                                                 "default: hiragana_stats.json if present)")
+    parser.add_argument("--deck", help="Binary deck file (default: hiragana)")
+    parser.add_argument("--learners", type=int, default=200, help="Learners per configuration (default: 200)")
+    parser.add_argument("--days", type=int, default=30, help="Days of one session each (default: 30)")
+    parser.add_argument("--strategies", nargs="+", choices=sorted(STRATEGIES), default=list(STRATEGIES))
+    parser.add_argument("--session-sizes", nargs="+", type=int, default=[10, 20, 46],
+                        help="Cards per session (default: 10 20 46)")
+    parser.add_argument("--interval-scales", nargs="+", type=float, default=[1.0],
+                        help="Multipliers on SM-2 review intervals, for the sm2 strategies (default: 1)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the comparison to this JSON file")
+    args = parser.parse_args()
+
+    paths = args.stats or [path for path in ["hiragana_stats.json"] if os.path.exists(path)]
+    model = LearnerModel.fit(paths, load_deck(args.deck).keys())
+    print(model.describe())
+
+    configs = [(strategy, size, scale)
+               for strategy in args.strategies for size in args.session_sizes
+               for scale in (args.interval_scales if strategy in SCHEDULED else [1.0])]
+    rows = run(model, configs, args.learners, args.days, args.deck, args.seed, args.workers)
+    print(format_report(rows, args.days))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"model": model.describe(), "days": args.days, "results": rows}, f, ensure_ascii=False, indent=2)
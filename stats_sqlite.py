@@ -0,0 +1,266 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+
+from stats_store import STATS_FILE, JOURNAL_FILE, StatsJournal, default_stats
+
+# ---------------------------- CONSTANTS ----------------------------
+STATS_DB = "reuniclus_stats.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    card TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    correct INTEGER NOT NULL,
+    answer TEXT
+);
+CREATE INDEX IF NOT EXISTS attempts_card_ts ON attempts (card, ts);
+CREATE INDEX IF NOT EXISTS attempts_ts ON attempts (ts);
+CREATE TABLE IF NOT EXISTS cards (
+    card TEXT PRIMARY KEY,
+    correct INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    srs TEXT
+);
+CREATE TABLE IF NOT EXISTS confusions (
+    card TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (card, answer)
+);
+CREATE TABLE IF NOT EXISTS days (
+    day TEXT PRIMARY KEY,
+    correct INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+"""
+
+UPSERT_CARD = """
+INSERT INTO cards (card, correct, attempts) VALUES (?, ?, ?)
+ON CONFLICT (card) DO UPDATE SET correct = correct + excluded.correct,
+                                 attempts = attempts + excluded.attempts
+"""
+UPSERT_DAY = """
+INSERT INTO days (day, correct, attempts) VALUES (?, ?, ?)
+ON CONFLICT (day) DO UPDATE SET correct = correct + excluded.correct,
+                                attempts = attempts + excluded.attempts
+"""
+UPSERT_CONFUSION = """
+INSERT INTO confusions (card, answer, count) VALUES (?, ?, ?)
+ON CONFLICT (card, answer) DO UPDATE SET count = count + excluded.count
+"""
+ADD_META = """
+INSERT INTO meta (key, value) VALUES (?, ?)
+ON CONFLICT (key) DO UPDATE SET value = value + excluded.value
+"""
+MAX_META = """
+INSERT INTO meta (key, value) VALUES (?, ?)
+ON CONFLICT (key) DO UPDATE SET value = MAX(value, excluded.value)
+"""
+SET_META = "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)"
+
+
+# ---------------------------- SQLITE BACKEND ----------------------------
+class SqliteStatsStore:
+    """SQLite stats backend keeping every attempt, with per-card and per-day queries.
+
+    Runs in WAL mode so reports can read while the app writes. Each batch handed
+    over by the stats writer is inserted in a single transaction, together with
+    its increments to the per-card and per-day tables. ``load`` builds the usual
+    stats dict from those, so startup is O(cards + days) rather than O(attempts).
+    """
+
+    def __init__(self, path=STATS_DB):
+        self.path = path
+        self.pending = 0  # Nothing to compact; attempts go straight into the database
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._streak = 0
+        self._build_days()
+
+    def load(self, default_stats):
+        """Return the stats dict, importing the JSON stats files on first use"""
+        if self._meta("imported_json") is None:
+            if os.path.exists(STATS_FILE):
+                self.import_json(STATS_FILE, JOURNAL_FILE)
+            else:
+                with self._lock, self._db:
+                    self._db.execute(SET_META, ("imported_json", ""))
+
+        stats = default_stats
+        with self._lock:
+            for card, correct, attempts, srs in self._db.execute(
+                    "SELECT card, correct, attempts, srs FROM cards"):
+                stats["hiragana_stats"][card] = {"correct": correct, "attempts": attempts}
+                if srs:
+                    stats.setdefault("srs", {})[card] = json.loads(srs)
+            for card, answer, count in self._db.execute("SELECT card, answer, count FROM confusions"):
+                stats.setdefault("confusions", {}).setdefault(card, {})[answer] = count
+            stats["daily"] = {day: [correct, attempts] for day, correct, attempts in
+                              self._db.execute("SELECT day, correct, attempts FROM days")}
+
+        for key in ("total_correct", "total_attempts", "streak", "longest_streak", "last_session"):
+            value = self._meta(key)
+            if value is not None:
+                stats[key] = value
+        self._streak = stats["streak"]
+        return stats
+
+    def append(self, records):
+        """Insert one batch of answer records in a single transaction"""
+        attempts, cards, days, confusions, srs = [], {}, {}, {}, {}
+        correct_total = 0
+        longest = 0
+        for record in records:
+            key, ok = record["k"], record["ok"]
+            attempts.append((key, record["t"], ok, record.get("a")))
+            counts = cards.setdefault(key, [0, 0])
+            counts[0] += ok
+            counts[1] += 1
+            day = days.setdefault(record["t"][:10], [0, 0])
+            day[0] += ok
+            day[1] += 1
+            if "a" in record:
+                confusions[(key, record["a"])] = confusions.get((key, record["a"]), 0) + 1
+            if "s" in record:
+                srs[key] = json.dumps(record["s"])
+            correct_total += ok
+            self._streak = self._streak + 1 if ok else 0
+            longest = max(longest, self._streak)
+
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO attempts (card, ts, correct, answer) VALUES (?, ?, ?, ?)", attempts)
+            self._db.executemany(UPSERT_CARD, [(key, c, a) for key, (c, a) in cards.items()])
+            self._db.executemany(UPSERT_DAY, [(day, c, a) for day, (c, a) in days.items()])
+            self._db.executemany(UPSERT_CONFUSION, [(k, a, n) for (k, a), n in confusions.items()])
+            self._db.executemany("UPDATE cards SET srs = ? WHERE card = ?",
+                                 [(state, key) for key, state in srs.items()])
+            self._db.executemany(ADD_META, [("total_correct", correct_total),
+                                            ("total_attempts", len(attempts))])
+            self._db.execute(MAX_META, ("longest_streak", longest))
+            self._db.executemany(SET_META, [("streak", self._streak),
+                                            ("last_session", records[-1]["t"])])
+
+    def compact(self, stats):
+        """Nothing to fold: every batch is already durable in the database"""
+        self.pending = 0
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._db.close()
+
+    # ---------------------------- IMPORT ----------------------------
+    def import_json(self, snapshot_path, journal_path=None):
+        """Add a JSON stats file (and its journal, if any) to the database.
+
+        Accepts both the app's ``reuniclus_stats.json`` and older
+        ``hiragana_stats.json``-shaped files. Counters are added, so importing
+        several learners' files into one database sums them; the answer history
+        kept beside the journal becomes attempts.
+        """
+        store = StatsJournal(snapshot_path, journal_path)
+        stats = store.read(default_stats(()))
+        per_card = stats.get("hiragana_stats", {})
+        attempts = [(record["k"], record["t"], record["ok"], record.get("a")) for record in store.history()]
+
+        with self._lock, self._db:
+            self._db.executemany("INSERT INTO attempts (card, ts, correct, answer) VALUES (?, ?, ?, ?)", attempts)
+            self._db.executemany(UPSERT_CARD, [(key, counts.get("correct", 0), counts.get("attempts", 0))
+                                               for key, counts in per_card.items()])
+            self._db.executemany("UPDATE cards SET srs = ? WHERE card = ?",
+                                 [(json.dumps(state), key) for key, state in stats.get("srs", {}).items()])
+            self._db.executemany(UPSERT_CONFUSION, [(key, answer, count)
+                                                    for key, answers in stats.get("confusions", {}).items()
+                                                    for answer, count in answers.items()])
+            self._db.executemany(UPSERT_DAY, [(day, correct, attempts) for day, (correct, attempts)
+                                              in stats.get("daily", {}).items()])
+            self._db.executemany(ADD_META, [("total_correct", stats.get("total_correct", 0)),
+                                            ("total_attempts", stats.get("total_attempts", 0))])
+            self._db.execute(MAX_META, ("longest_streak", stats.get("longest_streak", 0)))
+            self._db.executemany(SET_META, [("streak", stats.get("streak", 0)),
+                                            ("last_session", stats.get("last_session")),
+                                            ("imported_json", os.path.abspath(snapshot_path))])
+        return len(per_card)
+
+    def import_cards(self, cards):
+        """Add per-card counters from elsewhere (e.g. a deck package).
+
+        ``cards`` yields ``(key, {"correct", "attempts"[, "srs"]})``; a scheduler
+        state is only taken for cards that don't have one yet. Returns the count.
+        """
+        rows, states = [], []
+        for key, counts in cards:
+            rows.append((key, counts.get("correct", 0), counts.get("attempts", 0)))
+            if counts.get("srs"):
+                states.append((json.dumps(counts["srs"]), key))
+
+        with self._lock, self._db:
+            self._db.executemany(UPSERT_CARD, rows)
+            self._db.executemany("UPDATE cards SET srs = ? WHERE card = ? AND srs IS NULL", states)
+            self._db.executemany(ADD_META, [("total_correct", sum(row[1] for row in rows)),
+                                            ("total_attempts", sum(row[2] for row in rows))])
+        return len(rows)
+
+    # ---------------------------- REPORTING ----------------------------
+    def card_summary(self, card):
+        """``(correct, attempts)`` for one card"""
+        with self._lock:
+            row = self._db.execute("SELECT correct, attempts FROM cards WHERE card = ?", (card,)).fetchone()
+        return row or (0, 0)
+
+    def card_history(self, card, since=None):
+        """Every attempt at one card as ``(timestamp, correct, answer)``, oldest first"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT ts, correct, answer FROM attempts WHERE card = ? AND ts >= ? ORDER BY ts",
+                (card, since or "")).fetchall()
+
+    def daily_summary(self, since=None, until=None):
+        """``(day, correct, attempts)`` per day between two ``YYYY-MM-DD`` dates"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT day, correct, attempts FROM days WHERE day >= ? AND day <= ? ORDER BY day",
+                (since or "", until or "9999-12-31")).fetchall()
+
+    def _build_days(self):
+        """Fill the per-day table from the attempts of a database that predates it (once)"""
+        if self._meta("days_built") is not None:
+            return
+        with self._lock, self._db:
+            self._db.execute("INSERT INTO days (day, correct, attempts) "
+                             "SELECT substr(ts, 1, 10), SUM(correct), COUNT(*) FROM attempts GROUP BY 1 "
+                             "ON CONFLICT (day) DO UPDATE SET correct = correct + excluded.correct, "
+                             "attempts = attempts + excluded.attempts")
+            self._db.execute(SET_META, ("days_built", 1))
+
+    def _meta(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+
+# ---------------------------- COMMAND LINE ----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import JSON stats files into a Reuniclus stats database")
+    parser.add_argument("sources", nargs="+", help="reuniclus_stats.json or hiragana_stats.json files")
+    parser.add_argument("--db", default=STATS_DB, help=f"Database to import into (default: {STATS_DB})")
+    args = parser.parse_args()
+
+    store = SqliteStatsStore(args.db)
+    for source in args.sources:
+        journal = os.path.splitext(source)[0] + ".journal"
+        cards = store.import_json(source, journal if os.path.exists(journal) else None)
+        print(f"Imported {cards} cards from {source}")
+    store.close()
@@ -0,0 +1,559 @@
+import copy
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+
+try:
+    import fcntl  # POSIX advisory locks
+except ImportError:
+    fcntl = None
+    import msvcrt  # Windows byte-range locks
+
+# ---------------------------- CONSTANTS ----------------------------
+STATS_FILE = "reuniclus_stats.json"  # Snapshot of the full stats dict
+JOURNAL_FILE = "reuniclus_stats.journal"  # One compact JSON record per answer
+COMPACT_EVERY = 250  # Answers appended before the journal is folded into a snapshot
+WRITER_QUEUE_SIZE = 1024  # Pending answers before submit() applies backpressure
+MAX_CONFUSIONS_PER_CARD = 20  # Distinct wrong answers remembered per card
+
+
+# ---------------------------- STATS UPDATES ----------------------------
+def answer_record(key, is_correct, when, answer=None, srs=None):
+    """Compact journal record for one answer; wrong answers keep what was given"""
+    record = {"k": key, "ok": int(bool(is_correct)), "t": when}
+    if not is_correct and answer:
+        record["a"] = answer
+    if srs is not None:
+        record["s"] = srs
+    return record
+
+
+def apply_record(stats, record):
+    """Fold one answer record into the stats dict (used live and on journal replay)"""
+    apply_answer(stats, record["k"], record["ok"], record["t"], record.get("a"), record.get("s"))
+
+
+def apply_answer(stats, key, is_correct, when, answer=None, srs=None):
+    """Fold a single answer (and the card's new scheduler state) into the stats dict.
+
+    Besides the per-card counters this keeps ``daily``: ``{"YYYY-MM-DD": [correct,
+    attempts]}``, so per-day views never have to rescan the answer history.
+    """
+    card_stats = stats["hiragana_stats"].setdefault(key, {"correct": 0, "attempts": 0})
+    card_stats["attempts"] += 1
+    stats["total_attempts"] += 1
+    day = stats.setdefault("daily", {}).setdefault(when[:10], [0, 0])
+    day[1] += 1
+
+    if is_correct:
+        card_stats["correct"] += 1
+        stats["total_correct"] += 1
+        day[0] += 1
+        stats["streak"] += 1
+        stats["longest_streak"] = max(stats["streak"], stats["longest_streak"])
+    else:
+        stats["streak"] = 0
+        if answer:
+            confusions = stats.setdefault("confusions", {}).setdefault(key, {})
+            if answer in confusions or len(confusions) < MAX_CONFUSIONS_PER_CARD:
+                confusions[answer] = confusions.get(answer, 0) + 1
+
+    if srs is not None:
+        stats.setdefault("srs", {})[key] = srs
+    stats["last_session"] = when
+
+
+def merge_stats(merged, local):
+    """Merge one writer's view into stats rebuilt from disk (``merged``, updated in place).
+
+    Counters need nothing here: every writer journals its answers as increments,
+    so replaying the shared journal already sums them. ``longest_streak`` is a
+    max-register (``merged`` already holds the best streak any writer's replayed
+    answers reached), and ``streak`` belongs to whoever is writing.
+    """
+    merged["longest_streak"] = max(merged.get("longest_streak", 0), local.get("longest_streak", 0))
+    merged["streak"] = local.get("streak", 0)
+    return merged
+
+
+def add_card_stats(stats, cards):
+    """Add ``(key, {"correct", "attempts"[, "srs"]})`` counters into a stats dict; returns the count.
+
+    A scheduler state is only taken for cards that don't have one yet.
+    """
+    srs = stats.setdefault("srs", {})
+    count = 0
+    for key, counts in cards:
+        card_stats = stats["hiragana_stats"].setdefault(key, {"correct": 0, "attempts": 0})
+        card_stats["correct"] += counts.get("correct", 0)
+        card_stats["attempts"] += counts.get("attempts", 0)
+        stats["total_correct"] += counts.get("correct", 0)
+        stats["total_attempts"] += counts.get("attempts", 0)
+        if counts.get("srs") and key not in srs:
+            srs[key] = counts["srs"]
+        count += 1
+    return count
+
+
+def default_stats(keys):
+    """Empty stats dict with a zeroed entry for every card key"""
+    return {
+        "total_correct": 0,
+        "total_attempts": 0,
+        "hiragana_stats": {key: {"correct": 0, "attempts": 0} for key in keys},
+        "streak": 0,
+        "longest_streak": 0,
+        "last_session": None,
+        "daily": {}
+    }
+
+
+# ---------------------------- JSON BACKEND ----------------------------
+class StatsJournal:
+    """JSON stats backend: append-only answer journal with periodic snapshot compaction.
+
+    The snapshot keeps the familiar ``reuniclus_stats.json`` layout. The journal
+    starts with a header naming the snapshot generation it extends, so a crash
+    between writing a new snapshot and resetting the journal never double-counts.
+    Compaction moves the folded records onto the end of ``<journal>.history``,
+    which is never truncated, so every answer stays available to analytics.
+
+    Several processes may share the files (two windows on one account). Every
+    read and write holds an advisory lock on ``<snapshot>.lock``; appends go to
+    whichever journal is current, and ``compact`` rebuilds the snapshot from
+    disk, so no writer's answers are lost to another's snapshot.
+
+    Every stats backend offers ``load``, ``append``, ``compact``, ``close`` and a
+    ``pending`` count of records that ``compact`` would fold away.
+    """
+
+    def __init__(self, snapshot_path=STATS_FILE, journal_path=JOURNAL_FILE):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.history_path = journal_path and os.path.splitext(journal_path)[0] + ".history"
+        self.pending = 0  # Records in the journal that are not in the snapshot yet
+        self.lock = FileLock(f"{snapshot_path}.lock")
+        self.read_lock = FileLock(f"{snapshot_path}.lock", create=False)  # Readers never leave a lock file
+        self.writer = uuid.uuid4().hex[:8]  # Tags this process's journal records
+        self.streak = 0  # This writer's streak, carried on from the stats it loaded
+        self._generation = None
+        self._seeded_generation = None  # Journal generation that has this writer's starting streak
+
+    def load(self, default_stats):
+        """Return the snapshot with the journal tail replayed on top of it"""
+        with self.lock:
+            stats, good_end = self._read(default_stats)
+            if good_end is None:
+                write_atomic(self.journal_path, self._header())
+            else:
+                os.truncate(self.journal_path, good_end)  # Drop any torn tail before appending
+        self.streak = stats.get("streak", 0)
+        return stats
+
+    def read(self, default_stats):
+        """Like ``load`` but read-only: the journal is not touched, and no lock file is created"""
+        with self.read_lock:
+            return self._read(default_stats)[0]
+
+    def history(self):
+        """Every answer record kept so far, oldest first: the archive, then the live journal.
+
+        Read-only like ``read``. Answers folded into the snapshot before the
+        archive existed only survive as counters.
+        """
+        records = []
+        with self.read_lock:
+            if self.history_path and os.path.exists(self.history_path):
+                with open(self.history_path, "rb") as f:
+                    records += _parse_records(f)
+            if self.journal_path and os.path.exists(self.journal_path):
+                with open(self.journal_path, "rb") as f:
+                    try:
+                        current = json.loads(f.readline()).get("gen") == self._snapshot_generation()
+                    except (ValueError, AttributeError):
+                        current = False
+                    if current:
+                        records += _parse_records(f)
+        return records
+
+    def append(self, records):
+        """Durably append answer records with a single fsync.
+
+        Records are tagged with this writer, and its first record in each journal
+        generation also carries the streak it started from (``w0``), so replay
+        continues each writer's streak where it really was.
+        """
+        # The journal is opened per batch, never held: another process may replace it
+        with self.lock, open(self.journal_path, "a+b") as journal:
+            self._check_journal(journal)
+            lines = []
+            streak, seeded = self.streak, self._seeded_generation == self._generation
+            for record in records:
+                tagged = dict(record, w=self.writer)
+                if not seeded:
+                    tagged["w0"] = streak
+                    seeded = True
+                streak = streak + 1 if record["ok"] else 0
+                lines.append(json.dumps(tagged, ensure_ascii=False, separators=(",", ":")) + "\n")
+            journal.write("".join(lines).encode("utf-8"))
+            journal.flush()
+            os.fsync(journal.fileno())
+        self.streak, self._seeded_generation = streak, self._generation  # Only once it is on disk
+        self.pending += len(records)
+
+    def compact(self, stats):
+        """Fold the journal into a fresh snapshot and start an empty journal for it.
+
+        The snapshot is rebuilt from the files, so it includes answers journaled
+        by other processes, and merged with this writer's ``stats``.
+        """
+        with self.lock:
+            merged, journal_end = self._read_merged(default_stats(stats.get("hiragana_stats", ())))
+            merge_stats(merged, stats)
+            merged["streak_writer"] = self.writer
+            self._rewrite(merged, journal_end)
+            stats["journal_gen"] = merged["journal_gen"]
+
+    def import_cards(self, cards):
+        """Add per-card counters from elsewhere (e.g. a deck package) and fold the journal.
+
+        ``cards`` yields ``(key, {"correct", "attempts"[, "srs"]})``; a scheduler
+        state is only taken for cards that don't have one yet. Returns the count.
+        """
+        with self.lock:
+            merged, journal_end = self._read_merged(default_stats(()))
+            count = add_card_stats(merged, cards)
+            self._rewrite(merged, journal_end)
+        return count
+
+    def close(self):
+        """Nothing stays open between calls; kept for the stats backend interface"""
+
+    # ---------------------------- INTERNALS ----------------------------
+    def _read(self, default_stats):
+        stats = self._read_snapshot(default_stats)
+        return stats, self._replay(stats)
+
+    def _read_merged(self, default_stats):
+        """Snapshot plus every writer's journaled answers (streaks replayed per writer),
+        and the journal offset replay stopped at"""
+        merged = self._read_snapshot(default_stats)
+        return merged, self._replay(merged)
+
+    def _rewrite(self, stats, journal_end):
+        """Write ``stats`` as a new snapshot generation, archive the journal records
+        replayed into it (up to ``journal_end``) and start its empty journal"""
+        generation = uuid.uuid4().hex
+        stats["journal_gen"] = generation
+        write_atomic(self.snapshot_path,
+                     json.dumps(stats, ensure_ascii=False, indent=2))
+
+        # The snapshot is on disk now; a crash from here on leaves a journal whose
+        # header no longer matches, and the stale records are skipped on load (and
+        # never archived twice).
+        if journal_end is not None:
+            self._archive(journal_end)
+        self._generation = generation
+        write_atomic(self.journal_path, self._header())
+        self.pending = 0
+
+    def _read_snapshot(self, default_stats):
+        stats = default_stats
+        try:
+            if os.path.exists(self.snapshot_path):
+                with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                    stats = json.load(f)
+        except Exception as e:
+            print("Could not read stats snapshot:", e)
+            stats = default_stats
+
+        self._generation = stats.get("journal_gen")
+        self.pending = 0
+        return stats
+
+    def _header(self):
+        return json.dumps({"gen": self._generation}) + "\n"
+
+    def _replay(self, stats):
+        """Apply journal records to ``stats``; return the offset of the last whole line.
+
+        Each writer's streak is replayed on its own, starting from the ``w0`` its
+        first record carries, so answers from two windows interleaved in the
+        journal never chain into one longer streak.
+        """
+        if self.journal_path is None or not os.path.exists(self.journal_path):
+            return None
+
+        with open(self.journal_path, "rb") as f:
+            header = f.readline()
+            try:
+                if not header.endswith(b"\n") or json.loads(header).get("gen") != self._generation:
+                    return None  # Stale journal, already folded into the snapshot
+            except ValueError:
+                return None
+
+            good_end = f.tell()
+            streaks = {stats.get("streak_writer"): stats.get("streak", 0)}  # Writer -> streak so far
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Torn tail from an interrupted write
+                try:
+                    record = json.loads(line)
+                    writer = record.get("w")
+                    if "w0" in record:
+                        streaks[writer] = record["w0"]
+                    stats["streak"] = streaks.get(writer, 0)
+                    apply_record(stats, record)
+                    streaks[writer] = stats["streak"]
+                except (ValueError, KeyError, TypeError):
+                    break
+                good_end = f.tell()
+                self.pending += 1
+        return good_end
+
+    def _archive(self, journal_end):
+        """Append the journal's records up to ``journal_end`` to the history file"""
+        try:
+            with open(self.journal_path, "rb") as journal:
+                journal.readline()  # Generation header
+                records = journal.read(journal_end - journal.tell())
+            if records:
+                with open(self.history_path, "a+b") as history:
+                    _cut_torn_tail(history)
+                    history.write(records)
+                    history.flush()
+                    os.fsync(history.fileno())
+        except OSError as e:
+            print("Could not archive answer history:", e)
+
+    def _check_journal(self, journal):
+        """Before appending: follow another process's compaction and cut a torn tail"""
+        journal.seek(0)
+        header = journal.readline()
+        try:
+            generation = json.loads(header).get("gen") if header.endswith(b"\n") else None
+        except ValueError:
+            header, generation = b"", None
+        if generation != self._generation or not header:
+            self._generation = self._snapshot_generation()
+            self.pending = 0  # Whoever compacted folded our earlier records in
+            if generation != self._generation or not header:
+                # Missing, or left behind by a writer that crashed mid-compaction
+                journal.truncate(0)
+                journal.write(self._header().encode("utf-8"))
+
+        _cut_torn_tail(journal)  # A writer that died mid-append leaves a torn line
+
+    def _snapshot_generation(self):
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("journal_gen")
+        except (OSError, ValueError):
+            return None
+
+
+def _cut_torn_tail(f):
+    """Truncate a file opened ``a+b`` after its last newline, so appended lines parse"""
+    end = f.seek(0, os.SEEK_END)
+    if end:
+        f.seek(end - 1)
+        if f.read(1) != b"\n":
+            f.seek(0)
+            f.truncate(f.read().rfind(b"\n") + 1)
+
+
+def _parse_records(lines):
+    """Answer records from journal lines, stopping at a torn or unreadable one"""
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            break
+    return records
+
+
+# ---------------------------- LOCKING ----------------------------
+class FileLock:
+    """Blocking advisory lock held across processes (``with lock:``).
+
+    Uses ``flock`` on POSIX and ``msvcrt.locking`` on Windows, on a sidecar file
+    because the stats files themselves are replaced by atomic renames. With
+    ``create=False`` (for readers) a missing lock file means no writer has
+    ever used these files, and nothing is locked or created.
+    """
+
+    def __init__(self, path, create=True):
+        self.path = path
+        self.create = create
+        self._file = None
+        self._thread_lock = threading.Lock()  # flock doesn't exclude threads sharing this object
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            self._file = open(self.path, "a+b" if self.create else "r+b")
+        except OSError as e:
+            if not self.create and isinstance(e, FileNotFoundError):
+                return self  # Nothing has written here yet; read without a lock
+            self._thread_lock.release()
+            raise
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        else:
+            self._file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass  # LK_LOCK gives up after ten seconds; keep waiting
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._file is None:
+            self._thread_lock.release()
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+            self._thread_lock.release()
+
+
+# ---------------------------- BACKGROUND WRITER ----------------------------
+class StatsWriter:
+    """Dedicated thread that owns all stats disk I/O so the Tk loop never waits on it.
+
+    Answers queued while a write is in flight are coalesced into the next append
+    to the backend. The writer keeps its own copy of the stats, updated from the
+    same records, so snapshots never need the UI thread's dict.
+    """
+
+    def __init__(self, store, stats, max_queue=WRITER_QUEUE_SIZE):
+        self.store = store
+        self.queue = queue.Queue(maxsize=max_queue)
+        self._stats = copy.deepcopy(stats)
+        self._unsaved = []  # Applied to self._stats, but their append failed; retried with the next batch
+        self.observer = None  # Optional callable(operation, start, end, records), run on this thread
+
+        # Counters
+        self.writes = 0
+        self.records = 0
+        self.max_queue_depth = 0
+        self.last_write_ms = 0.0
+        self.max_write_ms = 0.0
+        self.total_write_ms = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="reuniclus-stats-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, record):
+        """Queue one answer record; blocks only if the disk is a full queue behind"""
+        self.queue.put(record)
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+
+    def flush(self):
+        """Wait until every queued answer is on disk"""
+        self.queue.join()
+
+    def close(self):
+        """Flush, write a final snapshot and stop the thread"""
+        if not self._thread.is_alive():
+            return
+        self.queue.put(None)
+        self._thread.join()
+        self.store.close()
+
+    def counters(self):
+        """Write latency and queue depth counters"""
+        return {
+            "queue_depth": self.queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "writes": self.writes,
+            "records": self.records,
+            "last_write_ms": self.last_write_ms,
+            "max_write_ms": self.max_write_ms,
+            "avg_write_ms": self.total_write_ms / self.writes if self.writes else 0.0,
+        }
+
+    def _run(self):
+        if self.store.pending >= COMPACT_EVERY:
+            self._write(self.store.compact, self._stats)
+
+        stopping = False
+        while not stopping:
+            batch = [self.queue.get()]
+            while True:  # Coalesce everything that queued up behind the first item
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if None in batch:
+                stopping = True
+                records = [item for item in batch if item is not None]
+            else:
+                records = batch
+
+            try:
+                self._save(records, stopping)
+            except Exception as e:  # The thread must survive, or flush() and close() wait forever
+                print("Could not save stats:", e)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _save(self, records, stopping):
+        """Apply and append one batch (after any earlier one that failed), compacting when due"""
+        for record in records:
+            try:
+                apply_record(self._stats, record)
+            except Exception as e:  # Kept out of the journal too, where it would stop replay
+                print("Could not apply answer record:", e)
+                continue
+            self._unsaved.append(record)
+        if self._unsaved and self._write(self.store.append, self._unsaved):
+            self.records += len(self._unsaved)
+            self._unsaved = []
+        if self.store.pending >= COMPACT_EVERY or (stopping and self.store.pending):
+            self._write(self.store.compact, self._stats)
+        if stopping and self._unsaved:
+            print(f"Could not save stats: {len(self._unsaved)} answers were not written")
+
+    def _write(self, operation, argument):
+        """Run one store operation, timed; returns whether it succeeded"""
+        start = time.perf_counter()
+        try:
+            operation(argument)
+            succeeded = True
+        except Exception as e:
+            print("Could not save stats:", e)
+            succeeded = False
+        end = time.perf_counter()
+        elapsed_ms = (end - start) * 1000
+        if self.observer is not None:
+            self.observer(operation.__name__, start, end, len(argument) if isinstance(argument, list) else 0)
+        self.writes += 1
+        self.last_write_ms = elapsed_ms
+        self.max_write_ms = max(self.max_write_ms, elapsed_ms)
+        self.total_write_ms += elapsed_ms
+        return succeeded
+
+
+def write_atomic(path, text):
+    """Write ``text`` to ``path`` via a temp file and an atomic rename"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -0,0 +1,393 @@
+"""Terminal front end: the Tk app's practice sessions, drawn with curses.
+
+For SSH sessions and machines where starting Tk is slow or impossible. It
+drives the same ``QuizEngine``, decks and stats files as the Tk app, so both
+front ends can be used in turn (or at once) on one learner's stats.
+
+    python reuniclus.py --tui
+    python tui.py --deck katakana --stats-db reuniclus_stats.sqlite
+
+Each keystroke redraws only the current screen into curses' buffer, and
+curses sends the terminal just the cells that changed, so feedback stays well
+under a millisecond locally and costs a few bytes over SSH.
+"""
+import argparse
+import curses
+import locale
+import os
+import threading
+import time
+import unicodedata
+
+from deck_registry import DECKS_DIR, DEFAULT_DECK, DeckRegistry
+from engine import QuizEngine, prepare_indexes
+from romaji import is_katakana, live_kana, to_kana, to_katakana
+from stats_store import StatsJournal, StatsWriter, default_stats
+
+# ---------------------------- CONSTANTS ----------------------------
+APP_NAME = "Reuniclus"
+APP_TAGLINE = "Hiragana Learning Studio"
+ESCAPE_DELAY_MS = 25  # How long curses waits to tell Esc from an escape sequence
+ACCENT, CORRECT, INCORRECT, SECONDARY, WARNING = 1, 2, 3, 4, 5  # Colour pairs
+HEAT_LEVELS = [(80, CORRECT), (50, WARNING), (0, INCORRECT)]  # Heatmap colour by minimum accuracy %
+FEEDBACK_COLORS = [CORRECT, CORRECT, SECONDARY, ACCENT]  # By engine feedback tier
+ENTER_KEYS = ("\n", "\r", curses.KEY_ENTER)
+BACKSPACE_KEYS = ("\b", "\x7f", curses.KEY_BACKSPACE)
+
+
+# ---------------------------- HELPERS ----------------------------
+def text_width(text):
+    """Terminal cells ``text`` takes up (kana and emoji are two wide)"""
+    return sum(2 if unicodedata.east_asian_width(ch) in "WF" else 1 for ch in text)
+
+
+def open_stats(stats_db, deck):
+    """The stats store, stats dict and writer the Tk app would use"""
+    if stats_db:
+        from stats_sqlite import SqliteStatsStore  # Only needed for the database backend
+        store = SqliteStatsStore(stats_db)
+    else:
+        store = StatsJournal()
+    stats = store.load(default_stats(deck.keys()))
+    return store, stats, StatsWriter(store, stats)
+
+
+# ---------------------------- TERMINAL APP ----------------------------
+class TerminalApp:
+    """Menu, card, feedback and results screens over one ``QuizEngine``"""
+
+    def __init__(self, window, deck=None, stats_db=None, profile=None):
+        self.window = window
+        self.profile = profile
+        self.message = ""  # One-line notice under the menu
+        self.decks = DeckRegistry()
+        self.deck_entry = self.load_deck(deck)
+        self.deck = self.deck_entry.deck
+        self.multiple_choice_mode = False
+        self.due_only_mode = False
+
+        self.screen_name = "menu"
+        self.options = []  # Multiple-choice options on the card screen
+        self.typed = ""  # Free answer so far (romaji turns into kana as it is typed)
+        self.kana_input = False
+        self.katakana_input = False
+        self.last_answer = None  # (is_correct, user answer) shown on the feedback screen
+        self.latencies = []  # Keystroke to updated screen, in ms
+        self.stats = None
+
+        self.setup_terminal()
+        self.draw()  # First frame before the stats are read
+        if self.profile is not None:
+            self.profile.mark("first_frame")
+        self.stats_store, self.stats, self.stats_writer = open_stats(stats_db, self.deck)
+        self.engine = QuizEngine(self.deck, self.stats, self.stats_writer, indexes=self.deck_entry.indexes)
+        self.build_indexes()
+        if self.profile is not None:
+            self.profile.mark("stats")
+        self.draw()
+
+    def setup_terminal(self):
+        curses.curs_set(0)
+        if curses.has_colors():
+            curses.start_color()
+            curses.use_default_colors()
+            for pair, color in ((ACCENT, curses.COLOR_MAGENTA), (CORRECT, curses.COLOR_GREEN),
+                                (INCORRECT, curses.COLOR_RED), (SECONDARY, curses.COLOR_BLUE),
+                                (WARNING, curses.COLOR_YELLOW)):
+                curses.init_pair(pair, color, -1)
+
+    def color(self, pair):
+        return curses.color_pair(pair) if curses.has_colors() else 0
+
+    # ---------------------------- EVENT LOOP ----------------------------
+    def load_deck(self, deck):
+        """Select a registry deck by name or a binary deck file, falling back to hiragana"""
+        self.decks.register_directory(DECKS_DIR)
+        name = DEFAULT_DECK
+        if deck in self.decks:
+            name = deck
+        elif deck:
+            name = self.decks.register_file(deck)
+        try:
+            return self.decks.get(name)
+        except Exception as e:  # Shown on the menu: printing would garble the curses screen
+            self.message = f"Could not load deck: {e}"
+            return self.decks.get(DEFAULT_DECK)
+
+    def run(self):
+        """Handle keys until the learner quits"""
+        try:
+            while True:
+                key = self.window.get_wch()
+                start = time.perf_counter()
+                if not self.handle(key):
+                    return
+                self.draw()
+                self.latencies.append((time.perf_counter() - start) * 1000)
+        finally:
+            self.close()
+
+    def handle(self, key):
+        """Act on one key; False to quit"""
+        if key == curses.KEY_RESIZE:
+            return True
+        if key == "\x1b":
+            if self.screen_name == "menu":
+                return False
+            self.show_menu()
+            return True
+        return getattr(self, f"handle_{self.screen_name}_key")(key)
+
+    def close(self):
+        """Flush pending stats to disk"""
+        self.engine.release_current_card()
+        self.stats_writer.close()
+        self.decks.close()
+
+    # ---------------------------- SCREENS ----------------------------
+    def show_menu(self):
+        self.engine.release_current_card()
+        self.screen_name = "menu"
+
+    def handle_menu_key(self, key):
+        if key in ("1", "2"):
+            self.start_practice("hiragana_to_romaji" if key == "1" else "romaji_to_hiragana")
+        elif key in ("d", "D", curses.KEY_RIGHT, curses.KEY_LEFT):
+            self.cycle_deck(-1 if key in ("D", curses.KEY_LEFT) else 1)
+        elif key == "m":
+            self.multiple_choice_mode = not self.multiple_choice_mode
+        elif key == "u":
+            self.due_only_mode = not self.due_only_mode
+        elif key == "p":
+            self.screen_name = "progress"
+        elif key == "q":
+            return False
+        return True
+
+    def cycle_deck(self, step):
+        """Switch to the next (or previous) registered deck"""
+        names = [name for name, _ in self.decks.titles()]
+        name = names[(names.index(self.deck_entry.name) + step) % len(names)]
+        try:
+            entry = self.decks.get(name)  # Built on first selection, cached after
+        except Exception as e:
+            self.message = f"Could not load deck: {e}"
+            return
+        self.engine.release_current_card()
+        self.deck_entry, self.deck = entry, entry.deck
+        self.engine = QuizEngine(self.deck, self.stats, self.stats_writer, indexes=entry.indexes)
+        self.build_indexes()
+        self.message = ""
+
+    def build_indexes(self):
+        """Build the deck's answer and option tables on a worker thread, ahead of the first card"""
+        threading.Thread(target=prepare_indexes, args=(self.deck, self.deck_entry.indexes),
+                         name="reuniclus-indexes", daemon=True).start()
+
+    def start_practice(self, mode):
+        """Start a practice session in the selected mode"""
+        self.engine.start(mode, self.due_only_mode)
+        self.show_next_card()
+
+    def show_next_card(self):
+        if self.engine.next_card() is None:
+            self.screen_name = "results"
+            return
+        self.screen_name = "card"
+        self.typed = ""
+        if self.multiple_choice_mode:
+            self.options = self.engine.options()
+        self.kana_input = self.engine.mode == "romaji_to_hiragana"
+        self.katakana_input = self.kana_input and is_katakana(self.engine.correct_answer())
+
+    def handle_card_key(self, key):
+        if key == "\t":
+            self.show_next_card()  # Skip
+        elif self.multiple_choice_mode:
+            if isinstance(key, str) and key.isdigit() and 1 <= int(key) <= len(self.options):
+                self.check_answer(self.options[int(key) - 1])
+        elif key in ENTER_KEYS:
+            user_answer = self.typed.strip().lower()
+            if self.kana_input:
+                user_answer = self.to_answer_script(to_kana(user_answer))  # Finish a trailing "n"
+            self.check_answer(user_answer)
+        elif key in BACKSPACE_KEYS:
+            self.typed = self.typed[:-1]
+        elif isinstance(key, str) and key.isprintable():
+            self.typed += key
+            if self.kana_input:
+                self.typed = self.to_answer_script(live_kana(self.typed))
+        return True
+
+    def to_answer_script(self, text):
+        return to_katakana(text) if self.katakana_input else text
+
+    def check_answer(self, user_answer):
+        is_correct = self.engine.check(user_answer)
+        self.engine.answer(is_correct, user_answer)
+        self.last_answer = (is_correct, user_answer)
+        self.screen_name = "answer"
+
+    def handle_answer_key(self, key):
+        if key in ENTER_KEYS or key in (" ", "\t"):
+            self.show_next_card()
+        return True
+
+    def handle_progress_key(self, key):
+        if key in ENTER_KEYS or key in (" ", "q"):
+            self.show_menu()
+        return True
+
+    def handle_results_key(self, key):
+        if key in ("r", "R"):
+            self.start_practice(self.engine.mode)
+        elif key in ENTER_KEYS or key == " ":
+            self.show_menu()
+        return True
+
+    # ---------------------------- DRAWING ----------------------------
+    def draw(self):
+        """Redraw the current screen; curses only sends the cells that changed"""
+        self.window.erase()
+        self.height, self.width = self.window.getmaxyx()
+        getattr(self, f"draw_{self.screen_name}")()
+        self.window.noutrefresh()
+        curses.doupdate()
+
+    def put(self, y, text, attr=0, x=None):
+        """Write one line, centred unless ``x`` is given, clipped to the window"""
+        if not 0 <= y < self.height:
+            return
+        if x is None:
+            x = max((self.width - text_width(text)) // 2, 0)
+        try:
+            self.window.addnstr(y, x, text, max(self.width - x - 1, 0), attr)
+        except curses.error:
+            pass  # Text too wide for a tiny window
+
+    def draw_footer(self, hint):
+        self.put(self.height - 2, hint, curses.A_DIM)
+        if self.latencies:
+            self.put(self.height - 1, f"{self.latencies[-1]:.2f} ms", curses.A_DIM, x=1)
+
+    def draw_menu(self):
+        self.put(1, f"✨ {APP_NAME} ✨", curses.A_BOLD | self.color(ACCENT))
+        self.put(2, APP_TAGLINE, self.color(SECONDARY))
+        self.put(4, f"Deck: ◀ {self.decks.specs[self.deck_entry.name].title} ▶", curses.A_BOLD)
+        self.put(6, f"[m] Multiple choice: {'on' if self.multiple_choice_mode else 'off'}    "
+                    f"[u] Due cards only: {'on' if self.due_only_mode else 'off'}")
+        self.put(8, "[1] Study Kana → Romaji")
+        self.put(9, "[2] Study Romaji → Kana")
+        self.put(10, "[p] Progress")
+        self.put(11, "[q] Quit")
+
+        if self.stats is None:
+            self.put(13, "🎯 Loading stats…")
+        else:
+            stats = self.stats
+            accuracy = stats["total_correct"] / stats["total_attempts"] * 100 if stats["total_attempts"] else 0
+            self.put(13, f"🎯 {stats['total_correct']}/{stats['total_attempts']} correct ({accuracy:.1f}%)")
+            self.put(14, f"🔥 Streak: {stats['streak']} (Best: {stats['longest_streak']})")
+        self.put(16, self.message, self.color(INCORRECT))
+        self.draw_footer("1/2 study · ←/→ or d deck · m/u toggle · p progress · q or Esc quit")
+
+    def draw_card(self):
+        engine = self.engine
+        self.put(1, f"{APP_NAME} - {engine.mode_title()}", self.color(SECONDARY))
+        self.put(2, f"Cards: {engine.session_remaining + 1}/{engine.session_size}", curses.A_DIM)
+        self.put(5, engine.question(), curses.A_BOLD | self.color(ACCENT))
+        if self.multiple_choice_mode:
+            for i, option in enumerate(self.options):
+                self.put(8 + i, f"[{i + 1}] {option}")
+            self.draw_footer("1-4 answer · Tab skip · Esc menu")
+        else:
+            self.put(8, f"{engine.answer_label()} {self.typed}▏")
+            self.draw_footer("Enter check · Tab skip · Esc menu")
+
+    def draw_answer(self):
+        is_correct, user_answer = self.last_answer
+        card = self.engine.current_card
+        kana = self.deck.kana(card)
+        if is_correct:
+            self.put(3, "✅ Correct!", curses.A_BOLD | self.color(CORRECT))
+        else:
+            self.put(3, "❌ Incorrect", curses.A_BOLD | self.color(INCORRECT))
+        self.put(5, f"{'Katakana' if is_katakana(kana) else 'Hiragana'}: {kana}")
+        self.put(6, f"Romaji: {self.deck.romaji(card)}")
+        self.put(7, f"Your answer: {user_answer}", curses.A_DIM)
+        self.draw_footer("Enter/Space next · Esc menu")
+
+    def draw_progress(self):
+        from dashboard import dashboard  # Reads the stats aggregates; no history scan
+        figures = dashboard(self.stats, self.deck)
+        self.put(1, f"{APP_NAME} - Progress ({self.deck.name})", curses.A_BOLD | self.color(SECONDARY))
+        for i, (days, _, attempts, accuracy) in enumerate(figures["rolling"]):
+            self.put(3 + i, f"Last {days} days: " + (f"{accuracy:.1f}% of {attempts} answers" if attempts
+                                                      else "no answers"))
+        self.put(5, f"Cards seen: {figures['seen']}/{figures['cards']}", curses.A_DIM)
+
+        y = 7
+        for cells in figures["heatmap"]:
+            if y >= self.height - 4 - len(figures["weakest"]):
+                self.put(y, "…", curses.A_DIM)
+                y += 1
+                break
+            x = 4
+            for kana, accuracy, _ in cells:
+                self.put(y, kana, self.heat_attr(accuracy), x=x)
+                x += text_width(kana) + 2
+            y += 1
+
+        y += 1
+        for kana, romaji, accuracy, attempts in figures["weakest"]:
+            self.put(y, f"{kana} ({romaji})  {accuracy:.0f}% of {attempts}", self.heat_attr(accuracy), x=4)
+            y += 1
+        self.draw_footer("Enter or Esc menu")
+
+    def heat_attr(self, accuracy):
+        if accuracy is None:
+            return curses.A_DIM
+        return curses.A_BOLD | self.color(next(pair for minimum, pair in HEAT_LEVELS if accuracy >= minimum))
+
+    def draw_results(self):
+        engine = self.engine
+        self.put(1, f"{APP_NAME} - Session Complete", curses.A_BOLD | self.color(SECONDARY))
+        results = engine.results()
+        if results is None:
+            self.put(4, "No cards were answered in this session.")
+        else:
+            accuracy, feedback, tier = results
+            self.put(4, f"Cards studied: {engine.session_total}")
+            self.put(5, f"Correct answers: {engine.session_correct}")
+            self.put(6, f"Accuracy: {accuracy:.1f}%", curses.A_BOLD)
+            self.put(8, feedback, self.color(FEEDBACK_COLORS[tier]))
+        self.draw_footer("r practice again · Enter menu")
+
+
+def run(deck=None, stats_db=None, profile=None, on_ready=None):
+    """Run the terminal front end until the learner quits; returns feedback latencies (ms)"""
+    locale.setlocale(locale.LC_ALL, "")  # Lets curses draw kana
+    os.environ.setdefault("ESCDELAY", str(ESCAPE_DELAY_MS))
+
+    def main(window):
+        app = TerminalApp(window, deck, stats_db, profile)
+        if on_ready is not None:
+            on_ready(app)
+            app.close()
+        else:
+            app.run()
+        return app.latencies
+
+    try:
+        return curses.wrapper(main)
+    except KeyboardInterrupt:
+        return []
+
+
+# ---------------------------- COMMAND LINE ----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=f"{APP_NAME} in the terminal")
+    parser.add_argument("--deck", help="Built-in deck name or binary deck file; defaults to hiragana")
+    parser.add_argument("--stats-db", help="Keep stats in this SQLite database instead of reuniclus_stats.json")
+    args = parser.parse_args()
+    run(args.deck, args.stats_db)